@@ -1,16 +1,51 @@
 import multiprocessing
 from multiprocessing import connection as mpconnection
-from collections import Callable
+from collections import Callable, deque
+import asyncio
+import concurrent.futures
+import functools
+import threading
 import abc
 import os
 import sys
 import numpy as np
 import random
+import logging
+import time
 
 from delira.data_loading.sampler import AbstractSampler, BatchSampler
 from delira.data_loading.data_loader import DataLoader
 from delira import get_current_debug_mode
 
+# shared memory is only available for python >= 3.8
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+logger = logging.getLogger(__name__)
+
+
+def _batch_seed(seed, batch_idx):
+    """
+    Derives the seed for augmenting a single batch from the basic seed and
+    the batch's position within the epoch
+
+    Parameters
+    ----------
+    seed : int
+        the basic seed
+    batch_idx : int
+        the position of the batch within the epoch
+
+    Returns
+    -------
+    int
+        the seed of the batch
+
+    """
+    return (seed * 1000003 + batch_idx) % 2 ** 32
+
 
 class AbstractAugmenter(object):
     """
@@ -45,6 +80,28 @@ class AbstractAugmenter(object):
         """
 
         self._data_loader = data_loader
+        self._transforms = transforms
+
+        self.reset(sampler, batchsize, seed, drop_last)
+
+    def reset(self, sampler, batchsize, seed=1, drop_last=False):
+        """
+        Sets a new sampler and seed for the next iteration
+
+        Parameters
+        ----------
+        sampler : :class:`AbstractSampler`
+            the sampler_old (may be batch sampler_old or usual sampler_old),
+            defining the actual sampling strategy; Is an iterable yielding
+            indices
+        batchsize : int
+            the batchsize to use for sampling
+        seed : int
+            the basic seed; default: 1
+        drop_last : bool
+            whether to drop the last (possibly smaller) batch or not
+
+        """
 
         if not isinstance(sampler, BatchSampler):
             if isinstance(sampler, AbstractSampler):
@@ -57,26 +114,366 @@ class AbstractAugmenter(object):
 
         self._drop_last = drop_last
 
-        self._transforms = transforms
         self._seed = seed
 
+        # number of batches yielded in the current epoch and state to resume
+        # from
+        self._num_batches = 0
+        self._resume_state = None
+
         # seed numpy.random and random as these are the random number
         # generators, which might be used for sampling
         np.random.seed(seed)
         random.seed(seed)
 
+    def state_dict(self):
+        """
+        Returns the current state to resume the iteration later on (after
+        the last yielded batch)
+
+        Returns
+        -------
+        dict
+            the state containing the seed, the number of batches yielded in
+            the current epoch, the sampler's state and the states of the
+            random number generators
+
+        """
+        return {"seed": self._seed, "num_batches": self._num_batches,
+                "sampler": self._sampler.state_dict(),
+                "random_state": {"numpy": np.random.get_state(),
+                                 "random": random.getstate()}}
+
+    def load_state_dict(self, state_dict):
+        """
+        Loads a state returned by :meth:`AbstractAugmenter.state_dict`. The
+        next iteration skips all batches, which have already been yielded
+        before saving the state
+
+        Parameters
+        ----------
+        state_dict : dict
+            the state to load
+
+        """
+        self._seed = state_dict["seed"]
+        np.random.seed(self._seed)
+        random.seed(self._seed)
+
+        self._sampler.load_state_dict(state_dict["sampler"])
+        self._resume_state = state_dict
+
+    def _create_sampler_iter(self):
+        """
+        Creates an iterator over the sampled batch indices and skips the
+        batches, which have been yielded before the loaded state was saved
+
+        Returns
+        -------
+        Iterator
+            iterator over the remaining batch indices
+
+        """
+        sampler_iter = iter(self._sampler)
+        self._num_batches = 0
+
+        if self._resume_state is not None:
+            for _ in range(self._resume_state["num_batches"]):
+                next(sampler_iter, None)
+                self._num_batches += 1
+
+            # restore random state after sampling the epoch
+            if self._num_batches:
+                np.random.set_state(
+                    self._resume_state["random_state"]["numpy"])
+                random.setstate(self._resume_state["random_state"]["random"])
+
+            self._resume_state = None
+
+        return sampler_iter
+
+    def shutdown(self):
+        """
+        Releases all resources (like processes) held by the augmenter;
+        Does nothing by default
+        """
+        pass
+
+    @property
+    def queue_statistics(self):
+        """
+        Property returning statistics about the batches queued for
+        background processing; empty by default
+
+        Returns
+        -------
+        dict
+            the statistics
+        """
+        return {}
+
     @abc.abstractmethod
     def __iter__(self):
         raise NotImplementedError
 
 
+if shared_memory is not None:
+    class _SharedMemorySlot(shared_memory.SharedMemory):
+        """
+        A single block of shared memory holding one batch at a time
+        """
+
+        def close(self):
+            """
+            Closes the access to the shared memory from this instance.
+            The mapping itself is not closed explicitly, but released
+            together with the last array viewing it
+            """
+            # numpy arrays keep a reference to the underlying mmap, but
+            # do not hold a buffer export. Closing the mmap explicitly
+            # would therefore invalidate arrays, which are still in use
+            self._mmap = None
+            super().close()
+
+
+class _SharedMemoryPool(object):
+    """
+    A pool of preallocated shared memory slots. Workers write their batches
+    into these slots and only send a small descriptor (keys, shapes, dtypes
+    and offsets) through the pipes. The main process creates zero-copy views
+    from these descriptors
+    """
+
+    # alignment (in bytes) of each array inside a slot
+    _ALIGNMENT = 64
+
+    def __init__(self, num_slots, slot_size):
+        """
+        Parameters
+        ----------
+        num_slots : int
+            the number of slots to preallocate
+        slot_size : int
+            the size of each slot in bytes
+        """
+        if shared_memory is None:
+            raise RuntimeError("Shared memory transport requires python "
+                               ">= 3.8")
+
+        self.slots = [_SharedMemorySlot(create=True, size=slot_size)
+                      for _ in range(num_slots)]
+        self._free_slots = list(range(num_slots))
+
+    def acquire(self):
+        """
+        Acquires a free slot
+
+        Returns
+        -------
+        int or None
+            the id of the acquired slot; None if no slot is available
+        """
+        if self._free_slots:
+            return self._free_slots.pop(0)
+        return None
+
+    def release(self, slot_id):
+        """
+        Marks a slot as free again, so that it can be reused for other
+        batches
+
+        Parameters
+        ----------
+        slot_id : int or None
+            the id of the slot to release; None will be ignored
+        """
+        if slot_id is not None:
+            self._free_slots.append(slot_id)
+
+    def release_all(self):
+        """
+        Marks all slots as free again
+        """
+        self._free_slots = list(range(len(self.slots)))
+
+    @staticmethod
+    def write(slot, data: dict):
+        """
+        Writes all numpy arrays of a batch into the given slot
+
+        Parameters
+        ----------
+        slot : :class:`multiprocessing.shared_memory.SharedMemory`
+            the slot to write the data to
+        data : dict
+            the batch to write
+
+        Returns
+        -------
+        list or None
+            the descriptor for the written arrays, containing a tuple of
+            key, shape, dtype and offset per array; None if the batch does not
+            fit into the slot
+        dict
+            all items, which could not be written to shared memory (e.g.
+            non-array values); these must be transferred otherwise
+
+        """
+        descriptor, extras = [], {}
+        offset = 0
+
+        # calculate the layout first to avoid partially written slots
+        for key, val in data.items():
+            if isinstance(val, np.ndarray) and not val.dtype.hasobject:
+                offset = -(-offset // _SharedMemoryPool._ALIGNMENT) \
+                    * _SharedMemoryPool._ALIGNMENT
+                descriptor.append((key, val.shape, val.dtype, offset))
+                offset += val.nbytes
+            else:
+                extras[key] = val
+
+        if offset > slot.size:
+            return None, data
+
+        for key, shape, dtype, offset in descriptor:
+            np.ndarray(shape, dtype=dtype, buffer=slot.buf,
+                       offset=offset)[...] = data[key]
+
+        return descriptor, extras
+
+    def read(self, slot_id, descriptor, extras: dict):
+        """
+        Creates a batch of zero-copy views from a descriptor
+
+        Parameters
+        ----------
+        slot_id : int
+            the id of the slot, the data was written to
+        descriptor : list
+            the descriptor for the written arrays as returned by
+            :meth:`_SharedMemoryPool.write`
+        extras : dict
+            additional items of the batch, which have not been written to
+            shared memory
+
+        Returns
+        -------
+        dict
+            the batch containing views to the shared memory
+
+        """
+        buf = self.slots[slot_id].buf
+        data = {key: np.ndarray(shape, dtype=dtype, buffer=buf,
+                                offset=offset)
+                for key, shape, dtype, offset in descriptor}
+        data.update(extras)
+        return data
+
+    def close(self):
+        """
+        Closes and unlinks all slots
+        """
+        for slot in self.slots:
+            slot.close()
+            slot.unlink()
+
+        self.slots = []
+        self._free_slots = []
+
+
+class _QueueStatistics(object):
+    """
+    Collects statistics about the batches queued for the workers, which can
+    be used to tune the prefetching against the measured producer and
+    consumer rates: A high ``wait_time`` compared to the ``consumer_time``
+    indicates, that the workers cannot keep up with the consumer, while a
+    low ``mean_queue_depth`` compared to the allowed depth indicates, that
+    the queue is limited by the memory cap
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Resets all statistics
+        """
+        self.num_batches = 0
+        self.max_queue_depth = 0
+        self.wait_time = 0.
+        self.consumer_time = 0.
+        self._total_queue_depth = 0
+        self._total_bytes = 0
+
+    def update(self, queue_depth, batch: dict, wait_time):
+        """
+        Updates the statistics with a newly received batch
+
+        Parameters
+        ----------
+        queue_depth : int
+            the number of enqueued batches (including the received one)
+            at the time the batch was requested
+        batch : dict
+            the received batch
+        wait_time : float
+            the time (in seconds) spent waiting for the batch
+
+        """
+        self.num_batches += 1
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+        self.wait_time += wait_time
+        self._total_queue_depth += queue_depth
+        self._total_bytes += sum([val.nbytes for val in batch.values()
+                                  if isinstance(val, np.ndarray)])
+
+    @property
+    def mean_queue_depth(self):
+        """
+        Property returning the average number of enqueued batches at the
+        time a new batch was requested
+        """
+        if not self.num_batches:
+            return 0.
+        return self._total_queue_depth / self.num_batches
+
+    @property
+    def mean_batch_bytes(self):
+        """
+        Property returning the average size of the batches' arrays in bytes
+        """
+        if not self.num_batches:
+            return 0.
+        return self._total_bytes / self.num_batches
+
+    def as_dict(self):
+        """
+        Returns all statistics as dict
+
+        Returns
+        -------
+        dict
+            the statistics
+
+        """
+        return {"num_batches": self.num_batches,
+                "mean_queue_depth": self.mean_queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "mean_batch_bytes": self.mean_batch_bytes,
+                "wait_time": self.wait_time,
+                "consumer_time": self.consumer_time}
+
+
 class _ParallelAugmenter(AbstractAugmenter):
     """
     An Augmenter that loads and augments multiple batches in parallel
     """
 
     def __init__(self, data_loader, batchsize, sampler, num_processes=None,
-                 transforms=None, seed=1, drop_last=False):
+                 transforms=None, seed=1, drop_last=False,
+                 shared_memory=False, shared_memory_slot_size=2 ** 26,
+                 ordered=True, reorder_window=None, persistent_workers=False,
+                 prefetch_factor=2, max_queued_bytes=None):
         """
         Parameters
         ----------
@@ -98,6 +495,46 @@ class _ParallelAugmenter(AbstractAugmenter):
             the basic seed; default: 1
         drop_last : bool
             whether to drop the last (possibly smaller) batch or not
+        shared_memory : bool
+            whether to transfer the batches from the workers to the main
+            process via shared memory instead of pickling them through pipes;
+            requires python >= 3.8
+        shared_memory_slot_size : int
+            the size (in bytes) of each shared memory slot; batches not fitting
+            into a slot will be sent through the pipes; default: 64 MB
+        ordered : bool
+            if True: the batches are assigned to the workers in a cyclic way
+            and received in the same order; if False: new batches are
+            assigned to the least loaded worker and batches are yielded as
+            soon as they are ready, which avoids stalling on single slow
+            batches
+        reorder_window : int
+            only used if ``ordered`` is False; if given, the batches are
+            yielded in their sampling order (and thus reproducible) while
+            still being assigned to the least loaded workers. At most
+            ``reorder_window`` batches are processed ahead of the next batch
+            to yield; if None: the batches are yielded in the order they
+            become ready
+        persistent_workers : bool
+            whether to keep the workers alive after an iteration has finished.
+            If True, subsequent iterations reuse the existing workers
+            instead of starting new ones; the workers are shut down by
+            :meth:`_ParallelAugmenter.shutdown` or on garbage collection
+        prefetch_factor : int
+            the number of batches to enqueue per worker in advance
+        max_queued_bytes : int
+            the maximum number of bytes, the enqueued batches may occupy.
+            Since the size of a batch is unknown before it has been loaded,
+            this is estimated by the average size of all previous batches;
+            if None: the queue is only limited by ``prefetch_factor``
+
+        Warnings
+        --------
+        If ``shared_memory`` is enabled, the arrays of each batch are views to
+        a shared memory slot, which will be reused as soon as the next batch
+        is requested. Copy the arrays explicitly, if you need to keep them any
+        longer.
+
         """
 
         super().__init__(data_loader, batchsize, sampler, transforms, seed,
@@ -119,6 +556,53 @@ class _ParallelAugmenter(AbstractAugmenter):
         self._data_queued = []
         self._processes_running = False
 
+        self._shared_memory = shared_memory
+        self._shared_memory_slot_size = shared_memory_slot_size
+        self._shared_memory_pool = None
+
+        if reorder_window is not None and reorder_window < 1:
+            raise ValueError("reorder_window must be at least 1, but got %d"
+                             % reorder_window)
+
+        self._ordered = ordered
+        self._reorder_window = reorder_window
+        self._reorder_buffer = {}
+        self._batch_counter = 0
+        self._next_batch_id = 0
+
+        self._persistent_workers = persistent_workers
+
+        if prefetch_factor < 1:
+            raise ValueError("prefetch_factor must be at least 1, but got %d"
+                             % prefetch_factor)
+
+        self._prefetch_factor = prefetch_factor
+        self._max_queued_bytes = max_queued_bytes
+        self._queue_statistics = _QueueStatistics()
+        # estimated size of a single batch in bytes (kept across iterations)
+        self._batch_bytes_estimate = None
+
+    @property
+    def queue_statistics(self):
+        """
+        Property returning statistics about the enqueued batches of the
+        current (or last) iteration
+
+        Returns
+        -------
+        dict
+            the statistics containing the number of received batches, the
+            average and maximum queue depth, the average batch size in bytes,
+            the total time spent waiting for the workers and the total time
+            spent by the consumer between two batches
+
+        See Also
+        --------
+        :class:`_QueueStatistics`
+
+        """
+        return self._queue_statistics.as_dict()
+
     @property
     def abort_event(self):
         """
@@ -152,6 +636,16 @@ class _ParallelAugmenter(AbstractAugmenter):
         # reset abortion event
         self.abort_event = multiprocessing.Event()
 
+        if self._shared_memory:
+            # one slot per enqueued batch and one for the batch currently
+            # processed by the consumer
+            self._shared_memory_pool = _SharedMemoryPool(
+                self._num_processes * self._prefetch_factor + 1,
+                self._shared_memory_slot_size)
+            slots = self._shared_memory_pool.slots
+        else:
+            slots = None
+
         # for each process do:
         for i in range(self._num_processes):
             # start two oneway pipes (one for passing index to workers
@@ -165,7 +659,8 @@ class _ParallelAugmenter(AbstractAugmenter):
                                      index_pipe=recv_conn_in,
                                      transforms=self._transforms,
                                      abort_event=self._abort_event,
-                                     process_id=i)
+                                     process_id=i,
+                                     shared_memory_slots=slots)
             process.daemon = True
             process.start()
             # wait until process was created and started
@@ -208,8 +703,49 @@ class _ParallelAugmenter(AbstractAugmenter):
 
         # reset running process flag and counters
         self._processes_running = False
+        self._reset_counters()
+
+        if self._shared_memory_pool is not None:
+            self._shared_memory_pool.close()
+            self._shared_memory_pool = None
+
+    def _reset_counters(self):
+        """
+        Resets all counters related to the enqueued batches
+        """
         self._data_pipe_counter = 0
         self._index_pipe_counter = 0
+        self._batch_counter = 0
+        self._next_batch_id = 0
+        self._num_sampled = 0
+        self._reorder_buffer = {}
+
+    def _discard_pending(self):
+        """
+        Receives and discards all batches, which are still processed by the
+        workers (e.g. because the iteration was stopped early), so that the
+        workers can be reused afterwards
+        """
+        for pipe_idx, num_queued in enumerate(self._data_queued):
+            for _ in range(num_queued):
+                self._receive_from_pipe(pipe_idx)
+
+        self._reset_counters()
+
+        if self._shared_memory_pool is not None:
+            self._shared_memory_pool.release_all()
+
+    def shutdown(self):
+        """
+        Shuts down the workers (if running)
+        """
+        if self._processes_running:
+            self._shutdown_processes()
+
+    def __del__(self):
+        # attribute might not exist if __init__ failed
+        if getattr(self, "_processes_running", False):
+            self._shutdown_processes()
 
     @property
     def _next_index_pipe(self):
@@ -233,10 +769,70 @@ class _ParallelAugmenter(AbstractAugmenter):
 
         return ctr
 
+    @property
+    def _next_ready_data_pipe(self):
+        """
+        Property waiting until any worker with enqueued batches has finished
+        a batch and returning the index of its data pipe
+        """
+        pipes = [pipe for pipe, num_queued in zip(self._data_pipes,
+                                                  self._data_queued)
+                 if num_queued]
+
+        while True:
+            # wait with timeout to frequently check for abortions
+            ready = mpconnection.wait(pipes, timeout=0.2)
+
+            if ready:
+                return self._data_pipes.index(ready[0])
+
+            if self.abort_event.is_set():
+                raise RuntimeError("Abort Event was set in one of the "
+                                   "workers")
+
+    @property
+    def _batches_ahead(self):
+        """
+        Property returning the number of batches, which have been enqueued
+        but not yet been yielded
+        """
+        return self._batch_counter - self._next_batch_id
+
+    @property
+    def _may_enqueue(self):
+        """
+        Property defining whether another batch may be enqueued without
+        exceeding the prefetch depth, the reorder window or the memory cap
+        """
+        batches_ahead = self._batches_ahead
+
+        # always allow a single batch to avoid deadlocks
+        if not batches_ahead:
+            return True
+
+        if batches_ahead >= self._num_processes * self._prefetch_factor:
+            return False
+
+        if not self._ordered and self._reorder_window is not None \
+                and batches_ahead >= self._reorder_window:
+            return False
+
+        if self._max_queued_bytes is not None:
+            # size of batches is unknown until the first one was received
+            if self._batch_bytes_estimate is None:
+                return False
+
+            estimated_bytes = (batches_ahead + 1) * self._batch_bytes_estimate
+            if estimated_bytes > self._max_queued_bytes:
+                return False
+
+        return True
+
     def _enqueue_indices(self, sample_idxs):
         """
         Enqueues a set of indices to workers while iterating over workers in
-        cyclic way
+        cyclic way (if ordered) or assigning them to the least loaded worker
+        (if not ordered)
         Parameters
         ----------
         sample_idxs : list
@@ -245,45 +841,117 @@ class _ParallelAugmenter(AbstractAugmenter):
 
         # iterating over all batch indices
         for idxs in sample_idxs:
-            # switch to next counter
-            index_pipe_ctr = self._next_index_pipe
+            if self._ordered:
+                # switch to next counter
+                index_pipe_ctr = self._next_index_pipe
+            else:
+                index_pipe_ctr = int(np.argmin(self._data_queued))
             # increase number of queued batches for current worker
             self._data_queued[index_pipe_ctr] += 1
-            # enqueue indices to worker
-            self._index_pipes[index_pipe_ctr].send(idxs)
+
+            # acquire shared memory slot for the batch (if necessary)
+            if self._shared_memory_pool is not None:
+                slot_id = self._shared_memory_pool.acquire()
+            else:
+                slot_id = None
+
+            # enqueue indices to worker (with a seed depending on the
+            # batch's position to be independent of the worker)
+            self._index_pipes[index_pipe_ctr].send(
+                (self._batch_counter, slot_id, idxs,
+                 _batch_seed(self._seed, self._num_sampled)))
+            self._batch_counter += 1
+            self._num_sampled += 1
+
+    def _receive_from_pipe(self, pipe_idx):
+        """
+        Receives a single batch from a specific worker
+
+        Parameters
+        ----------
+        pipe_idx : int
+            the index of the worker's data pipe
+
+        Returns
+        -------
+        int
+            the batch id
+        int or None
+            the shared memory slot holding the batch (if any)
+        dict
+            the batch
+
+        """
+        # receive data from worker
+        batch_id, slot_id, descriptor, data = \
+            self._data_pipes[pipe_idx].recv()
+        # decrease number of enqueued batches for current worker
+        self._data_queued[pipe_idx] -= 1
+
+        if descriptor is not None:
+            return batch_id, slot_id, self._shared_memory_pool.read(
+                slot_id, descriptor, data)
+
+        # batch was sent through pipe -> slot can be reused immediately
+        if self._shared_memory_pool is not None:
+            self._shared_memory_pool.release(slot_id)
+
+        return batch_id, None, data
 
     def _receive_data(self):
         """
         Receives data from worker
+
+        Returns
+        -------
+        int or None
+            the shared memory slot holding the batch (if any)
+        dict
+            the batch
+
         """
-        # switching to next worker
-        _data_pipe = self._next_data_pipe
+        queue_depth = self._batches_ahead
+        start_time = time.perf_counter()
 
-        # receive data from worker
-        data = self._data_pipes[_data_pipe].recv()
-        # decrease number of enqueued batches for current worker
-        self._data_queued[_data_pipe] -= 1
+        if self._ordered:
+            # switching to next worker
+            _, slot_id, data = self._receive_from_pipe(self._next_data_pipe)
 
-        return data
+        elif self._reorder_window is None:
+            # take whichever batch is ready first
+            _, slot_id, data = self._receive_from_pipe(
+                self._next_ready_data_pipe)
+
+        else:
+            # buffer batches, which arrived too early, until the next batch
+            # in order is available
+            while self._next_batch_id not in self._reorder_buffer:
+                batch_id, slot_id, data = self._receive_from_pipe(
+                    self._next_ready_data_pipe)
+                self._reorder_buffer[batch_id] = (slot_id, data)
+
+            slot_id, data = self._reorder_buffer.pop(self._next_batch_id)
+
+        self._next_batch_id += 1
+
+        self._queue_statistics.update(queue_depth, data,
+                                      time.perf_counter() - start_time)
+        self._batch_bytes_estimate = self._queue_statistics.mean_batch_bytes
+
+        return slot_id, data
 
     def __iter__(self):
-        self._start_processes()
+        # reuse persistent workers
+        if not self._processes_running:
+            self._start_processes()
 
-        sampler_iter = iter(self._sampler)
+        self._queue_statistics.reset()
+
+        sampler_iter = self._create_sampler_iter()
+        self._num_sampled = self._num_batches
         all_sampled = False
 
         try:
-            # start by enqueuing two items per process as buffer
-            _indices = []
-            try:
-                for i in range(self._num_processes * 2):
-                    idxs = next(sampler_iter)
-                    _indices.append(idxs)
-            except StopIteration:
-                all_sampled = True
-
-            self._enqueue_indices(_indices)
-
             # iterate while not all data has been sampled and any data is
             # enqueued
             while True:
@@ -292,18 +960,28 @@ class _ParallelAugmenter(AbstractAugmenter):
                     raise RuntimeError("Abort Event was set in one of the "
                                        "workers")
 
-                # enqueue additional indices if sampler_old was not already
-                # exhausted
+                # enqueue additional indices as long as the queue is not full
+                # and sampler_old was not already exhausted
                 try:
-                    if not all_sampled:
+                    while not all_sampled and self._may_enqueue:
                         idxs = next(sampler_iter)
                         self._enqueue_indices([idxs])
                 except StopIteration:
                     all_sampled = True
 
                 # receive data from workers
-                if any(self._data_queued):
-                    yield self._receive_data()
+                if any(self._data_queued) or self._reorder_buffer:
+                    slot_id, data = self._receive_data()
+
+                    self._num_batches += 1
+                    start_time = time.perf_counter()
+                    yield data
+                    self._queue_statistics.consumer_time += \
+                        time.perf_counter() - start_time
+
+                    # consumer requested next batch -> recycle slot
+                    if self._shared_memory_pool is not None:
+                        self._shared_memory_pool.release(slot_id)
                 else:
                     break
 
@@ -314,7 +992,11 @@ class _ParallelAugmenter(AbstractAugmenter):
 
         finally:
             if self._processes_running:
-                self._shutdown_processes()
+                if self._persistent_workers and \
+                        not self.abort_event.is_set():
+                    self._discard_pending()
+                else:
+                    self._shutdown_processes()
 
 
 class _WorkerProcess(multiprocessing.Process):
@@ -327,7 +1009,8 @@ class _WorkerProcess(multiprocessing.Process):
                  index_pipe: mpconnection.Connection,
                  abort_event: multiprocessing.Event,
                  transforms: Callable,
-                 process_id):
+                 process_id,
+                 shared_memory_slots=None):
         """
         Parameters
         ----------
@@ -345,6 +1028,9 @@ class _WorkerProcess(multiprocessing.Process):
             the transforms to transform the data
         process_id : int
             the process id
+        shared_memory_slots : list
+            the shared memory slots to write the batches to; if None: all
+            batches will be sent through the output pipe
         """
         super().__init__()
 
@@ -354,6 +1040,7 @@ class _WorkerProcess(multiprocessing.Process):
         self._abort_event = abort_event
         self._process_id = process_id
         self._transforms = transforms
+        self._shared_memory_slots = shared_memory_slots
 
     def run(self) -> None:
         # set the process id
@@ -368,12 +1055,17 @@ class _WorkerProcess(multiprocessing.Process):
                 # get indices if available (with timeout to frequently check
                 # for abortions
                 if self._input_pipe.poll(timeout=0.2):
-                    idxs = self._input_pipe.recv()
+                    msg = self._input_pipe.recv()
 
                     # final indices -> shutdown workers
-                    if idxs is None:
+                    if msg is None:
                         break
 
+                    batch_id, slot_id, idxs, seed = msg
+
+                    np.random.seed(seed)
+                    random.seed(seed)
+
                     # load data
                     data = self._data_loader(idxs)
 
@@ -381,7 +1073,20 @@ class _WorkerProcess(multiprocessing.Process):
                     if self._transforms is not None:
                         data = self._transforms(**data)
 
-                    self._output_pipe.send(data)
+                    descriptor = None
+                    if slot_id is not None:
+                        descriptor, data = _SharedMemoryPool.write(
+                            self._shared_memory_slots[slot_id], data)
+
+                        if descriptor is None:
+                            logger.warning(
+                                "Batch does not fit into shared memory slot "
+                                "of %d bytes. Sending it through pipe "
+                                "instead" % self._shared_memory_slots[
+                                    slot_id].size)
+
+                    self._output_pipe.send((batch_id, slot_id, descriptor,
+                                            data))
 
         except Exception as e:
             self._abort_event.set()
@@ -424,7 +1129,7 @@ class _SequentialAugmenter(AbstractAugmenter):
 
     def __iter__(self):
         # create sampler_old iterator
-        sampler_iter = iter(self._sampler)
+        sampler_iter = self._create_sampler_iter()
 
         # for every index load and augment the data
         for idxs in sampler_iter:
@@ -436,18 +1141,407 @@ class _SequentialAugmenter(AbstractAugmenter):
             if self._transforms is not None:
                 data = self._transforms(**data)
 
+            self._num_batches += 1
             yield data
 
 
+class _ThreadedAugmenter(AbstractAugmenter):
+    """
+    An Augmenter that loads and augments multiple batches in parallel
+    threads sharing the same :class:`DataLoader`. Since the batches do not
+    need to be pickled and no processes need to be started, this is
+    preferable to :class:`_ParallelAugmenter` if loading and transforms
+    release the GIL (as most numpy, scipy.ndimage and numba-compiled
+    ``nogil`` functions do)
+
+    Notes
+    -----
+    All threads share the global random states of ``numpy.random`` and
+    ``random``. Random transforms are therefore only reproducible, if they
+    do not rely on these global states.
+
+    """
+
+    def __init__(self, data_loader, batchsize, sampler, num_threads=None,
+                 transforms=None, seed=1, drop_last=False,
+                 persistent_workers=False, prefetch_factor=2):
+        """
+        Parameters
+        ----------
+        data_loader : :class:`DataLoader`
+            the dataloader, loading samples for given indices; must not reuse
+            its output buffers
+        batchsize : int
+            the batchsize to use for sampling
+        sampler : :class:`AbstractSampler`
+            the sampler_old (may be batch sampler_old or usual sampler_old),
+            defining the actual sampling strategy; Is an iterable yielding
+            indices
+        num_threads : int
+            the number of threads to use for dataloading + augmentation;
+            if None: the number of available CPUs will be used as number of
+            threads
+        transforms : :class:`collections.Callable`
+            the transforms to apply; defaults to None
+        seed : int
+            the basic seed; default: 1
+        drop_last : bool
+            whether to drop the last (possibly smaller) batch or not
+        persistent_workers : bool
+            whether to keep the threads alive after an iteration has finished
+            and reuse them for subsequent iterations
+        prefetch_factor : int
+            the number of batches to enqueue per thread in advance
+
+        Raises
+        ------
+        ValueError
+            if the data loader reuses its output buffers, since these would
+            be overwritten by other threads while still being in use
+
+        """
+        super().__init__(data_loader, batchsize, sampler, transforms, seed,
+                         drop_last)
+
+        if getattr(data_loader, "reuse_buffers", False):
+            raise ValueError("Thread-based augmentation cannot be used with "
+                             "a data loader reusing its output buffers")
+
+        if prefetch_factor < 1:
+            raise ValueError("prefetch_factor must be at least 1, but got %d"
+                             % prefetch_factor)
+
+        if num_threads is None:
+            num_threads = os.cpu_count()
+
+        self._num_threads = num_threads
+        self._persistent_workers = persistent_workers
+        self._prefetch_factor = prefetch_factor
+        self._executor = None
+        self._queue_statistics = _QueueStatistics()
+
+    @property
+    def queue_statistics(self):
+        """
+        Property returning statistics about the enqueued batches of the
+        current (or last) iteration
+
+        Returns
+        -------
+        dict
+            the statistics containing the number of received batches, the
+            average and maximum queue depth, the average batch size in bytes,
+            the total time spent waiting for the threads and the total time
+            spent by the consumer between two batches
+
+        See Also
+        --------
+        :class:`_QueueStatistics`
+
+        """
+        return self._queue_statistics.as_dict()
+
+    def _load_batch(self, idxs):
+        """
+        Loads and transforms a single batch (executed by the threads)
+
+        Parameters
+        ----------
+        idxs : list or :class:`numpy.ndarray`
+            the sample indices of the batch
+
+        Returns
+        -------
+        dict
+            the batch
+
+        """
+        data = self._data_loader(idxs)
+
+        if self._transforms is not None:
+            data = self._transforms(**data)
+
+        return data
+
+    def _start_workers(self):
+        """
+        Starts the threads (if not already running)
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                self._num_threads)
+
+    def _submit_batch(self, idxs):
+        """
+        Submits a single batch for loading and transformation
+
+        Parameters
+        ----------
+        idxs : list or :class:`numpy.ndarray`
+            the sample indices of the batch
+
+        Returns
+        -------
+        :class:`concurrent.futures.Future`
+            the future holding the batch
+
+        """
+        return self._executor.submit(self._load_batch, idxs)
+
+    def _discard_batches(self, futures):
+        """
+        Discards batches, which will not be yielded (e.g. because the
+        iteration was stopped early), by cancelling those, which have not
+        been started yet and waiting for the running ones
+
+        Parameters
+        ----------
+        futures : iterable
+            the futures of the discarded batches
+
+        """
+        for future in futures:
+            future.cancel()
+
+        concurrent.futures.wait(futures)
+
+    def shutdown(self):
+        """
+        Shuts down the threads (if running)
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __iter__(self):
+        # reuse persistent threads
+        self._start_workers()
+
+        self._queue_statistics.reset()
+
+        sampler_iter = self._create_sampler_iter()
+        max_queued = self._num_threads * self._prefetch_factor
+        pending = deque()
+
+        try:
+            while True:
+                # enqueue additional indices as long as the queue is not full
+                while len(pending) < max_queued:
+                    idxs = next(sampler_iter, None)
+                    if idxs is None:
+                        break
+                    pending.append(self._submit_batch(idxs))
+
+                if not pending:
+                    break
+
+                # receive batches in sampling order
+                queue_depth = len(pending)
+                start_time = time.perf_counter()
+                data = pending.popleft().result()
+                self._queue_statistics.update(
+                    queue_depth, data, time.perf_counter() - start_time)
+
+                self._num_batches += 1
+                start_time = time.perf_counter()
+                yield data
+                self._queue_statistics.consumer_time += \
+                    time.perf_counter() - start_time
+
+        finally:
+            self._discard_batches(pending)
+
+            if not self._persistent_workers:
+                self.shutdown()
+
+    def __del__(self):
+        # attribute might not exist if __init__ failed
+        if getattr(self, "_executor", None) is not None:
+            self._executor.shutdown(wait=False)
+
+
+class _AsyncAugmenter(_ThreadedAugmenter):
+    """
+    An Augmenter for I/O-bound datasets (e.g. on network filesystems or
+    object stores), where the throughput is limited by the latency of each
+    read. The samples of all enqueued batches are requested concurrently by
+    :meth:`AbstractDataset.aget` on an event loop running in a background
+    thread and the loaded batches are passed to a pool of threads for the
+    transforms
+
+    Notes
+    -----
+    All threads share the global random states of ``numpy.random`` and
+    ``random``. Random transforms are therefore only reproducible, if they
+    do not rely on these global states.
+
+    """
+
+    def __init__(self, data_loader, batchsize, sampler, num_threads=None,
+                 transforms=None, seed=1, drop_last=False,
+                 persistent_workers=False, prefetch_factor=2,
+                 max_concurrency=64):
+        """
+        Parameters
+        ----------
+        data_loader : :class:`DataLoader`
+            the dataloader, loading samples for given indices; must not reuse
+            its output buffers
+        batchsize : int
+            the batchsize to use for sampling
+        sampler : :class:`AbstractSampler`
+            the sampler_old (may be batch sampler_old or usual sampler_old),
+            defining the actual sampling strategy; Is an iterable yielding
+            indices
+        num_threads : int
+            the number of threads to use for the transforms; if None: the
+            number of available CPUs will be used as number of threads
+        transforms : :class:`collections.Callable`
+            the transforms to apply; defaults to None
+        seed : int
+            the basic seed; default: 1
+        drop_last : bool
+            whether to drop the last (possibly smaller) batch or not
+        persistent_workers : bool
+            whether to keep the event loop and the threads alive after an
+            iteration has finished and reuse them for subsequent iterations
+        prefetch_factor : int
+            the number of batches to enqueue per thread in advance
+        max_concurrency : int
+            the maximum number of samples, which are loaded concurrently
+            (across all enqueued batches)
+
+        Raises
+        ------
+        ValueError
+            if the data loader reuses its output buffers or
+            ``max_concurrency`` is smaller than 1
+
+        """
+        super().__init__(data_loader, batchsize, sampler,
+                         num_threads=num_threads, transforms=transforms,
+                         seed=seed, drop_last=drop_last,
+                         persistent_workers=persistent_workers,
+                         prefetch_factor=prefetch_factor)
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1, but got %d"
+                             % max_concurrency)
+
+        self._max_concurrency = max_concurrency
+        self._loop = None
+        self._loop_thread = None
+        self._semaphore = None
+
+    def _start_workers(self):
+        """
+        Starts the threads and the event loop (if not already running)
+        """
+        super()._start_workers()
+
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            # the semaphore must be created by the running loop
+            self._semaphore = None
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, daemon=True)
+            self._loop_thread.start()
+
+    def _submit_batch(self, idxs):
+        """
+        Submits a single batch for loading on the event loop and
+        transformation by the threads afterwards
+
+        Parameters
+        ----------
+        idxs : list or :class:`numpy.ndarray`
+            the sample indices of the batch
+
+        Returns
+        -------
+        :class:`concurrent.futures.Future`
+            the future holding the batch
+
+        """
+        return asyncio.run_coroutine_threadsafe(self._aload_batch(idxs),
+                                                self._loop)
+
+    async def _aload_batch(self, idxs):
+        """
+        Loads a single batch concurrently and transforms it afterwards
+        (executed on the event loop)
+
+        Parameters
+        ----------
+        idxs : list or :class:`numpy.ndarray`
+            the sample indices of the batch
+
+        Returns
+        -------
+        dict
+            the batch
+
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        data = await self._data_loader.aload(idxs, self._semaphore)
+
+        if self._transforms is None:
+            return data
+
+        return await self._loop.run_in_executor(
+            self._executor, functools.partial(self._transforms, **data))
+
+    def _discard_batches(self, futures):
+        """
+        Discards batches, which will not be yielded (e.g. because the
+        iteration was stopped early), by waiting for them. They are not
+        cancelled to avoid unfinished tasks when the event loop is stopped
+
+        Parameters
+        ----------
+        futures : iterable
+            the futures of the discarded batches
+
+        """
+        concurrent.futures.wait(futures)
+
+    def shutdown(self):
+        """
+        Stops the event loop and shuts down the threads (if running)
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+            self._loop = None
+            self._loop_thread = None
+
+        super().shutdown()
+
+    def __del__(self):
+        # attribute might not exist if __init__ failed
+        if getattr(self, "_loop", None) is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+        super().__del__()
+
+
 class Augmenter(object):
     """
-    The actual Augmenter wrapping the :class:`_SequentialAugmenter` and the
-    :class:`_ParallelAugmenter` and switches between them by arguments and
+    The actual Augmenter wrapping the :class:`_SequentialAugmenter`, the
+    :class:`_ParallelAugmenter`, the :class:`_ThreadedAugmenter` and the
+    :class:`_AsyncAugmenter` and switches between them by arguments and
     debug mode
     """
 
     def __init__(self, data_loader, batchsize, sampler, num_processes=None,
-                 transforms=None, seed=1, drop_last=False):
+                 transforms=None, seed=1, drop_last=False,
+                 shared_memory=False, shared_memory_slot_size=2 ** 26,
+                 ordered=True, reorder_window=None, persistent_workers=False,
+                 prefetch_factor=2, max_queued_bytes=None, backend="process",
+                 max_concurrency=64):
         """
         Parameters
         ----------
@@ -458,36 +1552,116 @@ class Augmenter(object):
             defining the actual sampling strategy; Is an iterable yielding
             indices
         num_processes : int
-            the number of processes to use for dataloading + augmentation;
-            if None: the number of available CPUs will be used as number of
-            processes
+            the number of processes (or threads) to use for dataloading +
+            augmentation; if None: the number of available CPUs will be used
+            as number of processes
         transforms : :class:`collections.Callable`
             the transforms to apply; defaults to None
         seed : int
             the basic seed; default: 1
         drop_last : bool
             whether to drop the last (possibly smaller) batch or not
+        shared_memory : bool
+            whether to transfer the batches from the workers via shared memory
+            instead of pickling them through pipes; only used for
+            process-based augmentation; requires python >= 3.8
+        shared_memory_slot_size : int
+            the size (in bytes) of each shared memory slot; default: 64 MB
+        ordered : bool
+            whether to yield the batches in sampling order; if False, the
+            batches are yielded as soon as they are ready; only used for
+            process-based augmentation
+        reorder_window : int
+            only used if ``ordered`` is False; if given, the batches are
+            assigned to the least loaded workers but still yielded in
+            sampling order with at most ``reorder_window`` batches being
+            processed ahead
+        persistent_workers : bool
+            whether to keep the augmentation processes (or threads) alive
+            between iterations; if True, they must be shut down by
+            :meth:`Augmenter.shutdown` or are shut down on garbage collection
+        prefetch_factor : int
+            the number of batches to enqueue per process (or thread) in
+            advance; only used for parallel augmentation
+        max_queued_bytes : int
+            the maximum (estimated) number of bytes, the enqueued batches may
+            occupy; if None: the queue is only limited by
+            ``prefetch_factor``; only used for process-based augmentation
+        backend : str
+            the backend to use for parallel augmentation. Must be one of
+
+                * 'process' : load and augment the batches in separate
+                  processes
+                * 'thread' : load and augment the batches in threads
+                  sharing the data loader, which avoids pickling the batches
+                  but only runs in parallel, if the loading and transforms
+                  release the GIL
+                * 'async' : load the samples of all enqueued batches
+                  concurrently on an event loop (see
+                  :meth:`AbstractDataset.aget`) and transform them in
+                  threads; suited for I/O-bound datasets
+
+        max_concurrency : int
+            the maximum number of samples, which are loaded concurrently;
+            only used for the 'async' backend
+
+
+        Warnings
+        --------
+        If ``shared_memory`` is enabled, the yielded arrays are views to a
+        shared memory slot, which will be reused as soon as the next batch is
+        requested. Copy the arrays explicitly, if you need to keep them any
+        longer.
+
         """
 
-        self._augmenter = self._resolve_augmenter_cls(num_processes,
-                                                      data_loader=data_loader,
-                                                      batchsize=batchsize,
-                                                      sampler=sampler,
-                                                      transforms=transforms,
-                                                      seed=seed,
-                                                      drop_last=drop_last)
+        parallel_kwargs = {
+            "shared_memory": shared_memory,
+            "shared_memory_slot_size": shared_memory_slot_size,
+            "ordered": ordered,
+            "reorder_window": reorder_window,
+            "persistent_workers": persistent_workers,
+            "prefetch_factor": prefetch_factor,
+            "max_queued_bytes": max_queued_bytes,
+        }
+
+        self._augmenter = self._resolve_augmenter_cls(
+            num_processes,
+            backend=backend,
+            parallel_kwargs=parallel_kwargs,
+            async_kwargs={"max_concurrency": max_concurrency},
+            data_loader=data_loader,
+            batchsize=batchsize,
+            sampler=sampler,
+            transforms=transforms,
+            seed=seed,
+            drop_last=drop_last)
 
     @staticmethod
-    def _resolve_augmenter_cls(num_processes, **kwargs):
+    def _resolve_augmenter_cls(num_processes, backend="process",
+                               parallel_kwargs=None, async_kwargs=None,
+                               **kwargs):
         """
-        Resolves the augmenter class by the number of specified processes and
-        the debug mode and creates an instance of the chosen class
+        Resolves the augmenter class by the number of specified processes,
+        the backend and the debug mode and creates an instance of the chosen
+        class
         Parameters
         ----------
         num_processes : int
-            the number of processes to use for dataloading + augmentation;
-            if None: the number of available CPUs will be used as number of
-            processes
+            the number of processes (or threads) to use for dataloading +
+            augmentation; if None: the number of available CPUs will be used
+            as number of processes
+        backend : str
+            the backend to use for parallel augmentation; must be one of
+            'process', 'thread' and 'async'
+        parallel_kwargs : dict
+            additional keyword arguments, which are only used for
+            instantiation of the :class:`_ParallelAugmenter`; the
+            :class:`_ThreadedAugmenter` and the :class:`_AsyncAugmenter` only
+            use ``persistent_workers`` and ``prefetch_factor``
+        async_kwargs : dict
+            additional keyword arguments, which are only used for
+            instantiation of the :class:`_AsyncAugmenter`
         **kwargs :
             additional keyword arguments, used for instantiation of the chosen
             class
@@ -495,10 +1669,116 @@ class Augmenter(object):
         -------
         :class:`AbstractAugmenter`
             an instance of the chosen augmenter class
+        Raises
+        ------
+        ValueError
+            if an invalid backend is given
         """
+        if backend not in ("process", "thread", "async"):
+            raise ValueError("Invalid backend given: %s. Must be one of "
+                             "'process', 'thread', 'async'" % str(backend))
+
+        if parallel_kwargs is None:
+            parallel_kwargs = {}
+
+        if async_kwargs is None:
+            async_kwargs = {}
+
         if get_current_debug_mode() or num_processes == 0:
             return _SequentialAugmenter(**kwargs)
-        return _ParallelAugmenter(num_processes=num_processes, **kwargs)
+
+        threaded_kwargs = {
+            key: parallel_kwargs[key]
+            for key in ("persistent_workers", "prefetch_factor")
+            if key in parallel_kwargs}
+
+        if backend == "thread":
+            return _ThreadedAugmenter(num_threads=num_processes,
+                                      **threaded_kwargs, **kwargs)
+
+        if backend == "async":
+            return _AsyncAugmenter(num_threads=num_processes,
+                                   **threaded_kwargs, **async_kwargs,
+                                   **kwargs)
+
+        return _ParallelAugmenter(num_processes=num_processes,
+                                  **parallel_kwargs, **kwargs)
+
+    def reset(self, sampler, batchsize, seed=1, drop_last=False):
+        """
+        Sets a new sampler and seed for the next iteration without restarting
+        any (persistent) augmentation processes
+
+        Parameters
+        ----------
+        sampler : :class:`AbstractSampler`
+            the sampler_old (may be batch sampler_old or usual sampler_old),
+            defining the actual sampling strategy; Is an iterable yielding
+            indices
+        batchsize : int
+            the batchsize to use for sampling
+        seed : int
+            the basic seed; default: 1
+        drop_last : bool
+            whether to drop the last (possibly smaller) batch or not
+
+        """
+        self._augmenter.reset(sampler, batchsize, seed, drop_last)
+
+    def state_dict(self):
+        """
+        Returns the current state to resume the iteration later on (after
+        the last yielded batch)
+
+        Returns
+        -------
+        dict
+            the state containing the seed, the number of batches yielded in
+            the current epoch, the sampler's state and the states of the
+            random number generators
+
+        """
+        return self._augmenter.state_dict()
+
+    def load_state_dict(self, state_dict):
+        """
+        Loads a state returned by :meth:`Augmenter.state_dict`. The next
+        iteration skips all batches, which have already been yielded before
+        saving the state
+
+        Parameters
+        ----------
+        state_dict : dict
+            the state to load
+
+        """
+        self._augmenter.load_state_dict(state_dict)
+
+    def shutdown(self):
+        """
+        Shuts down all augmentation processes or threads (if any)
+        """
+        self._augmenter.shutdown()
+
+    @property
+    def queue_statistics(self):
+        """
+        Property returning statistics about the batches queued for the
+        augmentation processes (or threads) during the current (or last)
+        iteration. Empty for sequential augmentation
+
+        Returns
+        -------
+        dict
+            the statistics containing the number of received batches
+            (``num_batches``), the average and maximum number of enqueued
+            batches (``mean_queue_depth``, ``max_queue_depth``), the average
+            batch size in bytes (``mean_batch_bytes``), the total time spent
+            waiting for the processes (``wait_time``) and the total time
+            spent by the consumer between two batches (``consumer_time``)
+
+        """
+        return self._augmenter.queue_statistics
 
     def __iter__(self):
         """
@@ -1,7 +1,9 @@
+import asyncio
+
 import numpy as np
 from delira.data_loading.dataset import AbstractDataset, DictDataset, \
     IterableDataset
-from collections import Iterable, defaultdict
+from collections import Iterable
 
 
 class DataLoader:
@@ -10,7 +12,8 @@ class DataLoader:
     combines it as batches
     """
 
-    def __init__(self, data):
+    def __init__(self, data, ragged_mode=None, pad_value=0,
+                 reuse_buffers=False):
         """
         Parameters
         ----------
@@ -18,7 +21,38 @@ class DataLoader:
             the data to use; Ideally this either is a dataset, an iterable or
             a dict, but in general, this must only be indexable, have a length
             and return a dict of arrays if indexed
+        ragged_mode : str
+            specifies how to combine the values of a key, if their shapes
+            differ between the samples of a batch. Must be one of
+
+                * None : return an object array of the values
+                * 'pad' : pad all values to the maximum shape
+                * 'list' : return a list of the values
+
+        pad_value : Any
+            the value to pad with, if ``ragged_mode`` is 'pad'
+        reuse_buffers : bool
+            whether to reuse the output arrays of the previous batch (if
+            shape and dtype allow it) instead of allocating new ones
+
+        Warnings
+        --------
+        If ``reuse_buffers`` is enabled, the returned arrays are overwritten
+        by the next call. This is safe for process-based parallel
+        augmentation (where the batches are copied to the main process), but
+        the arrays must be copied explicitly otherwise. It cannot be used
+        with thread-based augmentation.
+
         """
+        if ragged_mode not in (None, "pad", "list"):
+            raise ValueError("Invalid ragged_mode given: %s. Must be one of "
+                             "None, 'pad', 'list'" % str(ragged_mode))
+
+        self._ragged_mode = ragged_mode
+        self._pad_value = pad_value
+        self._reuse_buffers = reuse_buffers
+        self._buffers = {}
+
         self._process_id = None
         if isinstance(data, AbstractDataset):
             dataset = data
@@ -40,29 +74,249 @@ class DataLoader:
         Loads data for given indices and combines them to batches
         Parameters
         ----------
-        indices : list
-            a list of integers specifying the data indices
+        indices : list or :class:`numpy.ndarray`
+            the integers specifying the data indices
+        Returns
+        -------
+        dict
+            a dict of numpy arrays (specifying the batches)
+        """
+
+        # get data for all indices (with a single call to allow vectorized
+        # loading)
+        data = self.dataset.get_batch(indices)
+
+        return self._collate(data)
+
+    async def aload(self, indices, semaphore=None):
+        """
+        Loads data for given indices from a coroutine and combines them to
+        batches. All samples are requested concurrently by
+        :meth:`AbstractDataset.aget`
+
+        Parameters
+        ----------
+        indices : list or :class:`numpy.ndarray`
+            the integers specifying the data indices
+        semaphore : :class:`asyncio.Semaphore`
+            if given, each sample is loaded while holding this semaphore,
+            which limits the number of concurrent reads (also across
+            multiple batches sharing the semaphore)
+
+        Returns
+        -------
+        dict
+            a dict of numpy arrays (specifying the batches)
+
+        """
+        async def _load_sample(idx):
+            if semaphore is None:
+                return await self.dataset.aget(idx)
+
+            async with semaphore:
+                return await self.dataset.aget(idx)
+
+        samples = await asyncio.gather(*[_load_sample(idx)
+                                         for idx in indices])
+
+        return self._collate(list(samples))
+
+    def _collate(self, samples):
+        """
+        Combines a list of samples to a batch
+
+        Parameters
+        ----------
+        samples : list or dict
+            a list of dicts, each containing a single sample or a dict
+            mapping each key to the batched values (as
+            :class:`numpy.ndarray`) or a list of per-sample values
+
         Returns
         -------
         dict
             a dict of numpy arrays (specifying the batches)
+
+        """
+        # already batched by dataset
+        if isinstance(samples, dict):
+            return {key: self._collate_batched(key, val)
+                    for key, val in samples.items()}
+
+        # collect keys of all samples (while preserving their order)
+        keys = {}
+        for _sample in samples:
+            keys.update(dict.fromkeys(_sample.keys()))
+
+        return {key: self._collate_values(
+            key, [_sample[key] for _sample in samples if key in _sample])
+            for key in keys}
+
+    def _collate_batched(self, key, values):
+        """
+        Combines the values of a single key, which have already been
+        batched by the dataset
+
+        Parameters
+        ----------
+        key : str
+            the key, the values belong to
+        values : :class:`numpy.ndarray` or list
+            the batched values or a list of per-sample values
+
+        Returns
+        -------
+        :class:`numpy.ndarray` or list
+            the batched values
+
+        """
+        if not isinstance(values, np.ndarray):
+            return self._collate_values(key, list(values))
+
+        if not self._reuse_buffers or values.dtype.hasobject:
+            return values
+
+        batch = self._get_output_array(key, values.shape, values.dtype)
+        batch[...] = values
+        return batch
+
+    def _collate_values(self, key, values):
+        """
+        Combines the values of a single key to a batch
+
+        Parameters
+        ----------
+        key : str
+            the key, the values belong to
+        values : list
+            the values of all samples
+
+        Returns
+        -------
+        :class:`numpy.ndarray` or list
+            the batched values
+
+        """
+        first = values[0]
+
+        def _is_homogeneous(val):
+            return isinstance(val, np.ndarray) \
+                and val.shape == first.shape and val.dtype == first.dtype
+
+        # fast path: arrays of equal shapes and dtypes are written to a
+        # preallocated array
+        if isinstance(first, np.ndarray) and not first.dtype.hasobject \
+                and all([_is_homogeneous(val) for val in values[1:]]):
+            batch = self._get_output_array(key,
+                                           (len(values),) + first.shape,
+                                           first.dtype)
+            for idx, val in enumerate(values):
+                batch[idx] = val
+
+            return batch
+
+        if len(set([np.shape(val) for val in values])) > 1:
+            if self._ragged_mode == "list":
+                return list(values)
+
+            if self._ragged_mode == "pad":
+                return self._pad_values(key, values)
+
+            # numpy does not create object arrays from ragged values
+            # implicitly
+            batch = np.empty(len(values), dtype=object)
+            for idx, val in enumerate(values):
+                batch[idx] = val
+
+            return batch
+
+        return np.asarray(values)
+
+    def _pad_values(self, key, values):
+        """
+        Pads the values of a single key to their maximum shape and combines
+        them to a batch
+
+        Parameters
+        ----------
+        key : str
+            the key, the values belong to
+        values : list
+            the values of all samples
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            the padded batch
+
+        Raises
+        ------
+        ValueError
+            if the values have a different number of dimensions
+
         """
+        values = [np.asarray(val) for val in values]
+
+        if len(set([val.ndim for val in values])) > 1:
+            raise ValueError("Cannot pad values of key %s, since they have a "
+                             "different number of dimensions" % str(key))
 
-        # get data for all indices
-        data = [self.dataset[idx] for idx in indices]
+        max_shape = tuple(np.max([val.shape for val in values], axis=0))
 
-        data_dict = defaultdict(list)
+        batch = self._get_output_array(key, (len(values),) + max_shape,
+                                       np.result_type(*values))
+        batch[...] = self._pad_value
 
-        # concatenate dict entities by keys
-        for _result_dict in data:
-            for key, val in _result_dict.items():
-                data_dict[key].append(val)
+        for idx, val in enumerate(values):
+            batch[(idx,) + tuple([slice(0, _size)
+                                  for _size in val.shape])] = val
 
-        # convert list to numpy arrays
-        for key, val_list in data_dict.items():
-            data_dict[key] = np.asarray(val_list)
+        return batch
 
-        return data_dict
+    def _get_output_array(self, key, shape, dtype):
+        """
+        Returns an uninitialized array to write the batch of a single key to.
+        Reuses the array of the previous batch if possible and enabled
+
+        Parameters
+        ----------
+        key : str
+            the key, the array belongs to
+        shape : tuple
+            the shape of the array
+        dtype : :class:`numpy.dtype`
+            the dtype of the array
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            the output array
+
+        """
+        if not self._reuse_buffers:
+            return np.empty(shape, dtype=dtype)
+
+        buffer = self._buffers.get(key, None)
+
+        # buffer may also be used for smaller batches
+        if buffer is None or buffer.dtype != dtype \
+                or buffer.shape[1:] != shape[1:] \
+                or buffer.shape[0] < shape[0]:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buffer
+
+        return buffer[:shape[0]]
+
+    @property
+    def reuse_buffers(self):
+        """
+        A Property to access whether the output arrays are reused
+        Returns
+        -------
+        bool
+            whether the output arrays of the previous batch are reused
+        """
+        return self._reuse_buffers
 
     @property
     def process_id(self):
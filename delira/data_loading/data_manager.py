@@ -4,7 +4,8 @@ from batchgenerators.transforms import AbstractTransform
 
 from delira import get_current_debug_mode
 from delira.data_loading.data_loader import DataLoader
-from delira.data_loading.sampler import SequentialSampler, AbstractSampler
+from delira.data_loading.sampler import SequentialSampler, \
+    AbstractSampler, BatchSampler, ShardedSampler
 from delira.data_loading.augmenter import Augmenter
 from delira.data_loading.dataset import DictDataset, IterableDataset, \
     AbstractDataset
@@ -24,7 +25,12 @@ class DataManager(object):
     def __init__(self, data, batch_size, n_process_augmentation,
                  transforms, sampler_cls=SequentialSampler,
                  drop_last=False, data_loader_cls=None,
-                 **sampler_kwargs):
+                 shared_memory=False, shared_memory_slot_size=2 ** 26,
+                 ordered=True, reorder_window=None, persistent_workers=False,
+                 prefetch_factor=2, max_queued_bytes=None,
+                 data_loader_kwargs=None, batch_sampler_cls=None,
+                 batch_sampler_kwargs=None, backend="process",
+                 max_concurrency=64, **sampler_kwargs):
         """
 
         Parameters
@@ -35,7 +41,7 @@ class DataManager(object):
         batch_size : int
             Number of samples per batch
         n_process_augmentation : int
-            Number of processes for augmentations
+            Number of processes (or threads) for augmentations
         transforms :
             Data transformations for augmentation
         sampler_cls : AbstractSampler
@@ -44,6 +50,56 @@ class DataManager(object):
             whether to drop the last (possibly smaller) batch
         data_loader_cls : subclass of SlimDataLoaderBase
             DataLoader class
+        shared_memory : bool
+            whether to transfer the batches from the augmentation processes
+            via shared memory instead of pickling them; If enabled, the
+            arrays of each batch are only valid until the next batch is
+            requested
+        shared_memory_slot_size : int
+            the size (in bytes) of each shared memory slot; default: 64 MB
+        ordered : bool
+            whether to yield the batches in sampling order; if False, the
+            batches are yielded as soon as they are ready
+        reorder_window : int
+            only used if ``ordered`` is False; if given, the batches are
+            still yielded in sampling order, but at most ``reorder_window``
+            batches are processed ahead
+        persistent_workers : bool
+            whether to keep the augmentation processes alive and reuse them
+            for subsequent calls of :meth:`DataManager.get_batchgen`
+            (e.g. for multiple epochs). The processes are restarted if
+            any setting they depend on changes and can be shut down by
+            :meth:`DataManager.shutdown_workers`
+        prefetch_factor : int
+            the number of batches to enqueue per augmentation process in
+            advance
+        max_queued_bytes : int
+            the maximum (estimated) number of bytes, the enqueued batches may
+            occupy; if None: the queue is only limited by ``prefetch_factor``
+        data_loader_kwargs : dict
+            additional keyword arguments to create the data loader with
+            (e.g. how to combine samples of different shapes)
+        batch_sampler_cls : type
+            subclass of :class:`BatchSampler` to combine the sampled indices
+            to batches (e.g. :class:`BucketBatchSampler`); if None: the
+            indices are combined in sampling order. Note, that
+            :attr:`DataManager.n_batches` assumes batches in sampling order
+        batch_sampler_kwargs : dict
+            additional keyword arguments, passed to
+            ``batch_sampler_cls.from_dataset``
+        backend : str
+            the backend for parallel augmentation; 'process' runs the
+            augmentation in separate processes, 'thread' runs it in threads
+            sharing the data loader (without pickling the batches), which is
+            preferable if the loading and the transforms release the GIL.
+            'async' loads the samples of all enqueued batches concurrently on
+            an event loop (see :meth:`AbstractDataset.aget`) and transforms
+            them in threads, which is preferable for I/O-bound datasets.
+            Shared memory, reordering and the memory cap are only supported
+            by the 'process' backend
+        max_concurrency : int
+            the maximum number of samples, which are loaded concurrently by
+            the 'async' backend
         **sampler_kwargs :
             other keyword arguments (passed to sampler_cls)
 
@@ -54,6 +110,8 @@ class DataManager(object):
             `DataLoader`
         TypeError
             ``data`` is not a Dataset object and not of type dict or iterable
+        ValueError
+            ``backend`` is not one of 'process', 'thread' and 'async'
 
         See Also
         --------
@@ -70,6 +128,26 @@ class DataManager(object):
         self._data_loader_cls = None
         self._sampler = None
         self.drop_last = drop_last
+        self.shared_memory = shared_memory
+        self.shared_memory_slot_size = shared_memory_slot_size
+        self.ordered = ordered
+        self.reorder_window = reorder_window
+        self.persistent_workers = persistent_workers
+        self.prefetch_factor = prefetch_factor
+        self.max_queued_bytes = max_queued_bytes
+
+        if backend not in ("process", "thread", "async"):
+            raise ValueError("Invalid backend given: %s. Must be one of "
+                             "'process', 'thread', 'async'" % str(backend))
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+
+        if data_loader_kwargs is None:
+            data_loader_kwargs = {}
+        self.data_loader_kwargs = data_loader_kwargs
+        self._persistent_augmenter = None
+        self._persistent_worker_config = None
+        self._batch_sampler_len = None
 
         # set actual values to properties
         self.batch_size = batch_size
@@ -100,14 +178,33 @@ class DataManager(object):
         self.sampler_cls = sampler_cls
         self.sampler_kwargs = sampler_kwargs
 
-    def get_batchgen(self, seed=1):
+        if batch_sampler_cls is not None:
+            if not (inspect.isclass(batch_sampler_cls) and issubclass(
+                    batch_sampler_cls, BatchSampler)):
+                raise TypeError("batch_sampler_cls must be a subclass of "
+                                "BatchSampler")
+
+        if batch_sampler_kwargs is None:
+            batch_sampler_kwargs = {}
+        self.batch_sampler_cls = batch_sampler_cls
+        self.batch_sampler_kwargs = batch_sampler_kwargs
+
+    def get_batchgen(self, seed=1, batch_size=None, drop_last=None):
         """
         Create DataLoader and Batchgenerator
 
         Parameters
         ----------
         seed : int
-            seed for Random Number Generator
+            seed for Random Number Generator; also set as epoch of a
+            :class:`ShardedSampler`
+        batch_size : int
+            the batchsize to use for this batchgenerator only; if None:
+            :attr:`DataManager.batch_size` will be used
+        drop_last : bool
+            whether to drop the last (possibly smaller) batch for this
+            batchgenerator only; if None: :attr:`DataManager.drop_last` will
+            be used
 
         Returns
         -------
@@ -117,27 +214,169 @@ class DataManager(object):
         Raises
         ------
         AssertionError
-            :attr:`DataManager.n_batches` is smaller than or equal to zero
+            the number of batches is smaller than or equal to zero
 
         """
-        assert self.n_batches > 0
+        if batch_size is None:
+            batch_size = self.batch_size
+        if drop_last is None:
+            drop_last = self.drop_last
 
         data_loader = self.data_loader_cls(
-            self.data
+            self.data, **self.data_loader_kwargs
         )
 
-        sampler = self.sampler_cls.from_dataset(data_loader.dataset,
+        sampler = self._create_sampler(data_loader.dataset, seed, batch_size,
+                                       drop_last)
+
+        if self.batch_sampler_cls is not None:
+            self._batch_sampler_len = (
+                self._batch_sampler_config(batch_size, drop_last),
+                len(sampler))
+            assert len(sampler) > 0
+        else:
+            assert self.get_n_batches(batch_size, drop_last) > 0
+
+        if self.persistent_workers:
+            # all settings the workers depend on. The objects are referenced
+            # by the persistent augmenter, so their ids cannot be reused
+            worker_config = (id(self.data), id(self.transforms),
+                             self.data_loader_cls,
+                             tuple(sorted(self.data_loader_kwargs.items())),
+                             self.n_process_augmentation,
+                             self.shared_memory, self.shared_memory_slot_size,
+                             self.ordered, self.reorder_window,
+                             self.prefetch_factor, self.max_queued_bytes,
+                             self.backend, self.max_concurrency)
+
+            if self._persistent_augmenter is not None:
+                if worker_config == self._persistent_worker_config:
+                    self._persistent_augmenter.reset(
+                        sampler, batch_size, seed, drop_last)
+                    return self._persistent_augmenter
+
+                self.shutdown_workers()
+
+            self._persistent_worker_config = worker_config
+            self._persistent_augmenter = self._create_augmenter(
+                data_loader, sampler, seed, batch_size, drop_last)
+            return self._persistent_augmenter
+
+        return self._create_augmenter(data_loader, sampler, seed, batch_size,
+                                      drop_last)
+
+    def _create_sampler(self, dataset, seed, batch_size, drop_last):
+        """
+        Creates the sampler (wrapped by the batch sampler, if specified)
+
+        Parameters
+        ----------
+        dataset : :class:`AbstractDataset`
+            the dataset to sample from
+        seed : int
+            seed for Random Number Generator; also set as epoch of a
+            :class:`ShardedSampler`
+        batch_size : int
+            the batchsize to use
+        drop_last : bool
+            whether to drop the last (possibly smaller) batch
+
+        Returns
+        -------
+        :class:`AbstractSampler` or :class:`BatchSampler`
+            the created sampler
+
+        """
+        sampler = self.sampler_cls.from_dataset(dataset,
                                                 **self.sampler_kwargs)
 
+        # the sampler is created for each batchgenerator, thus the epoch
+        # (given by the seed) has to be set to draw different samples
+        if isinstance(sampler, ShardedSampler):
+            sampler.set_epoch(seed)
+
+        if self.batch_sampler_cls is not None:
+            sampler = self.batch_sampler_cls.from_dataset(
+                dataset, sampler, batch_size, drop_last=drop_last,
+                **self.batch_sampler_kwargs)
+
+        return sampler
+
+    def _batch_sampler_config(self, batch_size, drop_last):
+        """
+        Returns all settings the length of the batch sampler depends on
+
+        Parameters
+        ----------
+        batch_size : int
+            the batchsize to use
+        drop_last : bool
+            whether to drop the last (possibly smaller) batch
+
+        Returns
+        -------
+        tuple
+            the objects (to be compared by identity) and the batchsize and
+            ``drop_last`` (to be compared by value)
+
+        """
+        return ((self.data, self.data_loader_cls, self.data_loader_kwargs,
+                 self.sampler_cls, self.sampler_kwargs,
+                 self.batch_sampler_cls, self.batch_sampler_kwargs),
+                batch_size, drop_last)
+
+    def _create_augmenter(self, data_loader, sampler, seed, batch_size,
+                          drop_last):
+        """
+        Creates a new Augmenter with the current settings
+
+        Parameters
+        ----------
+        data_loader : :class:`DataLoader`
+            the data loader to use
+        sampler : :class:`AbstractSampler`
+            the sampler to use
+        seed : int
+            seed for Random Number Generator
+        batch_size : int
+            the batchsize to use
+        drop_last : bool
+            whether to drop the last (possibly smaller) batch
+
+        Returns
+        -------
+        Augmenter
+            the created augmenter
+
+        """
         return Augmenter(data_loader=data_loader,
-                         batchsize=self.batch_size,
+                         batchsize=batch_size,
                          sampler=sampler,
                          num_processes=self.n_process_augmentation,
                          transforms=self.transforms,
                          seed=seed,
-                         drop_last=self.drop_last
+                         drop_last=drop_last,
+                         shared_memory=self.shared_memory,
+                         shared_memory_slot_size=self.shared_memory_slot_size,
+                         ordered=self.ordered,
+                         reorder_window=self.reorder_window,
+                         persistent_workers=self.persistent_workers,
+                         prefetch_factor=self.prefetch_factor,
+                         max_queued_bytes=self.max_queued_bytes,
+                         backend=self.backend,
+                         max_concurrency=self.max_concurrency
                          )
 
+    def shutdown_workers(self):
+        """
+        Shuts down the persistent augmentation processes (if any)
+        """
+        if self._persistent_augmenter is not None:
+            self._persistent_augmenter.shutdown()
+
+        self._persistent_augmenter = None
+        self._persistent_worker_config = None
+
     def get_subset(self, indices):
         """
         Returns a Subset of the current datamanager based on given indices
@@ -161,6 +400,18 @@ class DataManager(object):
             "sampler_cls": self.sampler_cls,
             "data_loader_cls": self.data_loader_cls,
             "drop_last": self.drop_last,
+            "shared_memory": self.shared_memory,
+            "shared_memory_slot_size": self.shared_memory_slot_size,
+            "ordered": self.ordered,
+            "reorder_window": self.reorder_window,
+            "persistent_workers": self.persistent_workers,
+            "prefetch_factor": self.prefetch_factor,
+            "max_queued_bytes": self.max_queued_bytes,
+            "data_loader_kwargs": self.data_loader_kwargs,
+            "batch_sampler_cls": self.batch_sampler_cls,
+            "batch_sampler_kwargs": self.batch_sampler_kwargs,
+            "backend": self.backend,
+            "max_concurrency": self.max_concurrency,
             **self.sampler_kwargs
         }
 
@@ -370,13 +621,74 @@ class DataManager(object):
             :attr:`DataManager.n_samples` is smaller than or equal to zero
 
         """
+        return self.get_n_batches()
+
+    def get_n_batches(self, batch_size=None, drop_last=None):
+        """
+        Returns Number of Batches based on a given batchsize and number of
+        samples (or the length of the batch sampler, if specified)
+
+        Parameters
+        ----------
+        batch_size : int
+            the batchsize; if None: :attr:`DataManager.batch_size` will be
+            used
+        drop_last : bool
+            whether the last (possibly smaller) batch is dropped; if None:
+            :attr:`DataManager.drop_last` will be used
+
+        Returns
+        -------
+        int
+            Number of Batches
+
+        Raises
+        ------
+        AssertionError
+            :attr:`DataManager.n_samples` is smaller than or equal to zero
+
+        """
+        if batch_size is None:
+            batch_size = self.batch_size
+        if drop_last is None:
+            drop_last = self.drop_last
+
+        # batch samplers may create additional batches (e.g. per bucket).
+        # Creating them may require to load all samples, thus their length
+        # is cached until the settings are replaced
+        if self.batch_sampler_cls is not None:
+            config = self._batch_sampler_config(batch_size, drop_last)
+
+            cached = self._batch_sampler_len
+            if cached is None or config[1:] != cached[0][1:] or not all(
+                    [new is old for new, old in
+                     zip(config[0], cached[0][0])]):
+                data_loader = self.data_loader_cls(self.data,
+                                                   **self.data_loader_kwargs)
+                self._batch_sampler_len = (
+                    config, len(self._create_sampler(data_loader.dataset, 1,
+                                                     batch_size, drop_last)))
+
+            return self._batch_sampler_len[1]
+
         assert self.n_samples > 0
 
-        n_batches = self.n_samples // self.batch_size
+        n_samples = self.n_samples
+
+        # only the shard of the current process is sampled
+        if issubclass(self.sampler_cls, ShardedSampler):
+            world_size = self.sampler_kwargs.get("world_size", 1)
+
+            if self.sampler_kwargs.get("pad", True):
+                n_samples = -(-n_samples // world_size)
+            else:
+                n_samples = n_samples // world_size
+
+        n_batches = n_samples // batch_size
 
-        truncated_batch = self.n_samples % self.batch_size
+        truncated_batch = n_samples % batch_size
 
-        n_batches += int(bool(truncated_batch) and not self.drop_last)
+        n_batches += int(bool(truncated_batch) and not drop_last)
 
         return n_batches
 
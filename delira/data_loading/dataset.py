@@ -1,6 +1,18 @@
 import abc
+import asyncio
+import bisect
+import concurrent.futures
+import functools
+import hashlib
+import itertools
+import json
+import logging
 import os
+import pickle
+import sys
+import threading
 import typing
+from collections import OrderedDict, deque
 
 import numpy as np
 from skimage.transform import resize
@@ -8,8 +20,11 @@ from sklearn.model_selection import train_test_split
 from collections import Iterable
 from tqdm import tqdm
 
+from delira.data_loading.load_utils import call_async, call_sync
 from delira.utils import subdirs
 
+logger = logging.getLogger(__name__)
+
 
 class AbstractDataset:
     """
@@ -78,6 +93,68 @@ class AbstractDataset:
         """
         return len(self.data)
 
+    def get_batch(self, indices):
+        """
+        Returns the data for multiple indices at once. Per default this
+        loads each sample separately, but can be overwritten in subclasses
+        to load a whole batch with a single (vectorized) read
+
+        Parameters
+        ----------
+        indices : list or :class:`numpy.ndarray`
+            the indices of the samples to load
+
+        Returns
+        -------
+        list or dict
+            either a list containing a dict per sample or a dict mapping
+            each key to the batched values (as a :class:`numpy.ndarray`) or
+            a list of per-sample values
+
+        """
+        return [self[idx] for idx in indices]
+
+    async def aget(self, index):
+        """
+        Returns the data with given index from a coroutine, which allows
+        many samples to be loaded concurrently on a single event loop. Per
+        default this executes :meth:`__getitem__` in the event loop's
+        default executor, but can be overwritten in subclasses to load the
+        data with asynchronous I/O
+
+        Parameters
+        ----------
+        index : int
+            index of data
+
+        Returns
+        -------
+        dict
+            data
+
+        """
+        return await asyncio.get_event_loop().run_in_executor(
+            None, self.__getitem__, index)
+
+    def get_labels(self, key="label"):
+        """
+        Returns the values of a single key (typically the label) for all
+        samples. Per default this loads all samples, but can be overwritten
+        in subclasses to provide the values without loading the samples
+
+        Parameters
+        ----------
+        key : str
+            the key to return the values for
+
+        Returns
+        -------
+        list or :class:`numpy.ndarray`
+            the values of all samples
+
+        """
+        return [self[idx][key] for idx in range(len(self))]
+
     def __iter__(self):
         """
         Return an iterator for the dataset
@@ -212,6 +289,51 @@ class DictDataset(AbstractDataset):
         """
         return {k: v[index] for k, v in self._data.items()}
 
+    def get_batch(self, indices):
+        """
+        Returns the data for multiple indices at once by a single
+        :func:`numpy.take` per key (if the values are numpy arrays)
+
+        Parameters
+        ----------
+        indices : list or :class:`numpy.ndarray`
+            the indices of the samples to load
+
+        Returns
+        -------
+        dict
+            a dict mapping each key to the batched values
+
+        """
+        # subclasses may have altered the per-sample behavior
+        if type(self).__getitem__ is not DictDataset.__getitem__:
+            return super().get_batch(indices)
+
+        return {k: np.take(v, indices, axis=0) if isinstance(v, np.ndarray)
+                else [v[idx] for idx in indices]
+                for k, v in self._data.items()}
+
+    def get_labels(self, key="label"):
+        """
+        Returns the values of a single key for all samples
+
+        Parameters
+        ----------
+        key : str
+            the key to return the values for
+
+        Returns
+        -------
+        list or :class:`numpy.ndarray`
+            the values of all samples
+
+        """
+        # subclasses may have altered the per-sample behavior
+        if type(self).__getitem__ is not DictDataset.__getitem__:
+            return super().get_labels(key)
+
+        return self._data[key]
+
     def get_sample_from_index(self, index):
         """
         Mapping from index to sample
@@ -388,185 +510,382 @@ class BlankDataset(AbstractDataset):
         return len(self.data)
 
 
-class BaseCacheDataset(AbstractDataset):
+class _MemoryMappedCache(object):
     """
-    Dataset to preload and cache data
-
-    Notes
-    -----
-    data needs to fit completely into RAM!
+    Columnar on-disk storage of data samples. The values of each key are
+    stored in a separate raw file, which is memory-mapped on access, so that
+    multiple processes share the pages via the OS page cache. Values of
+    varying shapes are described by an additional index of shapes.
+    Non-array values (like strings) are pickled and kept in memory.
 
     """
+    _INDEX_FILE = "index.json"
+    _OBJECT_FILE = "objects.pkl"
 
-    def __init__(self, data_path: typing.Union[str, list],
-                 load_fn: typing.Callable, **load_kwargs):
+    def __init__(self, directory):
         """
 
         Parameters
         ----------
-        data_path : str or list
-            if data_path is a string, _sample_fn is called for all items inside
-            the specified directory
-            if data_path is a list, _sample_fn is called for elements in the
-            list
-        load_fn : function
-            function to load a single data sample
-        **load_kwargs :
-            additional loading keyword arguments (image shape,
-            channel number, ...); passed to _sample_fn
+        directory : str
+            the directory containing a cache written by
+            :meth:`_MemoryMappedCache.create`
 
         """
-        super().__init__(data_path, load_fn)
-        self._load_kwargs = load_kwargs
-        self.data = self._make_dataset(data_path)
+        self._directory = directory
 
-    def _make_dataset(self, path: typing.Union[str, list]):
+        with open(os.path.join(directory, self._INDEX_FILE)) as f:
+            index = json.load(f)
+
+        self._num_samples = index["num_samples"]
+        self._keys = []
+        self._arrays = {}
+        self._offsets = {}
+        self._shapes = {}
+        self._objects = {}
+
+        if index["has_objects"]:
+            with open(os.path.join(directory, self._OBJECT_FILE), "rb") as f:
+                self._objects = pickle.load(f)
+
+        for column_idx, column in enumerate(index["columns"]):
+            key = column["key"]
+            self._keys.append(key)
+
+            if column["kind"] == "object":
+                continue
+
+            dtype = np.dtype(column["dtype"])
+
+            if column["kind"] == "fixed":
+                shape = (self._num_samples,) + tuple(column["shape"])
+            else:
+                shapes = np.load(os.path.join(
+                    directory, "column_%d_shapes.npy" % column_idx))
+                sizes = np.prod(shapes, axis=1, dtype=np.int64)
+                self._shapes[key] = [tuple(_shape) for _shape in shapes]
+                self._offsets[key] = np.concatenate([[0],
+                                                     np.cumsum(sizes)])
+                shape = (int(self._offsets[key][-1]),)
+
+            self._arrays[key] = self._map_file(
+                os.path.join(directory, "column_%d.bin" % column_idx),
+                dtype, shape)
+
+    @staticmethod
+    def _map_file(file, dtype, shape):
         """
-        Helper Function to make a dataset containing all samples in a certain
-        directory
+        Maps a raw file into memory (copy-on-write to leave the file
+        untouched)
 
         Parameters
         ----------
-        path: str or list
-            if data_path is a string, _sample_fn is called for all items inside
-            the specified directory
-            if data_path is a list, _sample_fn is called for elements in the
-            list
+        file : str
+            the file to map
+        dtype : :class:`numpy.dtype`
+            the dtype of the stored values
+        shape : tuple
+            the shape of the stored array
 
         Returns
         -------
-        list
-            list of items which where returned from _sample_fn (typically dict)
+        :class:`numpy.ndarray`
+            the mapped array
 
-        Raises
-        ------
-        AssertionError
-            if `path` is not a list and is not a valid directory
+        """
+        # empty files cannot be mapped
+        if not np.prod(shape) or not dtype.itemsize:
+            return np.empty(shape, dtype=dtype)
+
+        return np.memmap(file, dtype=dtype, mode="c", shape=shape)
 
+    @classmethod
+    def exists(cls, directory, fingerprint=None):
         """
-        data = []
-        if isinstance(path, list):
-            # iterate over all elements
-            for p in tqdm(path, unit='samples', desc="Loading samples"):
-                data.append(self._load_fn(p, **self._load_kwargs))
-        else:
-            # call _sample_fn for all elements inside directory
-            assert os.path.isdir(path), '%s is not a valid directory' % path
-            for p in tqdm(os.listdir(path), unit='samples',
-                          desc="Loading samples"):
-                data.append(self._load_fn(os.path.join(path, p),
-                                          **self._load_kwargs))
-        return data
+        Checks whether a complete cache exists in the given directory
+
+        Parameters
+        ----------
+        directory : str
+            the directory to check
+        fingerprint : str
+            if given, the cache must have been created with the same
+            fingerprint
+
+        Returns
+        -------
+        bool
+            whether a complete (and matching) cache exists
 
-    def __getitem__(self, index):
         """
-        return data sample specified by index
+        index_file = os.path.join(directory, cls._INDEX_FILE)
+        if not os.path.isfile(index_file):
+            return False
+
+        if fingerprint is None:
+            return True
+
+        with open(index_file) as f:
+            return json.load(f).get("fingerprint") == fingerprint
+
+    @classmethod
+    def create(cls, directory, samples, fingerprint=None):
+        """
+        Writes the given samples to a new cache. The index is written last
+        (and atomically), which marks the cache as complete
 
         Parameters
         ----------
-        index : int
-            index to specifiy which data sample to return
+        directory : str
+            the directory to write the cache to
+        samples : iterable
+            the samples (dicts with identical keys) to write; they are
+            consumed one by one and only their non-array values are kept in
+            memory
+        fingerprint : str
+            identifies the source of the samples (see
+            :meth:`_MemoryMappedCache.exists`)
 
         Returns
         -------
-        dict
-            data sample
+        :class:`_MemoryMappedCache`
+            the opened cache
+
+        Raises
+        ------
+        ValueError
+            if the samples don't contain the same keys or the values of a
+            key differ in their number of dimensions
+        TypeError
+            if the samples contain non-string keys or values of a key cannot
+            be casted to a common dtype
 
         """
-        data_dict = self.get_sample_from_index(index)
-        return data_dict
+        os.makedirs(directory, exist_ok=True)
+        index_file = os.path.join(directory, cls._INDEX_FILE)
+
+        # invalidate a previous cache
+        if os.path.isfile(index_file):
+            os.remove(index_file)
+
+        columns = []
+        files = {}
+        shapes = {}
+        objects = {}
+        num_samples = 0
+
+        try:
+            for sample in samples:
+                if not columns:
+                    for key, val in sample.items():
+                        if not isinstance(key, str):
+                            raise TypeError("Only string keys can be "
+                                            "cached, but got %s"
+                                            % repr(key))
+
+                        dtype = np.asarray(val).dtype
+                        if dtype.hasobject or dtype.kind in "SUV":
+                            columns.append({"key": key, "kind": "object"})
+                            objects[key] = []
+                        else:
+                            files[key] = open(os.path.join(
+                                directory, "column_%d.bin" % len(columns)),
+                                "wb")
+                            columns.append({"key": key, "kind": "array",
+                                            "dtype": dtype.str})
+                            shapes[key] = []
+
+                if set(sample.keys()) != set(
+                        [column["key"] for column in columns]):
+                    raise ValueError("All samples need to contain the same "
+                                     "keys to be cached")
+
+                for column in columns:
+                    key = column["key"]
+
+                    if column["kind"] == "object":
+                        objects[key].append(sample[key])
+                        continue
+
+                    val = np.asarray(sample[key]).astype(column["dtype"],
+                                                         casting="same_kind",
+                                                         copy=False)
+                    files[key].write(np.ascontiguousarray(val).tobytes())
+                    shapes[key].append(val.shape)
+
+                num_samples += 1
+
+        finally:
+            for f in files.values():
+                f.close()
+
+        for column_idx, column in enumerate(columns):
+            if column["kind"] == "object":
+                continue
 
+            _shapes = shapes[column["key"]]
 
-class BaseLazyDataset(AbstractDataset):
-    """
-    Dataset to load data in a lazy way
+            if len(set(_shapes)) == 1:
+                column["kind"] = "fixed"
+                column["shape"] = list(_shapes[0])
+                continue
 
-    """
+            if len(set([len(_shape) for _shape in _shapes])) > 1:
+                raise ValueError("The values of key %s differ in their "
+                                 "number of dimensions" % column["key"])
 
-    def __init__(self, data_path: typing.Union[str, list],
-                 load_fn: typing.Callable, **load_kwargs):
+            column["kind"] = "ragged"
+            np.save(os.path.join(directory,
+                                 "column_%d_shapes.npy" % column_idx),
+                    np.array(_shapes, dtype=np.int64).reshape(
+                        num_samples, -1))
+
+        if objects:
+            with open(os.path.join(directory, cls._OBJECT_FILE), "wb") as f:
+                pickle.dump(objects, f)
+
+        with open(index_file + ".tmp", "w") as f:
+            json.dump({"num_samples": num_samples, "columns": columns,
+                       "has_objects": bool(objects),
+                       "fingerprint": fingerprint}, f)
+        os.replace(index_file + ".tmp", index_file)
+
+        return cls(directory)
+
+    def _get_value(self, key, index):
         """
+        Returns the value of a single key for a single sample
 
         Parameters
         ----------
-        data_path : str or list
-            if data_path is a string, _sample_fn is called for all items inside
-            the specified directory
-            if data_path is a list, _sample_fn is called for elements in the
-            list
-        load_fn : function
-            function to load single data sample
-        **load_kwargs :
-            additional loading keyword arguments (image shape,
-            channel number, ...); passed to _sample_fn
+        key : str
+            the key to return the value for
+        index : int
+            the sample index
+
+        Returns
+        -------
+        Any
+            the value
 
         """
-        super().__init__(data_path, load_fn)
-        self._load_kwargs = load_kwargs
-        self.data = self._make_dataset(self.data_path)
+        if key in self._objects:
+            return self._objects[key][index]
 
-    def _make_dataset(self, path: typing.Union[str, list]):
+        if key not in self._offsets:
+            return self._arrays[key][index]
+
+        return self._arrays[key][
+            self._offsets[key][index]:self._offsets[key][index + 1]
+        ].reshape(self._shapes[key][index])
+
+    def __getitem__(self, index):
         """
-        Helper Function to make a dataset containing paths to all images in a
-        certain directory
+        Returns a single sample
 
         Parameters
         ----------
-        path : str or list
-            path to data samples
+        index : int
+            the sample index
 
         Returns
         -------
-        list
-            list of sample paths
+        dict
+            the sample
 
         Raises
         ------
-        AssertionError
-            if `path` is not a valid directory
+        IndexError
+            if the index is out of range
 
         """
-        if isinstance(path, list):
-            # generate list from iterable
-            data = list(path)
-        else:
-            # generate list from all items
-            assert os.path.isdir(path), '%s is not a valid directory' % path
-            data = [os.path.join(path, p) for p in os.listdir(path)]
-        return data
+        if index < 0:
+            index += self._num_samples
 
-    def __getitem__(self, index):
+        if not 0 <= index < self._num_samples:
+            raise IndexError("Index %d is out of range for %d cached samples"
+                             % (index, self._num_samples))
+
+        return {key: self._get_value(key, index) for key in self._keys}
+
+    def get_batch(self, indices):
         """
-        load data sample specified by index
+        Returns multiple samples at once, reading arrays of fixed shape with
+        a single (vectorized) access
 
         Parameters
         ----------
-        index : int
-            index to specifiy which data sample to load
+        indices : list or :class:`numpy.ndarray`
+            the sample indices
 
         Returns
         -------
         dict
-            loaded data sample
+            a dict mapping each key to the batched values (for arrays of
+            fixed shapes) or a list of per-sample values
+
         """
-        data_dict = self._load_fn(self.get_sample_from_index(index),
-                                  **self._load_kwargs)
-        return data_dict
+        indices = np.asarray(indices, dtype=np.int64)
+        indices = np.where(indices < 0, indices + self._num_samples, indices)
 
+        if ((indices < 0) | (indices >= self._num_samples)).any():
+            raise IndexError("Indices out of range for %d cached samples"
+                             % self._num_samples)
 
-class BaseExtendCacheDataset(BaseCacheDataset):
+        batch = {}
+        for key in self._keys:
+            if key in self._arrays and key not in self._offsets:
+                batch[key] = np.asarray(self._arrays[key][indices])
+            else:
+                batch[key] = [self._get_value(key, idx) for idx in indices]
+
+        return batch
+
+    def get_column(self, key):
+        """
+        Returns the values of a single key for all samples
+
+        Parameters
+        ----------
+        key : str
+            the key to return the values for
+
+        Returns
+        -------
+        :class:`numpy.ndarray` or list
+            the values (as array for values of fixed shape)
+
+        """
+        if key in self._arrays and key not in self._offsets:
+            return np.asarray(self._arrays[key])
+
+        return [self._get_value(key, idx) for idx in range(len(self))]
+
+    def __len__(self):
+        return self._num_samples
+
+    def __getstate__(self):
+        # only pass the directory to other processes, the files are mapped
+        # again instead of copying their content
+        return {"directory": self._directory}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"])
+
+
+class BaseCacheDataset(AbstractDataset):
     """
-    Dataset to preload and cache data. Function to load sample is expected
-    to return an iterable which can contain multiple samples
+    Dataset to preload and cache data
 
     Notes
     -----
-    data needs to fit completely into RAM!
+    data needs to fit completely into RAM, if no ``cache_dir`` is given!
 
     """
 
     def __init__(self, data_path: typing.Union[str, list],
-                 load_fn: typing.Callable, **load_kwargs):
+                 load_fn: typing.Callable, cache_dir=None, num_workers=0,
+                 executor="thread", **load_kwargs):
         """
 
         Parameters
@@ -577,18 +896,110 @@ class BaseExtendCacheDataset(BaseCacheDataset):
             if data_path is a list, _sample_fn is called for elements in the
             list
         load_fn : function
-            function to load a multiple data samples at once. Needs to return
-            an iterable which extends the internal list.
+            function to load a single data sample
+        cache_dir : str
+            if given, all loaded samples are written once to a columnar,
+            memory-mapped cache inside this directory. If the directory
+            already contains such a cache, it is opened instead of loading
+            the samples. The cache is rebuilt, if it was created from a
+            different ``data_path``, ``load_fn`` or ``load_kwargs``.
+            The samples are written while they are loaded, thus only
+            non-array values (which are pickled) need to fit into RAM.
+            Cached samples must be dicts with identical string keys.
+            Default: None
+        num_workers : int
+            number of workers to load the samples in parallel (the order of
+            samples is preserved); 0 loads them in the main thread.
+            Default: 0
+        executor : str or :class:`concurrent.futures.Executor`
+            the executor type to use for parallel loading (either 'thread' or
+            'process') or an existing executor, which will not be shut down
+            afterwards. For 'process', ``load_fn`` and ``load_kwargs`` must
+            be picklable. Default: 'thread'
         **load_kwargs :
             additional loading keyword arguments (image shape,
             channel number, ...); passed to _sample_fn
 
-        See Also
-        --------
-        :class: `BaseCacheDataset`
+        """
+        super().__init__(data_path, load_fn)
+
+        if isinstance(executor, str) and executor not in ("thread",
+                                                          "process"):
+            raise ValueError("Invalid executor %s, must be one of "
+                             "'thread', 'process' or an instance of "
+                             "concurrent.futures.Executor" % executor)
+
+        self._load_kwargs = load_kwargs
+        self._cache_dir = cache_dir
+        self._num_workers = num_workers
+        self._executor = executor
+
+        fingerprint = self._cache_fingerprint(data_path, load_fn,
+                                              load_kwargs)
+
+        if cache_dir is not None and _MemoryMappedCache.exists(cache_dir,
+                                                               fingerprint):
+            self.data = _MemoryMappedCache(cache_dir)
+        else:
+            if cache_dir is not None and _MemoryMappedCache.exists(
+                    cache_dir):
+                logger.warning("The cache in %s was created from other data "
+                               "or with other loading settings and will be "
+                               "rebuilt" % cache_dir)
+
+            if cache_dir is None:
+                self.data = self._make_dataset(data_path)
+
+            # subclasses may build the complete dataset themselves
+            elif type(self)._make_dataset is not \
+                    BaseCacheDataset._make_dataset:
+                self.data = _MemoryMappedCache.create(
+                    cache_dir, self._make_dataset(data_path), fingerprint)
+
+            else:
+                samples = self._iter_samples(data_path)
+                try:
+                    self.data = _MemoryMappedCache.create(cache_dir, samples,
+                                                          fingerprint)
+                finally:
+                    # cancels pending loads if writing the cache failed
+                    samples.close()
+
+    @staticmethod
+    def _cache_fingerprint(data_path, load_fn, load_kwargs):
+        """
+        Computes a fingerprint of the cached samples' source to detect
+        outdated caches
+
+        Parameters
+        ----------
+        data_path : str or list
+            the path(s) to load the samples from
+        load_fn : function
+            function to load a single data sample
+        load_kwargs : dict
+            additional loading keyword arguments
+
+        Returns
+        -------
+        str
+            the fingerprint
 
         """
-        super().__init__(data_path, load_fn, **load_kwargs)
+        if isinstance(load_fn, functools.partial):
+            fn_name = "partial(%s, %r, %r)" % (
+                BaseCacheDataset._cache_fingerprint(None, load_fn.func, {}),
+                load_fn.args, load_fn.keywords)
+        else:
+            # instances of callable classes only provide their class' name
+            fn_name = "%s.%s" % (
+                getattr(load_fn, "__module__", type(load_fn).__module__),
+                getattr(load_fn, "__qualname__",
+                        type(load_fn).__qualname__))
+
+        return hashlib.sha1(repr(
+            (data_path, fn_name, sorted(load_kwargs.items()))
+        ).encode()).hexdigest()
 
     def _make_dataset(self, path: typing.Union[str, list]):
         """
@@ -597,7 +1008,7 @@ class BaseExtendCacheDataset(BaseCacheDataset):
 
         Parameters
         ----------
-        path: str or iterable
+        path: str or list
             if data_path is a string, _sample_fn is called for all items inside
             the specified directory
             if data_path is a list, _sample_fn is called for elements in the
@@ -612,35 +1023,688 @@ class BaseExtendCacheDataset(BaseCacheDataset):
         ------
         AssertionError
             if `path` is not a list and is not a valid directory
+        RuntimeError
+            if loading a sample failed
 
         """
-        data = []
-        if isinstance(path, list):
-            # iterate over all elements
-            for p in tqdm(path, unit='samples', desc="Loading samples"):
-                data.extend(self._load_fn(p, **self._load_kwargs))
-        else:
-            # call _sample_fn for all elements inside directory
-            assert os.path.isdir(path), '%s is not a valid directory' % dir
-            for p in tqdm(os.listdir(path), unit='samples',
-                          desc="Loading samples"):
-                data.extend(self._load_fn(os.path.join(path, p),
-                                          **self._load_kwargs))
-        return data
+        return list(self._iter_samples(path))
 
-
-class ConcatDataset(AbstractDataset):
-    def __init__(self, *datasets):
+    def _iter_samples(self, path: typing.Union[str, list]):
         """
-        Concatenate multiple datasets to one
+        Loads all samples and yields them one by one in their original order
 
         Parameters
         ----------
-        datasets:
-            variable number of datasets
-        """
-        super().__init__(None, None)
-
+        path: str or list
+            if data_path is a string, _sample_fn is called for all items inside
+            the specified directory
+            if data_path is a list, _sample_fn is called for elements in the
+            list
+
+        Yields
+        ------
+        Any
+            the loaded samples
+
+        Raises
+        ------
+        AssertionError
+            if `path` is not a list and is not a valid directory
+        RuntimeError
+            if loading a sample failed
+
+        """
+        yield from self._load_samples(path)
+
+    def _load_samples(self, path: typing.Union[str, list]):
+        """
+        Loads all samples (in parallel if ``num_workers`` is specified) and
+        yields them in their original order. At most twice as many samples as
+        workers are loaded ahead of the consumer. Pending loads are cancelled
+        if loading fails or gets interrupted
+
+        Parameters
+        ----------
+        path: str or list
+            if data_path is a string, _sample_fn is called for all items inside
+            the specified directory
+            if data_path is a list, _sample_fn is called for elements in the
+            list
+
+        Yields
+        ------
+        Any
+            the loaded samples
+
+        Raises
+        ------
+        AssertionError
+            if `path` is not a list and is not a valid directory
+        RuntimeError
+            if loading a sample failed
+
+        """
+        if isinstance(path, list):
+            paths = path
+        else:
+            # call _sample_fn for all elements inside directory
+            assert os.path.isdir(path), '%s is not a valid directory' % path
+            paths = [os.path.join(path, p) for p in os.listdir(path)]
+
+        if not self._num_workers:
+            for p in tqdm(paths, unit='samples', desc="Loading samples"):
+                try:
+                    sample = self._load_fn(p, **self._load_kwargs)
+                except Exception as e:
+                    raise RuntimeError("Failed to load sample %s" % p) from e
+                yield sample
+            return
+
+        executor = self._executor
+        if executor == "thread":
+            executor = concurrent.futures.ThreadPoolExecutor(
+                self._num_workers)
+        elif executor == "process":
+            executor = concurrent.futures.ProcessPoolExecutor(
+                self._num_workers)
+
+        # bound the number of loaded samples, which were not consumed yet
+        max_pending = 2 * self._num_workers
+        paths_iter = iter(paths)
+        pending = deque()
+
+        try:
+            for _ in tqdm(range(len(paths)), unit='samples',
+                          desc="Loading samples"):
+                for p in itertools.islice(paths_iter,
+                                          max_pending - len(pending)):
+                    pending.append((p, executor.submit(
+                        self._load_fn, p, **self._load_kwargs)))
+
+                p, future = pending.popleft()
+                try:
+                    sample = future.result()
+                except Exception as e:
+                    raise RuntimeError("Failed to load sample %s" % p) from e
+                yield sample
+
+        finally:
+            # cancel all pending loads (no-op for finished ones)
+            for _, future in pending:
+                future.cancel()
+
+            if executor is not self._executor:
+                executor.shutdown(wait=True)
+
+    def __getitem__(self, index):
+        """
+        return data sample specified by index
+
+        Parameters
+        ----------
+        index : int
+            index to specifiy which data sample to return
+
+        Returns
+        -------
+        dict
+            data sample
+
+        """
+        data_dict = self.get_sample_from_index(index)
+        return data_dict
+
+    def get_batch(self, indices):
+        """
+        Returns the cached data samples for multiple indices at once
+
+        Parameters
+        ----------
+        indices : list or :class:`numpy.ndarray`
+            the indices of the samples to return
+
+        Returns
+        -------
+        list
+            the data samples
+
+        """
+        # subclasses may have altered the per-sample behavior
+        if type(self).__getitem__ is not BaseCacheDataset.__getitem__ or \
+                type(self).get_sample_from_index is not \
+                AbstractDataset.get_sample_from_index:
+            return super().get_batch(indices)
+
+        if isinstance(self.data, _MemoryMappedCache):
+            return self.data.get_batch(indices)
+
+        return [self.data[idx] for idx in indices]
+
+    def get_labels(self, key="label"):
+        """
+        Returns the values of a single key for all cached samples
+
+        Parameters
+        ----------
+        key : str
+            the key to return the values for
+
+        Returns
+        -------
+        list or :class:`numpy.ndarray`
+            the values of all samples
+
+        """
+        # subclasses may have altered the per-sample behavior
+        if type(self).__getitem__ is not BaseCacheDataset.__getitem__ or \
+                type(self).get_sample_from_index is not \
+                AbstractDataset.get_sample_from_index:
+            return super().get_labels(key)
+
+        if isinstance(self.data, _MemoryMappedCache):
+            return self.data.get_column(key)
+
+        return [sample[key] for sample in self.data]
+
+
+class _SampleCache(object):
+    """
+    Least recently used cache of loaded samples, which is bounded by the
+    number of bytes of the cached samples. Samples evicted from memory can
+    optionally be spilled to a directory on disk (which is not bounded).
+
+    Notes
+    -----
+    Each process holds its own in-memory cache, which is not transferred to
+    other processes. The spill directory may be shared between processes.
+    Accessing the cache is thread-safe.
+
+    """
+
+    def __init__(self, max_bytes, spill_dir=None):
+        """
+
+        Parameters
+        ----------
+        max_bytes : int
+            the maximum number of bytes to keep in memory
+        spill_dir : str
+            directory to spill evicted samples to. Default: None
+
+        """
+        self._max_bytes = max_bytes
+        self._spill_dir = spill_dir
+
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self._samples = OrderedDict()
+        self._num_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _sample_bytes(sample):
+        """
+        Estimates the size of a sample
+
+        Parameters
+        ----------
+        sample : Any
+            the sample
+
+        Returns
+        -------
+        int
+            the estimated number of bytes
+
+        """
+        if isinstance(sample, dict):
+            return sum([_SampleCache._sample_bytes(val)
+                        for val in sample.values()])
+
+        if isinstance(sample, np.ndarray):
+            return sample.nbytes
+
+        return sys.getsizeof(sample)
+
+    def _spill_file(self, key):
+        """
+        Returns the file to spill a sample to
+
+        Parameters
+        ----------
+        key : Any
+            the key of the sample
+
+        Returns
+        -------
+        str
+            the file path
+
+        """
+        return os.path.join(
+            self._spill_dir,
+            hashlib.sha1(repr(key).encode()).hexdigest() + ".pkl")
+
+    def _spill(self, key, sample):
+        """
+        Writes a sample to the spill directory
+
+        Parameters
+        ----------
+        key : Any
+            the key of the sample
+        sample : Any
+            the sample
+
+        """
+        file = self._spill_file(key)
+
+        if os.path.isfile(file):
+            return
+
+        # write atomically since the directory may be shared by processes
+        # and threads
+        tmp_file = "%s.%d.%d.tmp" % (file, os.getpid(),
+                                     threading.get_ident())
+        with open(tmp_file, "wb") as f:
+            pickle.dump(sample, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, file)
+
+    def get(self, key):
+        """
+        Returns a cached sample
+
+        Parameters
+        ----------
+        key : Any
+            the key of the sample
+
+        Returns
+        -------
+        Any
+            the cached sample or None if it is not cached
+
+        """
+        with self._lock:
+            if key in self._samples:
+                self._samples.move_to_end(key)
+                self.hits += 1
+                return self._samples[key][0]
+
+        if self._spill_dir is not None:
+            file = self._spill_file(key)
+
+            if os.path.isfile(file):
+                with open(file, "rb") as f:
+                    sample = pickle.load(f)
+
+                with self._lock:
+                    self.disk_hits += 1
+                self.put(key, sample)
+                return sample
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, sample):
+        """
+        Caches a sample and evicts the least recently used samples if
+        necessary
+
+        Parameters
+        ----------
+        key : Any
+            the key of the sample
+        sample : Any
+            the sample
+
+        """
+        num_bytes = self._sample_bytes(sample)
+
+        if num_bytes > self._max_bytes:
+            if self._spill_dir is not None:
+                self._spill(key, sample)
+            return
+
+        evicted = []
+        with self._lock:
+            # the sample may have been put by another thread in the meantime
+            if key in self._samples:
+                self._num_bytes -= self._samples.pop(key)[1]
+
+            self._samples[key] = (sample, num_bytes)
+            self._num_bytes += num_bytes
+
+            while self._num_bytes > self._max_bytes:
+                evicted_key, (evicted_sample, evicted_bytes) = \
+                    self._samples.popitem(last=False)
+                self._num_bytes -= evicted_bytes
+                evicted.append((evicted_key, evicted_sample))
+
+        # spill outside of the lock to not block other threads while writing
+        if self._spill_dir is not None:
+            for evicted_key, evicted_sample in evicted:
+                self._spill(evicted_key, evicted_sample)
+
+    @property
+    def statistics(self):
+        """
+        Statistics of the cache
+
+        Returns
+        -------
+        dict
+            the number of hits (in memory and on disk), misses, cached
+            samples and cached bytes (in memory)
+
+        """
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits,
+                    "misses": self.misses, "num_samples": len(self._samples),
+                    "num_bytes": self._num_bytes}
+
+    def __getstate__(self):
+        # don't copy the cached samples to other processes
+        return {"max_bytes": self._max_bytes, "spill_dir": self._spill_dir}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"], state["spill_dir"])
+
+
+class BaseLazyDataset(AbstractDataset):
+    """
+    Dataset to load data in a lazy way
+
+    """
+
+    def __init__(self, data_path: typing.Union[str, list],
+                 load_fn: typing.Callable, max_cache_bytes=0, spill_dir=None,
+                 **load_kwargs):
+        """
+
+        Parameters
+        ----------
+        data_path : str or list
+            if data_path is a string, _sample_fn is called for all items inside
+            the specified directory
+            if data_path is a list, _sample_fn is called for elements in the
+            list
+        load_fn : function
+            function to load single data sample
+        max_cache_bytes : int
+            if positive, loaded samples are kept in a least recently used
+            cache of this size (in bytes) to avoid loading them again. Each
+            process holds its own cache. Default: 0
+        spill_dir : str
+            if given, samples evicted from the in-memory cache are written to
+            this directory and loaded from there on later accesses (requires
+            picklable samples). Default: None
+        **load_kwargs :
+            additional loading keyword arguments (image shape,
+            channel number, ...); passed to _sample_fn
+
+        """
+        super().__init__(data_path, load_fn)
+        self._load_kwargs = load_kwargs
+        self.data = self._make_dataset(self.data_path)
+
+        if max_cache_bytes > 0 or spill_dir is not None:
+            self._sample_cache = _SampleCache(max_cache_bytes, spill_dir)
+        else:
+            self._sample_cache = None
+
+    def _make_dataset(self, path: typing.Union[str, list]):
+        """
+        Helper Function to make a dataset containing paths to all images in a
+        certain directory
+
+        Parameters
+        ----------
+        path : str or list
+            path to data samples
+
+        Returns
+        -------
+        list
+            list of sample paths
+
+        Raises
+        ------
+        AssertionError
+            if `path` is not a valid directory
+
+        """
+        if isinstance(path, list):
+            # generate list from iterable
+            data = list(path)
+        else:
+            # generate list from all items
+            assert os.path.isdir(path), '%s is not a valid directory' % path
+            data = [os.path.join(path, p) for p in os.listdir(path)]
+        return data
+
+    def __getitem__(self, index):
+        """
+        load data sample specified by index
+
+        Parameters
+        ----------
+        index : int
+            index to specifiy which data sample to load
+
+        Returns
+        -------
+        dict
+            loaded data sample
+        """
+        path = self.get_sample_from_index(index)
+
+        data_dict = self._get_cached(path)
+
+        if data_dict is None:
+            data_dict = call_sync(self._load_fn, path, **self._load_kwargs)
+            data_dict = self._put_cached(path, data_dict)
+
+        return data_dict
+
+    async def aget(self, index):
+        """
+        load data sample specified by index from a coroutine. The load
+        function is awaited directly, if it is a coroutine function or
+        provides an ``acall`` coroutine (like :class:`LoadSample`);
+        otherwise it is executed by the event loop's default executor
+
+        Parameters
+        ----------
+        index : int
+            index to specifiy which data sample to load
+
+        Returns
+        -------
+        dict
+            loaded data sample
+        """
+        path = self.get_sample_from_index(index)
+
+        data_dict = self._get_cached(path)
+
+        if data_dict is None:
+            data_dict = await call_async(self._load_fn, path,
+                                         **self._load_kwargs)
+            data_dict = self._put_cached(path, data_dict)
+
+        return data_dict
+
+    def _get_cached(self, path):
+        """
+        Returns a cached sample
+
+        Parameters
+        ----------
+        path : Any
+            the sample's path
+
+        Returns
+        -------
+        dict or None
+            a (shallow) copy of the cached sample; None if the sample is not
+            cached or caching is disabled
+
+        """
+        if self._sample_cache is None:
+            return None
+
+        data_dict = self._sample_cache.get(path)
+
+        # copy to avoid modifications of the cached sample itself
+        if isinstance(data_dict, dict):
+            data_dict = dict(data_dict)
+
+        return data_dict
+
+    def _put_cached(self, path, data_dict):
+        """
+        Caches a newly loaded sample (if caching is enabled)
+
+        Parameters
+        ----------
+        path : Any
+            the sample's path
+        data_dict : dict
+            the loaded sample; must not be modified afterwards
+
+        Returns
+        -------
+        dict
+            a (shallow) copy of the sample to return to the caller
+
+        """
+        if self._sample_cache is None:
+            return data_dict
+
+        self._sample_cache.put(path, data_dict)
+
+        if isinstance(data_dict, dict):
+            data_dict = dict(data_dict)
+
+        return data_dict
+
+    @property
+    def cache_statistics(self):
+        """
+        Statistics of the sample cache (of the current process)
+
+        Returns
+        -------
+        dict
+            the number of hits (in memory and on disk), misses, cached
+            samples and cached bytes (in memory); empty if caching is
+            disabled
+
+        """
+        if self._sample_cache is None:
+            return {}
+
+        return self._sample_cache.statistics
+
+
+class BaseExtendCacheDataset(BaseCacheDataset):
+    """
+    Dataset to preload and cache data. Function to load sample is expected
+    to return an iterable which can contain multiple samples
+
+    Notes
+    -----
+    data needs to fit completely into RAM, if no ``cache_dir`` is given!
+
+    """
+
+    def __init__(self, data_path: typing.Union[str, list],
+                 load_fn: typing.Callable, cache_dir=None, num_workers=0,
+                 executor="thread", **load_kwargs):
+        """
+
+        Parameters
+        ----------
+        data_path : str or list
+            if data_path is a string, _sample_fn is called for all items inside
+            the specified directory
+            if data_path is a list, _sample_fn is called for elements in the
+            list
+        load_fn : function
+            function to load a multiple data samples at once. Needs to return
+            an iterable which extends the internal list.
+        cache_dir : str
+            directory of a memory-mapped cache; see :class:`BaseCacheDataset`.
+            Default: None
+        num_workers : int
+            number of workers to load the samples in parallel; see
+            :class:`BaseCacheDataset`. Default: 0
+        executor : str or :class:`concurrent.futures.Executor`
+            the executor to use for parallel loading; see
+            :class:`BaseCacheDataset`. Default: 'thread'
+        **load_kwargs :
+            additional loading keyword arguments (image shape,
+            channel number, ...); passed to _sample_fn
+
+        See Also
+        --------
+        :class: `BaseCacheDataset`
+
+        """
+        super().__init__(data_path, load_fn, cache_dir=cache_dir,
+                         num_workers=num_workers, executor=executor,
+                         **load_kwargs)
+
+    def _iter_samples(self, path: typing.Union[str, list]):
+        """
+        Loads all samples and yields the items of the returned iterables one
+        by one in their original order
+
+        Parameters
+        ----------
+        path: str or iterable
+            if data_path is a string, _sample_fn is called for all items inside
+            the specified directory
+            if data_path is a list, _sample_fn is called for elements in the
+            list
+
+        Yields
+        ------
+        Any
+            the items of the iterables returned from _sample_fn (typically
+            dicts)
+
+        Raises
+        ------
+        AssertionError
+            if `path` is not a list and is not a valid directory
+        RuntimeError
+            if loading a sample failed
+
+        """
+        for samples in self._load_samples(path):
+            yield from samples
+
+
+class ConcatDataset(AbstractDataset):
+    def __init__(self, *datasets):
+        """
+        Concatenate multiple datasets to one
+
+        Parameters
+        ----------
+        datasets:
+            variable number of datasets (their lengths must not change
+            afterwards)
+        """
+        super().__init__(None, None)
+
         # TODO: Why should datasets[0] be a list not a AbstractDataset?
 
         # check if first item in datasets is list and datasets is of length 1
@@ -649,6 +1713,10 @@ class ConcatDataset(AbstractDataset):
 
         self.data = datasets
 
+        # global index of the first sample of each dataset (and total length)
+        self._offsets = np.cumsum([0] + [len(dset) for dset in datasets],
+                                  dtype=np.int64)
+
     def get_sample_from_index(self, index):
         """
         Returns the data sample for a given index
@@ -675,22 +1743,216 @@ class ConcatDataset(AbstractDataset):
             sample corresponding to given index
         """
 
-        curr_max_index = 0
-        for dset in self.data:
-            prev_max_index = curr_max_index
-            curr_max_index += len(dset)
+        dset, local_index = self._locate_index(index)
+        return dset[local_index]
 
-            if prev_max_index <= index < curr_max_index:
-                return dset[index - prev_max_index]
+    def _locate_index(self, index):
+        """
+        Maps a global index to the dataset containing the sample and the
+        sample's index within this dataset
 
-            else:
-                continue
+        Parameters
+        ----------
+        index : int
+            the global index
+
+        Returns
+        -------
+        Any
+            the dataset containing the sample
+        int
+            the local index of the sample
 
-        raise IndexError("Index %d is out of range for %d items in datasets" %
-                         (index, len(self)))
+        Raises
+        ------
+        IndexError
+            if the index is out of range
+
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("Index %d is out of range for %d items in "
+                             "datasets" % (index, len(self)))
+
+        dset_idx = bisect.bisect_right(self._offsets, index) - 1
+        return self.data[dset_idx], index - int(self._offsets[dset_idx])
+
+    def split_indices(self, indices):
+        """
+        Splits global indices into the local indices of each dataset
+
+        Parameters
+        ----------
+        indices : list or :class:`numpy.ndarray`
+            the global indices
+
+        Returns
+        -------
+        list
+            a tuple for each dataset, containing its local indices and the
+            positions of these indices in ``indices`` (both as
+            :class:`numpy.ndarray`)
+
+        Raises
+        ------
+        IndexError
+            if any of the indices is out of range
+
+        """
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+
+        if ((indices < 0) | (indices >= len(self))).any():
+            raise IndexError("Indices out of range for %d items in datasets"
+                             % len(self))
+
+        dset_idxs = np.searchsorted(self._offsets, indices, side="right") - 1
+
+        # stable sort keeps the order of indices within each dataset
+        positions = np.split(np.argsort(dset_idxs, kind="stable"),
+                             np.cumsum(np.bincount(
+                                 dset_idxs, minlength=len(self.data)))[:-1])
+
+        return [(indices[_positions] - self._offsets[dset_idx], _positions)
+                for dset_idx, _positions in enumerate(positions)]
 
     def __getitem__(self, index):
         return self.get_sample_from_index(index)
 
+    async def aget(self, index):
+        """
+        Returns the data with given index from a coroutine by requesting it
+        from the concatenated dataset containing it
+
+        Parameters
+        ----------
+        index : int
+            the global index of the sample
+
+        Returns
+        -------
+        dict
+            data
+
+        """
+        dset, local_index = self._locate_index(index)
+
+        if isinstance(dset, AbstractDataset):
+            return await dset.aget(local_index)
+
+        return dset[local_index]
+
+    def get_batch(self, indices):
+        """
+        Returns the data for multiple indices at once by requesting a batch
+        from each of the concatenated datasets
+
+        Parameters
+        ----------
+        indices : list or :class:`numpy.ndarray`
+            the global indices of the samples to load
+
+        Returns
+        -------
+        list or dict
+            the data samples (in the order of ``indices``); if all requested
+            datasets return batched dicts with the same keys, their values
+            are concatenated to a single batched dict
+
+        """
+        batches = []
+        positions = []
+
+        for dset, (_indices, _positions) in zip(self.data,
+                                                self.split_indices(indices)):
+            if not len(_indices):
+                continue
+
+            if isinstance(dset, AbstractDataset):
+                batches.append(dset.get_batch(_indices))
+            else:
+                batches.append([dset[idx] for idx in _indices])
+            positions.append(_positions)
+
+        if batches and all([isinstance(batch, dict) for batch in batches]) \
+                and all([batch.keys() == batches[0].keys()
+                         for batch in batches[1:]]):
+            return self._concat_batches(batches, positions)
+
+        samples = [None] * len(indices)
+
+        for batch, _positions in zip(batches, positions):
+            # split batched dicts into single samples
+            if isinstance(batch, dict):
+                batch = [{k: v[i] for k, v in batch.items()}
+                         for i in range(len(_positions))]
+
+            for pos, sample in zip(_positions, batch):
+                samples[pos] = sample
+
+        return samples
+
+    @staticmethod
+    def _concat_batches(batches, positions):
+        """
+        Concatenates the batched dicts of multiple datasets key by key
+
+        Parameters
+        ----------
+        batches : list
+            the batched dicts (with identical keys) of each dataset
+        positions : list
+            the positions of each dataset's samples in the requested indices
+
+        Returns
+        -------
+        dict
+            a dict mapping each key to the batched values (as a
+            :class:`numpy.ndarray` if the values of all datasets are arrays
+            of the same sample shape) or a list of per-sample values
+
+        """
+        # the samples of each dataset are contiguous after concatenation
+        order = np.argsort(np.concatenate(positions), kind="stable")
+
+        batch = {}
+        for key in batches[0].keys():
+            values = [_batch[key] for _batch in batches]
+
+            # None marks values, which cannot be concatenated
+            sample_shapes = set([
+                val.shape[1:] if isinstance(val, np.ndarray) and val.ndim
+                else None for val in values])
+
+            if None not in sample_shapes and len(sample_shapes) == 1:
+                batch[key] = np.concatenate(values)[order]
+            else:
+                values = [val for _values in values for val in _values]
+                batch[key] = [values[idx] for idx in order]
+
+        return batch
+
+    def get_labels(self, key="label"):
+        """
+        Returns the values of a single key for all samples of all datasets
+
+        Parameters
+        ----------
+        key : str
+            the key to return the values for
+
+        Returns
+        -------
+        list
+            the values of all samples
+
+        """
+        labels = []
+        for dset in self.data:
+            if isinstance(dset, AbstractDataset):
+                labels.extend(list(dset.get_labels(key)))
+            else:
+                labels.extend([dset[idx][key] for idx in range(len(dset))])
+
+        return labels
+
     def __len__(self):
-        return sum([len(dset) for dset in self.data])
+        return int(self._offsets[-1])
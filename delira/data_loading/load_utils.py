@@ -1,5 +1,9 @@
+import asyncio
 import collections
+import concurrent.futures
+import functools
 import os
+import threading
 
 import numpy as np
 from skimage.io import imread
@@ -58,6 +62,69 @@ def norm_zero_mean_unit_std(data):
     return (data - np.mean(data)) / np.std(data)
 
 
+def call_sync(fn, *args, **kwargs):
+    """
+    Calls a (possibly asynchronous) load function synchronously. Coroutine
+    functions are executed on a new event loop
+
+    Parameters
+    ----------
+    fn : function
+        the function to call
+    *args :
+        positional arguments passed to ``fn``
+    **kwargs :
+        keyword arguments passed to ``fn``
+
+    Returns
+    -------
+    Any
+        the function's result
+
+    """
+    if not asyncio.iscoroutinefunction(fn):
+        return fn(*args, **kwargs)
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(fn(*args, **kwargs))
+    finally:
+        loop.close()
+
+
+async def call_async(fn, *args, **kwargs):
+    """
+    Calls a load function from a coroutine without blocking the event loop.
+    Coroutine functions and callables providing an ``acall`` coroutine (like
+    :class:`LoadSample`) are awaited directly, while all other functions are
+    executed by the event loop's default executor
+
+    Parameters
+    ----------
+    fn : function
+        the function to call
+    *args :
+        positional arguments passed to ``fn``
+    **kwargs :
+        keyword arguments passed to ``fn``
+
+    Returns
+    -------
+    Any
+        the function's result
+
+    """
+    acall = getattr(fn, "acall", None)
+    if acall is not None:
+        return await acall(*args, **kwargs)
+
+    if asyncio.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+
+    return await asyncio.get_event_loop().run_in_executor(
+        None, functools.partial(fn, *args, **kwargs))
+
+
 class LoadSample:
     """
     Provides a callable to load a single sample from multiple files in a folder
@@ -67,7 +134,7 @@ class LoadSample:
                  sample_ext: dict,
                  sample_fn: collections.abc.Callable,
                  dtype: dict = None, normalize: tuple = (),
-                 norm_fn=norm_range('-1,1'),
+                 norm_fn=norm_range('-1,1'), num_workers=0,
                  **kwargs):
         """
         Parameters
@@ -86,6 +153,11 @@ class LoadSample:
             or provide the file name which should be normalized
         norm_fn : function
             function to normalize input. Default: normalize range to [-1, 1]
+        num_workers : int
+            if positive, the files of a sample are loaded (and normalized)
+            concurrently by a pool of this many threads. Useful if
+            ``sample_fn`` releases the GIL (e.g. for file I/O and
+            decompression). Default: 0
         kwargs :
             variable number of keyword arguments passed to load function
         Examples
@@ -109,6 +181,50 @@ class LoadSample:
         self._normalize = normalize
         self._norm_fn = norm_fn
         self._kwargs = kwargs
+        self._num_workers = num_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._executor_pid = os.getpid()
+
+    def __getstate__(self):
+        # thread pools cannot be pickled and are created again on demand
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state.pop("_executor_lock")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._executor_lock = threading.Lock()
+        self._executor_pid = os.getpid()
+
+    @property
+    def _thread_pool(self):
+        """
+        Property returning the thread pool to load the files with (which is
+        created on first access in each process)
+
+        Returns
+        -------
+        :class:`concurrent.futures.ThreadPoolExecutor` or None
+            the thread pool; None if the files are loaded sequentially
+        """
+        if self._num_workers <= 0:
+            return None
+
+        # forked processes (e.g. augmentation workers) inherit the pool, but
+        # not its threads, and possibly a lock held by another thread
+        if self._executor_pid != os.getpid():
+            self._executor = None
+            self._executor_lock = threading.Lock()
+            self._executor_pid = os.getpid()
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self._num_workers)
+
+        return self._executor
 
     def __call__(self, path) -> dict:
         """
@@ -122,26 +238,113 @@ class LoadSample:
         dict
             dict with data defines by _sample_ext
         """
-        sample_dict = {}
-        for key, item in self._sample_ext.items():
-            data_list = []
-            for f in item:
-                data = self._sample_fn(os.path.join(path, f), **self._kwargs)
+        files = [(key, f) for key, item in self._sample_ext.items()
+                 for f in item]
+
+        def _load_file(key_file):
+            key, f = key_file
+            return self._prepare_file(
+                key, f, call_sync(self._sample_fn, os.path.join(path, f),
+                                  **self._kwargs))
+
+        thread_pool = self._thread_pool
+        if thread_pool is None or len(files) < 2:
+            loaded = [_load_file(key_file) for key_file in files]
+        else:
+            loaded = list(thread_pool.map(_load_file, files))
+
+        return self._combine_files(loaded)
+
+    async def acall(self, path) -> dict:
+        """
+        Load sample from multiple files with all files being loaded
+        concurrently
+        Parameters
+        ----------
+        path : str
+            defines patch to folder which contain the _sample_ext
+        Returns
+        -------
+        dict
+            dict with data defines by _sample_ext
+        See Also
+        --------
+        :func:`call_async`
+        """
+        files = [(key, f) for key, item in self._sample_ext.items()
+                 for f in item]
+        loaded = await asyncio.gather(
+            *[call_async(self._sample_fn, os.path.join(path, f),
+                         **self._kwargs) for _, f in files])
 
-                # _normalize data if necessary
-                if (key in self._normalize) or (f in self._normalize):
-                    data = self._norm_fn(data)
+        return self._combine_files(
+            [self._prepare_file(key, f, data)
+             for (key, f), data in zip(files, loaded)])
 
-                # cast data to type
-                if key in self._dtype:
-                    data = data.astype(self._dtype[key])
+    def _prepare_file(self, key, f, data):
+        """
+        Normalizes the data of a single file (if necessary)
+        Parameters
+        ----------
+        key : str
+            the key of _sample_ext, the file belongs to
+        f : str
+            the file name
+        data : :class:`numpy.ndarray`
+            the loaded data
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            the (normalized) data
+        """
+        if (key in self._normalize) or (f in self._normalize):
+            data = self._norm_fn(data)
+        return data
 
-                # append data
-                data_list.append(data)
-            if len(data_list) == 1:
+    def _combine_files(self, loaded):
+        """
+        Stacks the data of all files per key of _sample_ext. The data is
+        written to a preallocated array of the target dtype, which casts
+        the data while copying it
+        Parameters
+        ----------
+        loaded : list
+            the (normalized) data of all files in the order of _sample_ext
+        Returns
+        -------
+        dict
+            dict with data defines by _sample_ext
+        Raises
+        ------
+        ValueError
+            if the files of a single key have different shapes
+        """
+        sample_dict = {}
+        start = 0
+        for key, item in self._sample_ext.items():
+            data_list = [np.asarray(data)
+                         for data in loaded[start:start + len(item)]]
+            start += len(item)
+
+            if key in self._dtype:
+                dtype = np.dtype(self._dtype[key])
+            elif len(data_list) == 1:
+                # no copy necessary
                 sample_dict[key] = data_list[0][np.newaxis]
+                continue
             else:
-                sample_dict[key] = np.stack(data_list)
+                dtype = np.result_type(*data_list)
+
+            shape = data_list[0].shape
+            if any([data.shape != shape for data in data_list[1:]]):
+                raise ValueError("The files of key %s have different shapes"
+                                 % str(key))
+
+            stacked = np.empty((len(data_list),) + shape, dtype=dtype)
+            for idx, data in enumerate(data_list):
+                stacked[idx] = data
+
+            sample_dict[key] = stacked
         return sample_dict
 
 
@@ -152,7 +355,7 @@ class LoadSampleLabel(LoadSample):
                  label_ext: str,
                  label_fn: collections.abc.Callable,
                  dtype: dict = None, normalize: tuple = (),
-                 norm_fn=norm_range('-1,1'),
+                 norm_fn=norm_range('-1,1'), num_workers=0,
                  sample_kwargs=None, **kwargs):
         """
         Load sample and label from folder
@@ -178,6 +381,9 @@ class LoadSampleLabel(LoadSample):
             or provide the file name which should be normalized
         norm_fn : function
             function to normalize input. Default: normalize range to [-1, 1]
+        num_workers : int
+            if positive, the files of a sample and the label are loaded
+            concurrently by a pool of this many threads. Default: 0
         sample_kwargs :
             additional keyword arguments passed to LoadSample
         kwargs :
@@ -191,7 +397,7 @@ class LoadSampleLabel(LoadSample):
 
         super().__init__(sample_ext=sample_ext, sample_fn=sample_fn,
                          dtype=dtype, normalize=normalize, norm_fn=norm_fn,
-                         **sample_kwargs)
+                         num_workers=num_workers, **sample_kwargs)
         self._label_ext = label_ext
         self._label_fn = label_fn
         self._label_kwargs = kwargs
@@ -207,8 +413,37 @@ class LoadSampleLabel(LoadSample):
         dict
             dict with data and label
         """
-        sample_dict = super().__call__(path)
-        label_dict = self._label_fn(os.path.join(path, self._label_ext),
-                                    **self._label_kwargs)
+        label_path = os.path.join(path, self._label_ext)
+        thread_pool = self._thread_pool
+
+        if thread_pool is None:
+            sample_dict = super().__call__(path)
+            label_dict = call_sync(self._label_fn, label_path,
+                                   **self._label_kwargs)
+        else:
+            # load label while loading the sample's files
+            label_future = thread_pool.submit(
+                call_sync, self._label_fn, label_path, **self._label_kwargs)
+            sample_dict = super().__call__(path)
+            label_dict = label_future.result()
+
+        sample_dict.update(label_dict)
+        return sample_dict
+
+    async def acall(self, path) -> dict:
+        """
+        Loads a sample and a label with all files being loaded concurrently
+        Parameters
+        ----------
+        path : str
+        Returns
+        -------
+        dict
+            dict with data and label
+        """
+        sample_dict, label_dict = await asyncio.gather(
+            super().acall(path),
+            call_async(self._label_fn, os.path.join(path, self._label_ext),
+                       **self._label_kwargs))
         sample_dict.update(label_dict)
         return sample_dict
@@ -1,6 +1,8 @@
 from batchgenerators.transforms import AbstractTransform, Compose
 
 import logging
+import time
+import numpy as np
 from delira import get_current_debug_mode
 import numba
 
@@ -9,7 +11,26 @@ logger = logging.getLogger(__name__)
 
 class NumbaTransformWrapper(AbstractTransform):
     def __init__(self, transform: AbstractTransform, nopython=True,
-                 target="cpu", parallel=False, **options):
+                 target="cpu", parallel=False, cache=True, **options):
+        """
+        Parameters
+        ----------
+        transform : :class:`AbstractTransform`
+            the transform to compile
+        nopython : bool
+            whether to compile in nopython mode
+        target : str
+            the compilation target
+        parallel : bool
+            whether to enable automatic parallelization
+        cache : bool
+            whether to write the compiled function to numba's on-disk cache,
+            which is shared by all processes (e.g. augmentation workers
+            started without forking) and subsequent runs. Default: True
+        **options :
+            additional options passed to :func:`numba.jit`
+
+        """
 
         if get_current_debug_mode():
             # set options for debug mode
@@ -20,7 +41,8 @@ class NumbaTransformWrapper(AbstractTransform):
 
         transform.__call__ = numba.jit(transform.__call__, nopython=nopython,
                                        target=target,
-                                       parallel=parallel, **options)
+                                       parallel=parallel, cache=cache,
+                                       **options)
         self._transform = transform
 
     def __call__(self, **kwargs):
@@ -29,14 +51,119 @@ class NumbaTransformWrapper(AbstractTransform):
 
 class NumbaTransform(NumbaTransformWrapper):
     def __init__(self, transform_cls, nopython=True, target="cpu",
-                 parallel=False, **kwargs):
+                 parallel=False, cache=True, **kwargs):
         trafo = transform_cls(**kwargs)
 
         super().__init__(trafo, nopython=nopython, target=target,
-                         parallel=parallel)
+                         parallel=parallel, cache=cache)
 
 
 class NumbaCompose(Compose):
-    def __init__(self, transforms):
-        super().__init__(transforms=[NumbaTransformWrapper(trafo)
-                                     for trafo in transforms])
+    def __init__(self, transforms, nopython=True, target="cpu",
+                 parallel=False, cache=True, **options):
+        """
+        Parameters
+        ----------
+        transforms : list
+            the transforms to compile and apply in the given order
+        nopython : bool
+            whether to compile in nopython mode
+        target : str
+            the compilation target
+        parallel : bool
+            whether to enable automatic parallelization
+        cache : bool
+            whether to write the compiled functions to numba's on-disk cache,
+            which is shared by all processes and subsequent runs.
+            Default: True
+        **options :
+            additional options passed to :func:`numba.jit`
+
+        Notes
+        -----
+        Numba compiles lazily on the first call with new argument types.
+        Use :meth:`NumbaCompose.warmup` with an example batch to compile all
+        transforms before the augmentation processes are started, which
+        otherwise compile them separately on their first batch.
+
+        """
+        super().__init__(transforms=[
+            trafo if isinstance(trafo, NumbaTransformWrapper)
+            else NumbaTransformWrapper(trafo, nopython=nopython,
+                                       target=target, parallel=parallel,
+                                       cache=cache, **options)
+            for trafo in transforms])
+
+        self.timings = {}
+
+    def warmup(self, batch: dict, num_runs=3):
+        """
+        Compiles all transforms ahead of time by applying the whole chain to
+        an example batch. Call this in the main process before starting the
+        augmentation: Forked workers inherit the compiled functions and all
+        other processes load them from the on-disk cache (if enabled)
+
+        Parameters
+        ----------
+        batch : dict
+            an example batch with the same keys, dtypes and number of
+            dimensions as the actual batches (it will not be modified)
+        num_runs : int
+            the number of additional runs to measure the run time with
+
+        Returns
+        -------
+        dict
+            the compile time and the average run time (in seconds) of each
+            transform; also available as :attr:`NumbaCompose.timings`
+
+        """
+        timings = {}
+
+        for trafo_idx, trafo in enumerate(self.transforms):
+            # first call triggers the compilation
+            start_time = time.perf_counter()
+            output = trafo(**_copy_batch(batch))
+            first_time = time.perf_counter() - start_time
+
+            run_time = 0.
+            for _ in range(num_runs):
+                start_time = time.perf_counter()
+                trafo(**_copy_batch(batch))
+                run_time += time.perf_counter() - start_time
+
+            if num_runs:
+                run_time /= num_runs
+
+            trafo_cls = type(getattr(trafo, "_transform", trafo))
+            name = "%d_%s" % (trafo_idx, trafo_cls.__name__)
+            timings[name] = {"compile_time": max(first_time - run_time, 0.),
+                             "run_time": run_time}
+            logger.info("Compiled transform %s in %.3f s (run time: %.3f s)"
+                        % (name, timings[name]["compile_time"], run_time))
+
+            # next transform is compiled for the types of the current output
+            batch = output
+
+        self.timings = timings
+        return timings
+
+
+def _copy_batch(batch: dict):
+    """
+    Copies all arrays of a batch to keep the original batch unmodified by
+    transforms operating inplace
+
+    Parameters
+    ----------
+    batch : dict
+        the batch to copy
+
+    Returns
+    -------
+    dict
+        the copied batch
+
+    """
+    return {key: val.copy() if isinstance(val, np.ndarray) else val
+            for key, val in batch.items()}
@@ -1,7 +1,9 @@
 from delira.data_loading.sampler.abstract import AbstractSampler
 from delira.data_loading.sampler.batch import BatchSampler
+from delira.data_loading.sampler.bucket import BucketBatchSampler
 from delira.data_loading.sampler.random import RandomSampler, \
     RandomSamplerNoReplacement, RandomSamplerWithReplacement
 from delira.data_loading.sampler.sequential import SequentialSampler
 from delira.data_loading.sampler.weighted import WeightedRandomSampler, \
     PrevalenceRandomSampler
+from delira.data_loading.sampler.sharded import ShardedSampler
@@ -1,4 +1,5 @@
 from delira.data_loading.dataset import AbstractDataset
+import numpy as np
 
 
 class AbstractSampler(object):
@@ -28,6 +29,46 @@ class AbstractSampler(object):
         """
         raise NotImplementedError
 
+    def epoch_indices(self):
+        """
+        Returns the samples of a whole epoch at once. Per default this
+        collects the samples of a single iteration, but can be overwritten
+        in subclasses to produce them vectorized
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            the sample indices
+
+        """
+        return np.array(list(iter(self)), dtype=np.int64)
+
+    def state_dict(self):
+        """
+        Returns the sampler's state, which is not determined by the random
+        state (e.g. modified weights); empty by default
+
+        Returns
+        -------
+        dict
+            the sampler's state
+
+        """
+        return {}
+
+    def load_state_dict(self, state_dict):
+        """
+        Loads a state returned by :meth:`AbstractSampler.state_dict`; does
+        nothing by default
+
+        Parameters
+        ----------
+        state_dict : dict
+            the state to load
+
+        """
+        pass
+
     def __len__(self):
         """
         Defines the class length
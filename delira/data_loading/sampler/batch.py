@@ -1,4 +1,6 @@
 from delira.data_loading.sampler.abstract import AbstractSampler
+from delira.data_loading.dataset import AbstractDataset
+import numpy as np
 
 
 class BatchSampler(object):
@@ -25,27 +27,28 @@ class BatchSampler(object):
 
     def __iter__(self):
         """
-        Iterator holding lists of sample-indices. Each list contains indices
-        for a single batch
+        Iterator holding arrays of sample-indices. Each array contains
+        indices for a single batch and is a view of the indices of the whole
+        epoch
 
         Yields
         ------
-        list
-            a list containing the sample indices of the current batch
+        :class:`numpy.ndarray`
+            an array containing the sample indices of the current batch
 
         """
-        batch_idxs = []
+        if isinstance(self._sampler, AbstractSampler):
+            idxs = self._sampler.epoch_indices()
+        else:
+            idxs = np.array(list(self._sampler), dtype=np.int64)
 
-        for idx in self._sampler:
-            batch_idxs.append(idx)
+        num_full = len(idxs) // self._batchsize * self._batchsize
 
-            if len(batch_idxs) == self._batchsize:
-                yield batch_idxs
+        for start_idx in range(0, num_full, self._batchsize):
+            yield idxs[start_idx:start_idx + self._batchsize]
 
-                batch_idxs = []
-
-        if not self._drop_last and batch_idxs:
-            yield batch_idxs
+        if not self._drop_last and num_full < len(idxs):
+            yield idxs[num_full:]
 
     def __len__(self):
         """
@@ -63,3 +66,53 @@ class BatchSampler(object):
             num_batches += int(bool(len(self._sampler) % self._batchsize))
 
         return num_batches
+
+    def state_dict(self):
+        """
+        Returns the state of the wrapped sampler
+
+        Returns
+        -------
+        dict
+            the state of the wrapped sampler
+
+        """
+        if isinstance(self._sampler, AbstractSampler):
+            return {"sampler": self._sampler.state_dict()}
+
+        return {}
+
+    def load_state_dict(self, state_dict):
+        """
+        Loads a state returned by :meth:`BatchSampler.state_dict`
+
+        Parameters
+        ----------
+        state_dict : dict
+            the state to load
+
+        """
+        if "sampler" in state_dict:
+            self._sampler.load_state_dict(state_dict["sampler"])
+
+    @classmethod
+    def from_dataset(cls, dset: AbstractDataset, sampler: AbstractSampler,
+                     batch_size, drop_last=False, **kwargs):
+        """
+        Class Method to create a batch sampler for a given dataset
+
+        Parameters
+        ----------
+        dset : :class:`AbstractDataset`
+            the dataset to sample from
+        sampler : :class:`AbstractSampler`
+            the actual sampler producing single-sized samples
+        batch_size : int
+            the size of each batch
+        drop_last : bool
+            whether or not to discard the last (possibly smaller) batch
+        **kwargs :
+            additional keyword arguments
+
+        """
+        return cls(sampler, batch_size, drop_last=drop_last, **kwargs)
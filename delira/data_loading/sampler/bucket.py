@@ -0,0 +1,154 @@
+from delira.data_loading.sampler.abstract import AbstractSampler
+from delira.data_loading.sampler.batch import BatchSampler
+from delira.data_loading.dataset import AbstractDataset
+import numpy as np
+
+
+class BucketBatchSampler(BatchSampler):
+    """
+    A Sampler-Wrapper combining the single indices sampled by a sampler to
+    batches, which only contain samples of the same bucket (e.g. samples of
+    equal or similar shapes). The order of batches is shuffled across the
+    buckets
+    """
+
+    def __init__(self, sampler: AbstractSampler, batch_size, bucket_keys,
+                 drop_last=False, shuffle=True):
+        """
+
+        Parameters
+        ----------
+        sampler : :class:`AbstractSampler`
+            the actual sampler producing single-sized samples; the order of
+            its samples is preserved within each bucket
+        batch_size : int
+            the size of each batch
+        bucket_keys : list
+            a hashable key (like a shape or a size category) for each sample
+            of the dataset, samples with equal keys are put into the same
+            bucket
+        drop_last : bool
+            whether or not to discard the last (possibly smaller) batch of
+            each bucket
+        shuffle : bool
+            whether to shuffle the batches across the buckets; if False, the
+            batches are yielded bucket by bucket
+        """
+        super().__init__(sampler, batch_size, drop_last)
+
+        # map keys to consecutive bucket ids
+        bucket_ids = {}
+        self._bucket_ids = np.array(
+            [bucket_ids.setdefault(key, len(bucket_ids))
+             for key in bucket_keys], dtype=np.int64)
+        self._num_buckets = len(bucket_ids)
+        self._shuffle = shuffle
+
+    def __iter__(self):
+        """
+        Iterator holding arrays of sample-indices. Each array contains
+        indices of a single bucket
+
+        Yields
+        ------
+        :class:`numpy.ndarray`
+            an array containing the sample indices of the current batch
+
+        """
+        if isinstance(self._sampler, AbstractSampler):
+            idxs = self._sampler.epoch_indices()
+        else:
+            idxs = np.array(list(self._sampler), dtype=np.int64)
+
+        # group indices by bucket (keeping the sampling order)
+        sample_buckets = self._bucket_ids[idxs]
+        idxs = idxs[np.argsort(sample_buckets, kind="stable")]
+        bucket_ends = np.cumsum(np.bincount(sample_buckets,
+                                            minlength=self._num_buckets))
+
+        batches = []
+        bucket_start = 0
+        for bucket_end in bucket_ends:
+            num_full = bucket_start + (bucket_end - bucket_start) \
+                // self._batchsize * self._batchsize
+
+            for start_idx in range(bucket_start, num_full, self._batchsize):
+                batches.append(idxs[start_idx:start_idx + self._batchsize])
+
+            if not self._drop_last and num_full < bucket_end:
+                batches.append(idxs[num_full:bucket_end])
+
+            bucket_start = bucket_end
+
+        if self._shuffle:
+            batch_order = np.random.permutation(len(batches))
+        else:
+            batch_order = range(len(batches))
+
+        for batch_idx in batch_order:
+            yield batches[batch_idx]
+
+    def __len__(self):
+        """
+        Defines the class length (assuming each sample is sampled once)
+
+        Returns
+        -------
+        int
+            number of batches
+
+        """
+        bucket_sizes = np.bincount(self._bucket_ids,
+                                   minlength=self._num_buckets)
+
+        if self._drop_last:
+            return int((bucket_sizes // self._batchsize).sum())
+
+        return int((-(-bucket_sizes // self._batchsize)).sum())
+
+    @classmethod
+    def from_dataset(cls, dset: AbstractDataset, sampler: AbstractSampler,
+                     batch_size, drop_last=False, key="data",
+                     bucket_fn=np.shape, bucket_keys=None, **kwargs):
+        """
+        Class Method to create a bucket batch sampler from a given dataset
+
+        Parameters
+        ----------
+        dset : :class:`AbstractDataset`
+            the dataset to obtain the bucket keys from
+        sampler : :class:`AbstractSampler`
+            the actual sampler producing single-sized samples
+        batch_size : int
+            the size of each batch
+        drop_last : bool
+            whether or not to discard the last (possibly smaller) batch of
+            each bucket
+        key : str
+            the key of the samples to compute the bucket keys from; its
+            values are obtained by :meth:`AbstractDataset.get_labels`
+        bucket_fn : function
+            function to compute a bucket key from a single value.
+            Default: :func:`numpy.shape`
+        bucket_keys : list
+            precomputed bucket keys (one per sample of ``dset``); if given,
+            ``key`` and ``bucket_fn`` are ignored and no samples are loaded.
+            Default: None
+        **kwargs :
+            additional keyword arguments
+
+        Raises
+        ------
+        ValueError
+            if the number of ``bucket_keys`` does not match the length of
+            ``dset``
+
+        """
+        if bucket_keys is None:
+            bucket_keys = [bucket_fn(val) for val in dset.get_labels(key)]
+        elif len(bucket_keys) != len(dset):
+            raise ValueError("Got %d bucket keys for a dataset of length %d"
+                             % (len(bucket_keys), len(dset)))
+
+        return cls(sampler, batch_size, bucket_keys, drop_last=drop_last,
+                   **kwargs)
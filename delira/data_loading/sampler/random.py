@@ -38,16 +38,31 @@ class RandomSampler(AbstractSampler):
         Iterator
             an iterator returning random samples
 
+        """
+        if self._replacement:
+            return iter(self.epoch_indices().tolist())
+
+        return iter(self.epoch_indices())
+
+    def epoch_indices(self):
+        """
+        Returns the random samples of a whole epoch at once
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            the sample indices
+
         """
         n = len(self._indices)
 
         if self._replacement:
-            return iter(np.random.randint(n, size=self._num_samples).tolist())
+            return np.random.randint(n, size=self._num_samples)
 
         possible_samples = np.arange(n)
         np.random.shuffle(possible_samples)
 
-        return iter(possible_samples)
+        return possible_samples
 
     def __len__(self):
         """
@@ -1,4 +1,5 @@
 from delira.data_loading.sampler.abstract import AbstractSampler
+import numpy as np
 
 
 class SequentialSampler(AbstractSampler):
@@ -16,3 +17,15 @@ class SequentialSampler(AbstractSampler):
             iterator returning samples in a sequential manner
         """
         return iter(range(len(self._indices)))
+
+    def epoch_indices(self):
+        """
+        Returns the sequential samples of a whole epoch at once
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            the sample indices
+
+        """
+        return np.arange(len(self._indices))
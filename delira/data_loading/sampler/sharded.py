@@ -0,0 +1,195 @@
+from delira.data_loading.sampler.abstract import AbstractSampler
+from delira.data_loading.sampler.sequential import SequentialSampler
+from delira.data_loading.dataset import AbstractDataset
+import numpy as np
+
+
+class ShardedSampler(AbstractSampler):
+    """
+    Class wrapping another sampler to split its samples into disjoint shards
+    of equal length (one for each process of a distributed training)
+
+    Notes
+    -----
+    All processes need to draw the same samples from the wrapped sampler.
+    For random samplers this is the case, if the random state is seeded
+    identically in all processes (as done by
+    :meth:`DataManager.get_batchgen` with a given seed) or if a ``seed``
+    is given to this sampler.
+
+    """
+
+    def __init__(self, sampler, rank=0, world_size=1, seed=None, pad=True):
+        """
+
+        Parameters
+        ----------
+        sampler : :class:`AbstractSampler`
+            the sampler to split into shards
+        rank : int
+            the index of the current process
+        world_size : int
+            the total number of processes
+        seed : int
+            if given, the samples of the wrapped sampler are drawn with the
+            random state seeded by ``seed`` plus the current epoch (see
+            :meth:`ShardedSampler.set_epoch`) without affecting the global
+            random state. Default: None
+        pad : bool
+            whether to pad the samples (by repeating them) to be divisible by
+            ``world_size`` or to drop the remaining samples. Default: True
+
+        Raises
+        ------
+        ValueError
+            if ``rank`` is not in the range of ``world_size``
+
+        """
+        if not 0 <= rank < world_size:
+            raise ValueError("Invalid rank %d for a world size of %d"
+                             % (rank, world_size))
+
+        super().__init__(sampler._indices)
+        self._sampler = sampler
+        self._rank = rank
+        self._world_size = world_size
+        self._seed = seed
+        self._pad = pad
+        self._epoch = 0
+
+    def set_epoch(self, epoch):
+        """
+        Sets the epoch, which is added to the seed (if specified)
+
+        Parameters
+        ----------
+        epoch : int
+            the current epoch
+
+        """
+        self._epoch = epoch
+
+    def state_dict(self):
+        """
+        Returns the sampler's state
+
+        Returns
+        -------
+        dict
+            the state containing the current epoch and the state of the
+            wrapped sampler
+
+        """
+        return {"epoch": self._epoch, "sampler": self._sampler.state_dict()}
+
+    def load_state_dict(self, state_dict):
+        """
+        Loads a state returned by :meth:`ShardedSampler.state_dict`
+
+        Parameters
+        ----------
+        state_dict : dict
+            the state to load
+
+        """
+        self._epoch = state_dict["epoch"]
+        self._sampler.load_state_dict(state_dict["sampler"])
+
+    def _draw_samples(self):
+        """
+        Draws all samples from the wrapped sampler
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            the drawn samples
+
+        """
+        if self._seed is None:
+            return self._sampler.epoch_indices()
+
+        state = np.random.get_state()
+        np.random.seed(self._seed + self._epoch)
+
+        try:
+            return self._sampler.epoch_indices()
+        finally:
+            np.random.set_state(state)
+
+    def __iter__(self):
+        """
+        Returns an iterator over the shard of the current process
+
+        Returns
+        -------
+        Iterator
+            iterator returning the samples of the current shard
+
+        """
+        return iter(self.epoch_indices())
+
+    def epoch_indices(self):
+        """
+        Returns the samples of the current shard for a whole epoch at once
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            the sample indices
+
+        """
+        samples = self._draw_samples()
+        total_size = len(self) * self._world_size
+
+        if len(samples) < total_size:
+            # repeat samples for padding
+            samples = np.resize(samples, total_size)
+
+        return samples[self._rank:total_size:self._world_size]
+
+    def __len__(self):
+        """
+        Defines the length of the sampler
+
+        Returns
+        -------
+        int
+            the number of samples in each shard
+
+        """
+        if self._pad:
+            return -(-len(self._sampler) // self._world_size)
+
+        return len(self._sampler) // self._world_size
+
+    @classmethod
+    def from_dataset(cls, dset: AbstractDataset,
+                     base_sampler_cls=SequentialSampler, rank=0,
+                     world_size=1, seed=None, pad=True, **kwargs):
+        """
+        Class Method to create a sharded sampler from a given dataset
+
+        Parameters
+        ----------
+        dset : :class:`AbstractDataset`
+            the dataset to create the sampler from
+        base_sampler_cls : type
+            the class of the sampler to split into shards.
+            Default: :class:`SequentialSampler`
+        rank : int
+            the index of the current process
+        world_size : int
+            the total number of processes
+        seed : int
+            seed to draw the samples of the wrapped sampler with.
+            Default: None
+        pad : bool
+            whether to pad the samples or to drop the remaining samples.
+            Default: True
+        **kwargs :
+            additional keyword arguments (passed to
+            ``base_sampler_cls.from_dataset``)
+
+        """
+        return cls(base_sampler_cls.from_dataset(dset, **kwargs), rank=rank,
+                   world_size=world_size, seed=seed, pad=pad)
@@ -1,11 +1,81 @@
+import os
+
 from delira.data_loading.sampler.abstract import AbstractSampler
 from delira.data_loading.dataset import AbstractDataset
 import numpy as np
 
 
+def _build_alias_table(weights):
+    """
+    Builds the table for sampling with Vose's alias method. Instead of
+    pairing single entries, all entries below the average weight are
+    assigned to the entries above it at once (by their cumulative deficits
+    and surpluses), which usually finishes after very few iterations
+
+    Parameters
+    ----------
+    weights : :class:`numpy.ndarray`
+        the (non-negative) weights
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        the probability of keeping each entry
+    :class:`numpy.ndarray`
+        the alias of each entry
+
+    Raises
+    ------
+    ValueError
+        if the weights are negative or don't contain a positive weight
+
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+
+    if (weights < 0).any() or not weights.sum() > 0:
+        raise ValueError("Weights must be non-negative and contain at least "
+                         "one positive weight")
+
+    prob = weights * (len(weights) / weights.sum())
+    alias = np.arange(len(weights))
+
+    small = np.flatnonzero(prob < 1)
+    large = np.flatnonzero(prob >= 1)
+
+    while small.size and large.size:
+        deficits = 1 - prob[small]
+
+        # each small entry is aliased to the large entry, whose surplus
+        # covers the start of the small entry's deficit
+        owners = np.searchsorted(np.cumsum(prob[large] - 1),
+                                 np.cumsum(deficits) - deficits,
+                                 side="right")
+
+        # entries beyond the total surplus (due to numerical inaccuracies)
+        valid = owners < large.size
+        if not valid.any():
+            break
+
+        alias[small[valid]] = large[owners[valid]]
+        prob[large] -= np.bincount(owners[valid], weights=deficits[valid],
+                                   minlength=large.size)
+
+        # large entries might have fallen below the average
+        now_small = prob[large] < 1
+        small = np.concatenate([small[~valid], large[now_small]])
+        large = large[~now_small]
+
+    # remaining entries are (numerically) at the average
+    prob[small] = 1
+    prob[large] = 1
+
+    return prob, alias
+
+
 class WeightedRandomSampler(AbstractSampler):
     """
-    Class implementing Weighted Random Sampling
+    Class implementing Weighted Random Sampling (with the alias method, which
+    draws each sample in constant time)
     """
 
     def __init__(self, weights, num_samples=None):
@@ -14,7 +84,7 @@ class WeightedRandomSampler(AbstractSampler):
         Parameters
         ----------
         weights : list
-            per-sample weights
+            per-sample weights (don't need to be normalized)
         num_samples : int
             number of samples to provide. If not specified this defaults to
             the amount of values given in :param:`num_samples´
@@ -23,8 +93,50 @@ class WeightedRandomSampler(AbstractSampler):
             num_samples = len(weights)
 
         self._num_samples = num_samples
-        super().__init__(np.arange(num_samples))
-        self._weights = weights
+        super().__init__(np.arange(len(weights)))
+        self._weights = np.array(weights, dtype=np.float64)
+        self._alias_table = _build_alias_table(self._weights)
+
+    def update_weights(self, indices, weights):
+        """
+        Updates the weights of some samples (e.g. from their last losses).
+        The alias table is rebuilt once when sampling the next time
+
+        Parameters
+        ----------
+        indices : list or :class:`numpy.ndarray`
+            the indices of the samples to update
+        weights : list or :class:`numpy.ndarray`
+            the new weights for these samples
+
+        """
+        self._weights[indices] = weights
+        self._alias_table = None
+
+    def state_dict(self):
+        """
+        Returns the sampler's state
+
+        Returns
+        -------
+        dict
+            the state containing the current weights
+
+        """
+        return {"weights": self._weights.copy()}
+
+    def load_state_dict(self, state_dict):
+        """
+        Loads a state returned by :meth:`WeightedRandomSampler.state_dict`
+
+        Parameters
+        ----------
+        state_dict : dict
+            the state to load
+
+        """
+        self._weights = np.array(state_dict["weights"], dtype=np.float64)
+        self._alias_table = None
 
     def __iter__(self):
         """
@@ -35,8 +147,27 @@ class WeightedRandomSampler(AbstractSampler):
         Iterator
             iterator producing random samples
         """
-        return iter(np.random.choice(self._indices, size=self._num_samples,
-                                     p=self._weights))
+        return iter(self.epoch_indices())
+
+    def epoch_indices(self):
+        """
+        Returns the weighted random samples of a whole epoch at once
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            the sample indices
+        """
+        if self._alias_table is None:
+            self._alias_table = _build_alias_table(self._weights)
+
+        prob, alias = self._alias_table
+
+        idxs = np.random.randint(len(prob), size=self._num_samples)
+        idxs = np.where(np.random.random(self._num_samples) < prob[idxs],
+                        idxs, alias[idxs])
+
+        return self._indices[idxs]
 
     def __len__(self):
         """
@@ -64,20 +195,20 @@ class PrevalenceRandomSampler(WeightedRandomSampler):
             list of class indices to calculate a weighting from
         """
 
-        weights = np.array(indices).astype(np.float)
-        classes, classes_count = np.unique(indices, return_counts=True)
+        classes, classes_inverse, classes_count = np.unique(
+            indices, return_inverse=True, return_counts=True)
 
         # compute probabilities
         target_prob = 1 / classes.shape[0]
 
         # generate weight matrix
-        for i, c in enumerate(classes):
-            weights[weights == c] = (target_prob / classes_count[i])
+        weights = target_prob / classes_count[classes_inverse]
 
         super().__init__(weights, num_samples=len(indices))
 
     @classmethod
-    def from_dataset(cls, dset: AbstractDataset, key="label", **kwargs):
+    def from_dataset(cls, dset: AbstractDataset, key="label",
+                     label_file=None, **kwargs):
         """
         CLass function to create an instance of this sampler by giving it a
         dataset
@@ -88,8 +219,30 @@ class PrevalenceRandomSampler(WeightedRandomSampler):
             the dataset to create weightings from
         key : str
             the key holding the class index for each sample
+        label_file : str
+            if given, the class indices are loaded from this numpy file
+            if it exists or saved to it otherwise (to avoid obtaining them
+            from the dataset again). Default: None
         **kwargs :
             Additional keyword arguments
 
         """
-        return cls([_sample[key] for _sample in dset], **kwargs)
+        if label_file is not None and os.path.isfile(label_file):
+            labels = np.load(label_file)
+
+            if len(labels) != len(dset):
+                raise ValueError("The label file %s contains %d labels, but "
+                                 "the dataset contains %d samples"
+                                 % (label_file, len(labels), len(dset)))
+
+        else:
+            if isinstance(dset, AbstractDataset):
+                labels = dset.get_labels(key)
+            else:
+                labels = [_sample[key] for _sample in dset]
+
+            if label_file is not None:
+                with open(label_file, "wb") as f:
+                    np.save(f, np.asarray(labels))
+
+        return cls(labels, **kwargs)
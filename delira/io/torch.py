@@ -9,7 +9,7 @@ logger = logging.getLogger(__name__)
 
 
 def save_checkpoint_torch(file: str, model=None, optimizers=None,
-                          epoch=None, **kwargs):
+                          epoch=None, data_loading_state=None, **kwargs):
     """
     Save checkpoint
 
@@ -24,6 +24,9 @@ def save_checkpoint_torch(file: str, model=None, optimizers=None,
         dictionary containing all optimizers
     epoch : int
         current epoch (will also be pickled)
+    data_loading_state : dict
+        the state of the data loading to resume an interrupted epoch
+        (will only be saved if given)
 
     """
     if optimizers is None:
@@ -55,6 +58,9 @@ def save_checkpoint_torch(file: str, model=None, optimizers=None,
              "model": model_state,
              "epoch": epoch}
 
+    if data_loading_state is not None:
+        state["data_loading_state"] = data_loading_state
+
     torch.save(state, file, **kwargs)
 
 
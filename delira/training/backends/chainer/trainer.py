@@ -434,9 +434,8 @@ class ChainerNetworkTrainer(BaseNetworkTrainer):
         datamgr : :class:`DataManager`
             Manager producing a generator holding the batches
         batchsize : int
-            Artificial batchsize (sampling will be done with batchsize
-            1 and sampled data will be stacked to match the artificial
-            batchsize)(default: None)
+            the batchsize to sample the batches with; if None: the
+            batchsize of ``datamgr`` will be used (default: None)
         metrics : dict
             the metrics to calculate
         metric_keys : dict
@@ -495,11 +495,25 @@ class SklearnEstimatorTrainer(BaseNetworkTrainer):
         return BaseNetworkTrainer._search_for_prev_state(path, extensions)
 
     @staticmethod
-    def calc_metrics(batch, metrics: dict = None, metric_keys=None):
+    def calc_metrics(batch, metrics: dict = None, metric_keys=None,
+                     metric_accessors=None, accumulate=False):
         if metrics is None:
             metrics = {}
 
         if metric_keys is None:
             metric_keys = {k: ("pred", "y") for k in metrics.keys()}
 
-        return BaseNetworkTrainer.calc_metrics(batch, metrics, metric_keys)
+        return BaseNetworkTrainer.calc_metrics(batch, metrics, metric_keys,
+                                               metric_accessors, accumulate)
+
+    @staticmethod
+    def resolve_metric_accessors(batch, metrics: dict = None,
+                                 metric_keys=None):
+        if metrics is None:
+            metrics = {}
+
+        if metric_keys is None:
+            metric_keys = {k: ("pred", "y") for k in metrics.keys()}
+
+        return BaseNetworkTrainer.resolve_metric_accessors(batch, metrics,
+                                                           metric_keys)
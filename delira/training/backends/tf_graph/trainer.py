@@ -323,9 +323,8 @@ class TfGraphNetworkTrainer(BaseNetworkTrainer):
         datamgr : :class:`DataManager`
             Manager producing a generator holding the batches
         batch_size : int
-            Artificial batchsize (sampling will be done with batchsize
-            1 and sampled data will be stacked to match the artificial
-            batchsize)(default: None)
+            the batchsize to sample the batches with; if None: the
+            batchsize of ``datamgr`` will be used (default: None)
         metrics : dict
             the metrics to calculate
         metric_keys : dict
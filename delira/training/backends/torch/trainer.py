@@ -14,6 +14,7 @@ from delira.training.base_trainer import BaseNetworkTrainer
 
 from delira.training.backends.torch.utils import create_optims_default
 from delira.training.backends.torch.utils import convert_to_numpy
+from delira.training.backends.torch.utils import detach_tensors
 from delira.training.callbacks.logging_callback import DefaultLoggingCallback
 
 
@@ -460,6 +461,25 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
         return super()._train_single_epoch(batchgen, epoch,
                                            verbose=verbose)
 
+    @staticmethod
+    def _detach(data: dict):
+        """
+        Detaches all tensors from the computation graph (without copying
+        them to the host)
+
+        Parameters
+        ----------
+        data : dict
+            the (nested) tensors to detach
+
+        Returns
+        -------
+        dict
+            the detached tensors
+
+        """
+        return detach_tensors(data)
+
     def predict_data_mgr(self, datamgr, batchsize=None, metrics=None,
                          metric_keys=None, verbose=False, **kwargs):
         """
@@ -470,9 +490,8 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
         datamgr : :class:`DataManager`
             Manager producing a generator holding the batches
         batchsize : int
-            Artificial batchsize (sampling will be done with batchsize
-            1 and sampled data will be stacked to match the artificial
-            batchsize)(default: None)
+            the batchsize to sample the batches with; if None: the
+            batchsize of ``datamgr`` will be used (default: None)
         metrics : dict
             the metrics to calculate
         metric_keys : dict
@@ -515,6 +534,7 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
         if not (file_name.endswith(".pth") or file_name.endswith(".pt")):
             file_name = file_name + ".pt"
         save_checkpoint_torch(file_name, self.module, self.optimizers, epoch,
+                              data_loading_state=self.data_loading_state,
                               **kwargs)
 
     @staticmethod
@@ -569,6 +589,9 @@ class PyTorchNetworkTrainer(BaseNetworkTrainer):
         if "epoch" in new_state:
             self.start_epoch = new_state.pop("epoch")
 
+        if "data_loading_state" in new_state:
+            self._data_loading_state = new_state.pop("data_loading_state")
+
         return super()._update_state(new_state)
 
     @staticmethod
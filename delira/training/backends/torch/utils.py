@@ -32,6 +32,26 @@ def _single_element_tensor_conversion(element):
     return element.cpu().detach().numpy()
 
 
+def detach_tensors(data):
+    """
+    Detaches all :class:`torch.Tensor` in (nested) data from the
+    computation graph without moving them to another device
+
+    Parameters
+    ----------
+    data : Any
+        the (nested) data containing the tensors
+
+    Returns
+    -------
+    Any
+        the data with detached tensors
+
+    """
+    return recursively_convert_elements(data, torch.Tensor,
+                                        torch.Tensor.detach)
+
+
 def convert_to_numpy(*args, **kwargs):
     """
     Converts all :class:`torch.Tensor` in args and kwargs to numpy array
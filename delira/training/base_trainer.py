@@ -1,16 +1,19 @@
 import logging
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pickle
 import typing
 import warnings
 
-from delira.utils.config import LookupConfig
 
 import numpy as np
 from tqdm import tqdm
 
 from .callbacks import AbstractCallback, DefaultLoggingCallback
+from .metrics import is_streaming_metric
 from .predictor import Predictor
+from .utils import recursively_convert_elements
 from ..data_loading import Augmenter, DataManager
 from ..models import AbstractNetwork
 from ..logging import register_logger, make_logger
@@ -58,6 +61,8 @@ class BaseNetworkTrainer(Predictor):
                  metric_keys=None,
                  convert_batch_to_npy_fn=lambda x: x,
                  val_freq=1,
+                 async_metrics=False,
+                 metrics_queue_size=4,
                  **kwargs
                  ):
         """
@@ -140,9 +145,28 @@ class BaseNetworkTrainer(Predictor):
             model (a value of 1 denotes validating every epoch,
             a value of 2 denotes validating every second epoch etc.);
             defaults to 1
+        async_metrics : bool
+            whether to convert the results of each training iteration to
+            numpy and calculate the training metrics in a background thread,
+            which allows the next iteration to start before the previous
+            results are transferred. The callbacks at an iteration's end are
+            still executed in the main thread once its results are available
+            (thus they may be delayed by up to ``metrics_queue_size``
+            iterations); all results are processed before the epoch ends.
+            Each batch is copied to decouple it from the data loading's
+            buffers (default: False)
+        metrics_queue_size : int
+            the maximum number of iterations pending for asynchronous
+            processing; the training waits for the oldest one if this number
+            is reached (default: 4)
         **kwargs :
             Additional keyword arguments
 
+        Raises
+        ------
+        ValueError
+            if ``metrics_queue_size`` is smaller than 1
+
         """
 
         # explicity not call self._setup here to reuse the __init__ of
@@ -178,6 +202,18 @@ class BaseNetworkTrainer(Predictor):
         self._tqdm_desc = "Validate"
         self.val_freq = val_freq
         self._global_iter_num = 1
+
+        if metrics_queue_size < 1:
+            raise ValueError("metrics_queue_size must be at least 1, but got "
+                             "%d" % metrics_queue_size)
+
+        self.async_metrics = async_metrics
+        self.metrics_queue_size = metrics_queue_size
+
+        # augmenter of the running training epoch and loaded data loading
+        # state to resume an interrupted epoch from
+        self._train_augmenter = None
+        self._data_loading_state = None
         self._logging_setup_kwargs = {
             "logging_type": logging_type,
             "logging_kwargs": logging_kwargs,
@@ -330,7 +366,8 @@ class BaseNetworkTrainer(Predictor):
                 **kwargs,
             ))
 
-    def _at_iter_end(self, iter_num, data_dict, metrics, epoch=0, **kwargs):
+    def _at_iter_end(self, iter_num, data_dict, metrics, epoch=0,
+                     global_iter_num=None, **kwargs):
         """
         Defines the behavior executed at an iteration's end
 
@@ -344,10 +381,17 @@ class BaseNetworkTrainer(Predictor):
             calculated metrics
         epoch : int
             number of current epoch
+        global_iter_num : int
+            number of current iter across all epochs; if None: the
+            trainer's current global iteration is used and incremented
+            afterwards (default: None)
         **kwargs :
             additional keyword arguments (forwarded to callback calls)
 
         """
+        if global_iter_num is None:
+            global_iter_num = self._global_iter_num
+            self._global_iter_num += 1
 
         for cb in self._callbacks:
             self._update_state(cb.at_iter_end(
@@ -355,13 +399,11 @@ class BaseNetworkTrainer(Predictor):
                 data_dict=data_dict,
                 metrics=metrics,
                 curr_epoch=epoch,
-                global_iter_num=self._global_iter_num,
+                global_iter_num=global_iter_num,
                 train=True,
                 **kwargs,
             ))
 
-        self._global_iter_num += 1
-
     def _train_single_epoch(self, dmgr_train: DataManager, epoch,
                             verbose=False):
         """
@@ -380,6 +422,15 @@ class BaseNetworkTrainer(Predictor):
 
         batchgen = dmgr_train.get_batchgen(seed=epoch)
 
+        # resume an interrupted epoch after its last trained batch
+        if self._data_loading_state is not None:
+            if self._data_loading_state["seed"] == epoch:
+                batchgen.load_state_dict(self._data_loading_state)
+
+            self._data_loading_state = None
+
+        self._train_augmenter = batchgen
+
         n_batches = dmgr_train.n_batches
         if verbose:
             iterable = tqdm(
@@ -391,32 +442,78 @@ class BaseNetworkTrainer(Predictor):
         else:
             iterable = enumerate(batchgen)
 
-        for iter_num, batch in iterable:
-            self._at_iter_begin(epoch=epoch, iter_num=iter_num)
+        metric_accessors = None
 
-            data_dict = self._prepare_batch(batch)
+        for metric_fn in self.metrics.values():
+            if is_streaming_metric(metric_fn):
+                metric_fn.reset()
 
-            _losses, _preds = self.closure_fn(self.module, data_dict,
-                                              optimizers=self.optimizers,
-                                              losses=self.losses,
-                                              fold=self.fold,
-                                              iter_num=iter_num)
+        # a single worker keeps the iterations in order
+        if self.async_metrics:
+            executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            executor = None
+        pending = deque()
 
-            data_dict = self._convert_to_npy_fn(**data_dict)[1]
-            _preds = self._convert_to_npy_fn(**_preds)[1]
+        try:
+            for iter_num, batch in iterable:
+                self._at_iter_begin(epoch=epoch, iter_num=iter_num)
+
+                # the batch may share its memory with the data loading
+                # (e.g. shared memory slots or reused buffers), which is
+                # overwritten by later batches while this one is pending
+                if executor is not None:
+                    batch = recursively_convert_elements(batch, np.ndarray,
+                                                         np.copy)
+
+                data_dict = self._prepare_batch(batch)
+
+                _losses, _preds = self.closure_fn(self.module, data_dict,
+                                                  optimizers=self.optimizers,
+                                                  losses=self.losses,
+                                                  fold=self.fold,
+                                                  iter_num=iter_num)
+
+                # resolve metric keys only once per epoch (conversion to
+                # numpy preserves the structure)
+                if metric_accessors is None:
+                    metric_accessors = self.resolve_metric_accessors(
+                        {**data_dict, **_preds}, self.metrics,
+                        self.metric_keys)
+
+                iter_args = (epoch, iter_num, self._global_iter_num, batch,
+                             _losses)
+                self._global_iter_num += 1
+                losses.append(_losses)
+
+                if executor is None:
+                    metrics.append(self._finish_iter(
+                        *iter_args, *self._calc_iter_metrics(
+                            data_dict, _preds, metric_accessors)))
+                    continue
+
+                # wait for the oldest iteration to bound the memory of
+                # pending results
+                while len(pending) >= self.metrics_queue_size:
+                    _iter_args, future = pending.popleft()
+                    metrics.append(self._finish_iter(*_iter_args,
+                                                     *future.result()))
 
-            _metrics = self.calc_metrics(
-                LookupConfig(**data_dict, **_preds),
-                self.metrics,
-                self.metric_keys)
+                pending.append((iter_args, executor.submit(
+                    self._calc_iter_metrics, self._detach(data_dict),
+                    self._detach(_preds), metric_accessors)))
 
-            metrics.append(_metrics)
-            losses.append(_losses)
+            # flush all pending iterations of the epoch
+            while pending:
+                _iter_args, future = pending.popleft()
+                metrics.append(self._finish_iter(*_iter_args,
+                                                 *future.result()))
 
-            self._at_iter_end(epoch=epoch, iter_num=iter_num,
-                              data_dict={**batch, **_preds},
-                              metrics={**_metrics, **_losses},
-                              )
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        self._train_augmenter = None
 
         total_losses, total_metrics = {}, {}
 
@@ -434,8 +531,104 @@ class BaseNetworkTrainer(Predictor):
                 else:
                     total_losses[key] = [val]
 
+        # streaming metrics hold the value of the whole epoch
+        for key, metric_fn in self.metrics.items():
+            if is_streaming_metric(metric_fn) and key in total_metrics:
+                total_metrics[key] = metric_fn.compute()
+
         return total_metrics, total_losses
 
+    def _calc_iter_metrics(self, data_dict, preds, metric_accessors):
+        """
+        Converts the results of a training iteration to numpy and calculates
+        the metrics. If ``async_metrics`` is enabled, this runs in a
+        background thread
+
+        Parameters
+        ----------
+        data_dict : dict
+            the prepared batch
+        preds : dict
+            the predictions of the iteration
+        metric_accessors : dict
+            the accessors for each metric's arguments as returned by
+            :meth:`Predictor.resolve_metric_accessors`
+
+        Returns
+        -------
+        dict
+            the predictions converted to numpy
+        dict
+            the metrics of the iteration
+
+        """
+        data_dict = self._convert_to_npy_fn(**data_dict)[1]
+        preds = self._convert_to_npy_fn(**preds)[1]
+
+        _metrics = self.calc_metrics({**data_dict, **preds}, self.metrics,
+                                     metric_accessors=metric_accessors,
+                                     accumulate=True)
+
+        return preds, _metrics
+
+    def _finish_iter(self, epoch, iter_num, global_iter_num, batch, losses,
+                     preds, metrics):
+        """
+        Executes the callbacks at an iteration's end. Always runs in the main
+        thread, since callbacks may modify the trainer's state
+
+        Parameters
+        ----------
+        epoch : int
+            current epoch
+        iter_num : int
+            number of current iter
+        global_iter_num : int
+            number of current iter across all epochs
+        batch : dict
+            the batch as returned by the data loading
+        losses : dict
+            the losses of the iteration
+        preds : dict
+            the predictions of the iteration (converted to numpy)
+        metrics : dict
+            the metrics of the iteration
+
+        Returns
+        -------
+        dict
+            the metrics of the iteration
+
+        """
+        self._at_iter_end(epoch=epoch, iter_num=iter_num,
+                          data_dict={**batch, **preds},
+                          metrics={**metrics, **losses},
+                          global_iter_num=global_iter_num)
+
+        return metrics
+
+    @staticmethod
+    def _detach(data: dict):
+        """
+        Detaches all tensors from the computation graph, to not keep the
+        graph alive while the results of an iteration are pending for
+        asynchronous processing. Does nothing per default and should be
+        overwritten by backends, whose tensors keep references to their
+        graph
+
+        Parameters
+        ----------
+        data : dict
+            the (nested) tensors to detach
+
+        Returns
+        -------
+        dict
+            the detached tensors
+
+        """
+        return data
+
     def train(self, num_epochs, datamgr_train, datamgr_valid=None,
               val_score_key=None, val_score_mode='highest', reduce_mode='mean',
               verbose=True):
@@ -490,6 +683,13 @@ class BaseNetworkTrainer(Predictor):
         else:
             raise ValueError("No valid reduce mode given")
 
+        # streaming metrics are already computed for the whole epoch and must
+        # not be reduced again
+        streaming_keys = set()
+        for key, metric_fn in self.metrics.items():
+            if is_streaming_metric(metric_fn):
+                streaming_keys.update([key, "val_" + key])
+
         for epoch in range(self.start_epoch, num_epochs + 1):
 
             self._at_epoch_begin(val_score_key, epoch,
@@ -522,7 +722,8 @@ class BaseNetworkTrainer(Predictor):
             _, total_metrics = self._convert_to_npy_fn(**total_metrics)
 
             for k, v in total_metrics.items():
-                total_metrics[k] = reduce_fn(v)
+                if k not in streaming_keys:
+                    total_metrics[k] = reduce_fn(v)
 
             # check if metric became better
             if val_score_key is not None:
@@ -643,8 +844,30 @@ class BaseNetworkTrainer(Predictor):
             keyword arguments
 
         """
+        state = {key: val for key, val in vars(self).items()
+                 if key != "_train_augmenter"}
+        state["_data_loading_state"] = self.data_loading_state
+
         with open(file_name, "wb") as f:
-            pickle.dump(vars(self), f, *args, **kwargs)
+            pickle.dump(state, f, *args, **kwargs)
+
+    @property
+    def data_loading_state(self):
+        """
+        Property returning the state of the training's data loading (during
+        an epoch) to resume the epoch after the last trained batch. Saved by
+        :meth:`save_state` (e.g. if called by a callback after an iteration)
+
+        Returns
+        -------
+        dict or None
+            the state of the current training augmenter (or the loaded state,
+            which has not been resumed yet); None if no epoch is running
+        """
+        if self._train_augmenter is not None:
+            return self._train_augmenter.state_dict()
+
+        return self._data_loading_state
 
     @staticmethod
     def load_state(file_name, *args, **kwargs):
@@ -5,13 +5,229 @@ from sklearn.metrics import accuracy_score, balanced_accuracy_score, \
     roc_auc_score
 from sklearn.preprocessing import label_binarize
 
+from collections import Counter
+
 import numpy as np
 
 
-class SklearnClassificationMetric(object):
-    def __init__(self, score_fn, gt_logits=False, pred_logits=True, **kwargs):
+class StreamingMetric(object):
+    """
+    Base class for metrics, which accumulate the statistics of multiple
+    batches in a state of constant size instead of caching the per-batch
+    values. Calling the metric computes its value for a single batch without
+    touching the accumulated state.
+
+    Subclasses have to implement :meth:`StreamingMetric._empty_state`,
+    :meth:`StreamingMetric._accumulate` and :meth:`StreamingMetric._compute`.
+    The default :meth:`StreamingMetric._merge_states` adds the items of two
+    states.
+
+    """
+
+    def __init__(self):
+        self._state = None
+        self.reset()
+
+    @property
+    def streaming(self):
+        """
+        Whether the metric is accumulated over all batches by the
+        :class:`Predictor` and the trainers
+
+        Returns
+        -------
+        bool
+            whether to accumulate the metric
+
+        """
+        return True
+
+    def _empty_state(self):
+        """
+        Creates the state without any accumulated samples
+
+        Returns
+        -------
+        dict
+            the empty state
+
         """
-        Wraps an score function as a metric
+        raise NotImplementedError()
+
+    def _accumulate(self, state: dict, y_true, y_pred):
+        """
+        Adds the statistics of a batch to a given state
+
+        Parameters
+        ----------
+        state : dict
+            the state to update
+        y_true : :class:`numpy.ndarray`
+            ground truth data
+        y_pred : :class:`numpy.ndarray`
+            predictions of network
+
+        Returns
+        -------
+        dict
+            the updated state
+
+        """
+        raise NotImplementedError()
+
+    def _compute(self, state: dict):
+        """
+        Computes the metric from a given state
+
+        Parameters
+        ----------
+        state : dict
+            the state to compute the metric from
+
+        Returns
+        -------
+        Any
+            the metric's value
+
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def _merge_states(state: dict, other_state: dict):
+        """
+        Merges two states
+
+        Parameters
+        ----------
+        state : dict
+            the first state
+        other_state : dict
+            the second state
+
+        Returns
+        -------
+        dict
+            the merged state
+
+        """
+        return {k: v + other_state[k] for k, v in state.items()}
+
+    def update(self, y_true, y_pred):
+        """
+        Adds a batch to the accumulated state
+
+        Parameters
+        ----------
+        y_true : :class:`numpy.ndarray`
+            ground truth data
+        y_pred : :class:`numpy.ndarray`
+            predictions of network
+
+        Returns
+        -------
+        Any
+            the metric's value for the given batch alone
+
+        """
+        batch_state = self._accumulate(self._empty_state(), y_true, y_pred)
+        self._state = self._merge_states(self._state, batch_state)
+        return self._compute(batch_state)
+
+    def compute(self):
+        """
+        Computes the metric for all batches accumulated since the last reset
+
+        Returns
+        -------
+        Any
+            the metric's value
+
+        """
+        return self._compute(self._state)
+
+    def reset(self):
+        """
+        Discards the accumulated state
+
+        """
+        self._state = self._empty_state()
+
+    def merge(self, other):
+        """
+        Adds the state accumulated by another metric (e.g. in another
+        process) to this metric's state
+
+        Parameters
+        ----------
+        other : :class:`StreamingMetric`
+            the metric to merge; must be of the same type
+
+        Returns
+        -------
+        :class:`StreamingMetric`
+            this metric
+
+        Raises
+        ------
+        TypeError
+            if ``other`` is not of the same type
+
+        """
+        if type(other) is not type(self):
+            raise TypeError("Can not merge metric of type %s into metric of "
+                            "type %s" % (type(other).__name__,
+                                         type(self).__name__))
+
+        self._state = self._merge_states(self._state, other._state)
+        return self
+
+    def __call__(self, y_true, y_pred):
+        """
+        Compute the metric for a single batch
+
+        Parameters
+        ----------
+        y_true : :class:`numpy.ndarray`
+            ground truth data
+        y_pred : :class:`numpy.ndarray`
+            predictions of network
+
+        Returns
+        -------
+        Any
+            the metric's value
+
+        """
+        return self._compute(self._accumulate(self._empty_state(), y_true,
+                                              y_pred))
+
+
+def is_streaming_metric(metric_fn):
+    """
+    Checks whether a metric should be accumulated over all batches
+
+    Parameters
+    ----------
+    metric_fn : Any
+        the metric to check
+
+    Returns
+    -------
+    bool
+        whether ``metric_fn`` is a :class:`StreamingMetric` with streaming
+        enabled
+
+    """
+    return isinstance(metric_fn, StreamingMetric) and metric_fn.streaming
+
+
+class SklearnClassificationMetric(StreamingMetric):
+    def __init__(self, score_fn, gt_logits=False, pred_logits=True,
+                 streaming=False, **kwargs):
+        """
+        Wraps an score function as a metric. For streaming evaluation the
+        number of occurrences of each pair of label and prediction is
+        accumulated and passed to ``score_fn`` as ``sample_weight``.
 
         Parameters
         ----------
@@ -21,13 +237,90 @@ class SklearnClassificationMetric(object):
             whether given ``y_true`` are logits or not
         pred_logits : bool
             whether given ``y_pred`` are logits or not
+        streaming : bool
+            whether the metric is accumulated over all batches by the
+            :class:`Predictor` and the trainers instead of being computed
+            per batch (default: False)
         **kwargs:
             variable number of keyword arguments passed to score_fn function
+
+        Notes
+        -----
+        The accumulated value equals the value of ``score_fn`` on all
+        accumulated samples, if ``score_fn`` only depends on the pairs of
+        labels and predictions and supports a ``sample_weight`` (like all
+        wrapped sklearn metrics do). Only a single label and prediction per
+        sample is supported for accumulation (but not for batch-wise
+        computation), thus streaming must not be enabled for multilabel
+        data.
+
         """
         self._score_fn = score_fn
         self._gt_logits = gt_logits
         self._pred_logits = pred_logits
+        self._streaming = streaming
         self.kwargs = kwargs
+        super().__init__()
+
+    @property
+    def streaming(self):
+        return self._streaming
+
+    def _to_labels(self, y_true, y_pred):
+        """
+        Converts logits to labels (if necessary)
+
+        Parameters
+        ----------
+        y_true: np.ndarray
+            ground truth data
+        y_pred: np.ndarray
+            predictions of network
+
+        Returns
+        -------
+        np.ndarray
+            the ground truth labels
+        np.ndarray
+            the predicted labels
+
+        """
+        if self._gt_logits:
+            y_true = np.argmax(y_true, axis=-1)
+
+        if self._pred_logits:
+            y_pred = np.argmax(y_pred, axis=-1)
+
+        return y_true, y_pred
+
+    def _empty_state(self):
+        return {"counts": Counter()}
+
+    def _accumulate(self, state: dict, y_true, y_pred):
+        y_true, y_pred = self._to_labels(y_true, y_pred)
+        y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+
+        # multilabel data can not be described by pairs of labels
+        if y_true.size != len(y_true) or y_pred.size != len(y_pred) \
+                or len(y_true) != len(y_pred):
+            raise ValueError("Accumulating %s requires a single label and "
+                             "prediction per sample, but got labels of shape "
+                             "%s and predictions of shape %s"
+                             % (self.__class__.__name__, str(y_true.shape),
+                                str(y_pred.shape)))
+
+        y_true, y_pred = np.ravel(y_true), np.ravel(y_pred)
+
+        state["counts"].update(zip(y_true.tolist(), y_pred.tolist()))
+        return state
+
+    def _compute(self, state: dict):
+        pairs = list(state["counts"].keys())
+        return self._score_fn(
+            y_true=np.array([pair[0] for pair in pairs]),
+            y_pred=np.array([pair[1] for pair in pairs]),
+            sample_weight=np.array(list(state["counts"].values())),
+            **self.kwargs)
 
     def __call__(self, y_true, y_pred, **kwargs):
         """
@@ -48,12 +341,7 @@ class SklearnClassificationMetric(object):
             result from score function
 
         """
-
-        if self._gt_logits:
-            y_true = np.argmax(y_true, axis=-1)
-
-        if self._pred_logits:
-            y_pred = np.argmax(y_pred, axis=-1)
+        y_true, y_pred = self._to_labels(y_true, y_pred)
 
         return self._score_fn(y_true=y_true, y_pred=y_pred,
                               **kwargs, **self.kwargs)
@@ -225,3 +513,223 @@ class AurocMetric(object):
         if len(self.classes) > 2:
             y_true_bin = label_binarize(y_true, self.classes)
             return roc_auc_score(y_true_bin, y_pred, **kwargs, **self.kwargs)
+
+
+class AccuracyMetric(StreamingMetric):
+    def __init__(self, gt_logits=False, pred_logits=True):
+        """
+        Implements the accuracy by accumulating the number of correct
+        predictions
+
+        Parameters
+        ----------
+        gt_logits : bool
+            whether given ``y_true`` are logits or not
+        pred_logits : bool
+            whether given ``y_pred`` are logits or not
+
+        """
+        self._gt_logits = gt_logits
+        self._pred_logits = pred_logits
+        super().__init__()
+
+    def _empty_state(self):
+        return {"correct": 0, "total": 0}
+
+    def _accumulate(self, state: dict, y_true, y_pred):
+        if self._gt_logits:
+            y_true = np.argmax(y_true, axis=-1)
+
+        if self._pred_logits:
+            y_pred = np.argmax(y_pred, axis=-1)
+
+        correct = np.asarray(y_true) == np.asarray(y_pred)
+        state["correct"] += int(correct.sum())
+        state["total"] += correct.size
+        return state
+
+    def _compute(self, state: dict):
+        return state["correct"] / state["total"]
+
+
+class ConfusionMatrixMetric(StreamingMetric):
+    def __init__(self, num_classes, gt_logits=False, pred_logits=True,
+                 normalize=False):
+        """
+        Implements the confusion matrix (with the ground truth classes as
+        rows and the predicted classes as columns)
+
+        Parameters
+        ----------
+        num_classes : int
+            the number of classes; labels must be in
+            ``range(num_classes)``
+        gt_logits : bool
+            whether given ``y_true`` are logits or not
+        pred_logits : bool
+            whether given ``y_pred`` are logits or not
+        normalize : bool
+            whether to normalize each row to the relative frequencies of the
+            predictions for the corresponding ground truth class
+
+        """
+        self._num_classes = num_classes
+        self._gt_logits = gt_logits
+        self._pred_logits = pred_logits
+        self._normalize = normalize
+        super().__init__()
+
+    def _empty_state(self):
+        return {"confusion": np.zeros((self._num_classes, self._num_classes),
+                                      dtype=np.int64)}
+
+    def _accumulate(self, state: dict, y_true, y_pred):
+        if self._gt_logits:
+            y_true = np.argmax(y_true, axis=-1)
+
+        if self._pred_logits:
+            y_pred = np.argmax(y_pred, axis=-1)
+
+        y_true = np.ravel(y_true).astype(np.int64)
+        y_pred = np.ravel(y_pred).astype(np.int64)
+        flat_idxs = y_true * self._num_classes + y_pred
+
+        state["confusion"] += np.bincount(
+            flat_idxs, minlength=self._num_classes ** 2).reshape(
+            self._num_classes, self._num_classes)
+        return state
+
+    def _compute(self, state: dict):
+        if self._normalize:
+            totals = state["confusion"].sum(axis=1, keepdims=True)
+            return state["confusion"] / np.maximum(totals, 1)
+
+        return state["confusion"].copy()
+
+
+class MeanSquaredErrorMetric(StreamingMetric):
+    def __init__(self, root=False):
+        """
+        Implements the (root) mean squared error by accumulating the sum of
+        squared errors
+
+        Parameters
+        ----------
+        root : bool
+            whether to compute the root mean squared error
+
+        """
+        self._root = root
+        super().__init__()
+
+    def _empty_state(self):
+        return {"squared_error": 0., "total": 0}
+
+    def _accumulate(self, state: dict, y_true, y_pred):
+        diff = np.asarray(y_pred, dtype=np.float64) - np.asarray(y_true)
+        state["squared_error"] += float(np.square(diff).sum())
+        state["total"] += diff.size
+        return state
+
+    def _compute(self, state: dict):
+        mse = state["squared_error"] / state["total"]
+
+        if self._root:
+            return np.sqrt(mse)
+        return mse
+
+
+class BinnedAurocMetric(StreamingMetric):
+    def __init__(self, num_bins=1000, value_range=(0., 1.), pos_label=1):
+        """
+        Implements the auroc metric for binary classification by accumulating
+        histograms of the predicted scores of positive and negative samples
+
+        Parameters
+        ----------
+        num_bins : int
+            the number of histogram bins; samples of different classes
+            falling into the same bin are treated as ties
+        value_range : tuple
+            the range of the predicted scores; scores outside this range are
+            put into the outermost bins
+        pos_label : int
+            the label of the positive class
+
+        Notes
+        -----
+        The result equals :func:`sklearn.metrics.roc_auc_score` if no
+        positive and negative samples share a bin and approximates it
+        otherwise. If only a single class is present, NaN is returned
+        instead of raising an error, since this may happen for single
+        batches.
+
+        """
+        self._num_bins = num_bins
+        self._value_range = value_range
+        self._pos_label = pos_label
+        super().__init__()
+
+    def _empty_state(self):
+        return {"positives": np.zeros(self._num_bins, dtype=np.int64),
+                "negatives": np.zeros(self._num_bins, dtype=np.int64)}
+
+    def _accumulate(self, state: dict, y_true, y_pred):
+        """
+        Adds the statistics of a batch to a given state
+
+        Parameters
+        ----------
+        state : dict
+            the state to update
+        y_true: np.ndarray
+            ground truth data with shape (N)
+        y_pred: np.ndarray
+            predicted scores with shape (N), (N, 1) or (N, 2)
+
+        Returns
+        -------
+        dict
+            the updated state
+
+        Raises
+        ------
+        ValueError
+            if the predictions contain more than two classes
+
+        """
+        y_pred = np.asarray(y_pred)
+        if y_pred.ndim > 1:
+            if y_pred.shape[-1] == 2:
+                y_pred = y_pred[..., 1]
+            elif y_pred.shape[-1] != 1:
+                raise ValueError("Can not compute auroc metric for binary "
+                                 "classes with {} predicted "
+                                 "classes.".format(y_pred.shape[-1]))
+
+        low, high = self._value_range
+        scale = self._num_bins / (high - low)
+        bins = ((np.ravel(y_pred) - low) * scale).astype(np.int64)
+        bins = np.clip(bins, 0, self._num_bins - 1)
+        positive = np.ravel(y_true) == self._pos_label
+
+        state["positives"] += np.bincount(bins[positive],
+                                          minlength=self._num_bins)
+        state["negatives"] += np.bincount(bins[~positive],
+                                          minlength=self._num_bins)
+        return state
+
+    def _compute(self, state: dict):
+        num_pos = state["positives"].sum()
+        num_neg = state["negatives"].sum()
+
+        # not defined for a single class (e.g. in a single batch)
+        if not num_pos or not num_neg:
+            return float("nan")
+
+        # each negative sample is ranked below all positive samples of
+        # higher bins and ties with the ones of the same bin
+        pos_above = num_pos - np.cumsum(state["positives"])
+        correct = state["negatives"] * (pos_above + 0.5 * state["positives"])
+
+        return float(correct.sum() / (num_pos * num_neg))
@@ -0,0 +1,273 @@
+import json
+import os
+
+import numpy as np
+
+
+class MemoryMappedPredictionCache(object):
+    """
+    Caches predictions on disk instead of in memory. The values of each
+    (nested) prediction key are appended to a separate raw file in chunks of
+    a fixed number of samples, so that only a single chunk per key is held in
+    memory. Afterwards the cached predictions are returned as memory-mapped
+    arrays, which are only loaded on access.
+
+    """
+    _INDEX_FILE = "index.json"
+
+    def __init__(self, directory, chunk_size=256):
+        """
+
+        Parameters
+        ----------
+        directory : str
+            the directory to write the cache to; a previous cache in this
+            directory will be overwritten
+        chunk_size : int
+            the number of samples per key to buffer before writing them to
+            disk
+
+        Raises
+        ------
+        ValueError
+            if ``chunk_size`` is smaller than 1
+
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1, but got %d"
+                             % chunk_size)
+
+        os.makedirs(directory, exist_ok=True)
+
+        # invalidate a previous cache
+        if self.exists(directory):
+            os.remove(os.path.join(directory, self._INDEX_FILE))
+
+        self._directory = directory
+        self._chunk_size = chunk_size
+        self._columns = {}
+        self._files = {}
+        self._buffers = {}
+
+    @classmethod
+    def exists(cls, directory):
+        """
+        Checks whether a complete cache exists in the given directory
+
+        Parameters
+        ----------
+        directory : str
+            the directory to check
+
+        Returns
+        -------
+        bool
+            whether a complete cache exists
+
+        """
+        return os.path.isfile(os.path.join(directory, cls._INDEX_FILE))
+
+    def append(self, preds: dict):
+        """
+        Appends the predictions of a batch to the cache
+
+        Parameters
+        ----------
+        preds : dict
+            the (nested) predictions of a batch; all arrays of a key need to
+            have the same shape except for the first (batch) dimension
+
+        Raises
+        ------
+        TypeError
+            if the predictions contain non-string keys or values, which
+            cannot be casted to the dtype of previous values of their key
+        ValueError
+            if the shape of a value does not match the shape of previous
+            values of its key
+
+        """
+        for path, val in self._flatten(preds):
+            # scalars are treated as single values (see
+            # ``Predictor.predict_data_mgr_cache``)
+            val = np.asarray(val)
+            if val.ndim == 0:
+                val = val.reshape(1)
+
+            if path not in self._columns:
+                self._add_column(path, val)
+
+            column = self._columns[path]
+
+            if tuple(val.shape[1:]) != tuple(column["shape"]):
+                raise ValueError("Predictions of key %s have shape %s, but "
+                                 "previous ones had a sample shape of %s"
+                                 % (".".join(path), str(val.shape),
+                                    str(tuple(column["shape"]))))
+
+            self._buffers[path].append(
+                val.astype(column["dtype"], casting="same_kind", copy=False))
+            column["num_samples"] += len(val)
+            column["num_buffered"] += len(val)
+
+            if column["num_buffered"] >= self._chunk_size:
+                self._flush(path)
+
+    def _add_column(self, path, val):
+        """
+        Creates the file for a new key
+
+        Parameters
+        ----------
+        path : tuple
+            the keys leading to the (nested) item
+        val : :class:`numpy.ndarray`
+            the first value of the item
+
+        Raises
+        ------
+        TypeError
+            if ``val`` is not a numeric array
+
+        """
+        if val.dtype.hasobject or val.dtype.kind in "SUV":
+            raise TypeError("Only numeric predictions can be cached on disk, "
+                            "but key %s has dtype %s"
+                            % (".".join(path), str(val.dtype)))
+
+        file = "column_%d.bin" % len(self._columns)
+        self._files[path] = open(os.path.join(self._directory, file), "wb")
+        self._buffers[path] = []
+        self._columns[path] = {"path": list(path), "file": file,
+                               "dtype": val.dtype.str,
+                               "shape": list(val.shape[1:]),
+                               "num_samples": 0, "num_buffered": 0}
+
+    def _flush(self, path):
+        """
+        Writes the buffered values of a key to disk
+
+        Parameters
+        ----------
+        path : tuple
+            the keys leading to the (nested) item
+
+        """
+        for val in self._buffers[path]:
+            self._files[path].write(np.ascontiguousarray(val).tobytes())
+
+        self._buffers[path] = []
+        self._columns[path]["num_buffered"] = 0
+
+    def finalize(self):
+        """
+        Writes all remaining values and the index (which marks the cache as
+        complete) to disk
+
+        Returns
+        -------
+        dict
+            the (nested) memory-mapped predictions
+
+        """
+        for path in self._columns.keys():
+            self._flush(path)
+
+        self.close()
+
+        columns = []
+        for column in self._columns.values():
+            column = dict(column)
+            column.pop("num_buffered")
+            columns.append(column)
+
+        index_file = os.path.join(self._directory, self._INDEX_FILE)
+        with open(index_file + ".tmp", "w") as f:
+            json.dump({"columns": columns}, f)
+
+        os.replace(index_file + ".tmp", index_file)
+
+        return self.load(self._directory)
+
+    def close(self):
+        """
+        Closes all files without finalizing the cache
+
+        """
+        for f in self._files.values():
+            f.close()
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Opens a cache written by :meth:`MemoryMappedPredictionCache.finalize`
+
+        Parameters
+        ----------
+        directory : str
+            the directory containing the cache
+
+        Returns
+        -------
+        dict
+            the (nested) memory-mapped predictions; the arrays are mapped
+            copy-on-write, thus modifying them does not change the cache
+
+        """
+        with open(os.path.join(directory, cls._INDEX_FILE)) as f:
+            columns = json.load(f)["columns"]
+
+        preds = {}
+        for column in columns:
+            dtype = np.dtype(column["dtype"])
+            shape = (column["num_samples"],) + tuple(column["shape"])
+
+            # empty files cannot be mapped
+            if not np.prod(shape) or not dtype.itemsize:
+                val = np.empty(shape, dtype=dtype)
+            else:
+                val = np.memmap(os.path.join(directory, column["file"]),
+                                dtype=dtype, mode="c", shape=shape)
+
+            nested = preds
+            for key in column["path"][:-1]:
+                nested = nested.setdefault(key, {})
+            nested[column["path"][-1]] = val
+
+        return preds
+
+    @staticmethod
+    def _flatten(dict_like: dict, prefix=()):
+        """
+        Iterates over all items of a (nested) dict
+
+        Parameters
+        ----------
+        dict_like : dict
+            the (nested) dict
+        prefix : tuple
+            the keys leading to ``dict_like``
+
+        Yields
+        ------
+        tuple
+            the keys leading to the current item
+        Any
+            the current item
+
+        Raises
+        ------
+        TypeError
+            if the dict contains non-string keys
+
+        """
+        for k, v in dict_like.items():
+            if not isinstance(k, str):
+                raise TypeError("Only string keys can be cached, but got %s"
+                                % repr(k))
+
+            if isinstance(v, dict):
+                yield from MemoryMappedPredictionCache._flatten(v,
+                                                                prefix + (k,))
+            else:
+                yield prefix + (k,), v
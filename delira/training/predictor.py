@@ -1,12 +1,14 @@
 import logging
 import gc
+import operator
 
 import numpy as np
 from tqdm import tqdm
 
 from delira.data_loading import DataManager
 from delira.training.utils import convert_to_numpy_identity
-from ..utils.config import LookupConfig
+from delira.training.metrics import is_streaming_metric
+from delira.training.prediction_cache import MemoryMappedPredictionCache
 
 from delira.training.callbacks import AbstractCallback
 
@@ -221,6 +223,7 @@ class Predictor(object):
             metrics=None,
             metric_keys=None,
             verbose=False,
+            gc_interval=None,
             **kwargs):
         """
         Defines a routine to predict data obtained from a batchgenerator
@@ -231,15 +234,18 @@ class Predictor(object):
         datamgr : :class:`DataManager`
             Manager producing a generator holding the batches
         batchsize : int
-            Artificial batchsize (sampling will be done with batchsize
-            1 and sampled data will be stacked to match the artificial
-            batchsize)(default: None)
+            the batchsize to sample the batches with; if None: the
+            batchsize of ``datamgr`` will be used (default: None)
         metrics : dict
             the metrics to calculate
         metric_keys : dict
             the ``batch_dict`` items to use for metric calculation
         verbose : bool
             whether to show a progress-bar or not, default: False
+        gc_interval : int
+            if given, a full garbage collection is run every ``gc_interval``
+            batches to release memory held by reference cycles; if None:
+            memory is only released by reference counting (default: None)
         kwargs :
             keyword arguments passed to :func:`prepare_batch_fn`
 
@@ -250,84 +256,74 @@ class Predictor(object):
         dict
             a dictionary containing all metrics of the current batch
 
+        Notes
+        -----
+        All instances of :class:`StreamingMetric` in ``metrics`` (with
+        enabled streaming) are reset before the first batch and accumulate
+        all predicted batches, so that :meth:`StreamingMetric.compute`
+        returns their value for the whole dataset afterwards
+
         """
         if metrics is None:
             metrics = {}
-        orig_num_aug_processes = datamgr.n_process_augmentation
-        orig_batch_size = datamgr.batch_size
 
-        if batchsize is None:
-            batchsize = orig_batch_size
+        for metric_fn in metrics.values():
+            if is_streaming_metric(metric_fn):
+                metric_fn.reset()
 
-        datamgr.batch_size = 1
+        if batchsize is None:
+            batchsize = datamgr.batch_size
 
-        batchgen = datamgr.get_batchgen()
+        # sample the actual batches (without changing the manager's
+        # settings); the last batch must not be dropped to predict all
+        # samples
+        batchgen = datamgr.get_batchgen(batch_size=batchsize,
+                                        drop_last=False)
 
-        n_batches = datamgr.n_batches
+        n_batches = datamgr.get_n_batches(batch_size=batchsize,
+                                          drop_last=False)
 
         if verbose:
-            iterable = tqdm(enumerate(batchgen), unit=' sample',
+            iterable = tqdm(enumerate(batchgen), unit=' batch',
                             total=n_batches, desc=self._tqdm_desc)
 
         else:
             iterable = enumerate(batchgen)
 
-        batch_list = []
+        # accessors for the metrics' arguments are resolved on the first batch
+        metric_accessors = None
 
-        for i, batch in iterable:
+        for i, batch_dict in iterable:
             Predictor._at_iter_begin(self, iter_num=i)
 
-            if not batch_list and (n_batches - i) < batchsize:
-                batchsize = n_batches - i
-                logger.debug("Set Batchsize down to %d to avoid cutting "
-                             "of the last batches" % batchsize)
+            batch_dict = self._prepare_batch(batch_dict)
+            preds = self.predict(batch_dict, already_prepared=True,
+                                 **kwargs)
 
-            batch_list.append(batch)
+            # convert batchdict back to numpy (self.predict may convert it
+            # to backend-specific tensor type) - no-op if already numpy
+            batch_dict = self._convert_to_npy_fn(**batch_dict)[1]
 
-            # if queue is full process queue:
-            if batchsize is None or len(batch_list) >= batchsize:
+            preds_batch = {**batch_dict, **preds}
 
-                batch_dict = {}
-                for _batch in batch_list:
-                    for key, val in _batch.items():
-                        if key in batch_dict.keys():
-                            batch_dict[key].append(val)
-                        else:
-                            batch_dict[key] = [val]
+            if metric_accessors is None:
+                metric_accessors = self.resolve_metric_accessors(
+                    preds_batch, metrics=metrics, metric_keys=metric_keys)
 
-                for key, val_list in batch_dict.items():
-                    batch_dict[key] = np.concatenate(val_list)
+            # calculate metrics for predicted batch
+            _metric_vals = self.calc_metrics(
+                preds_batch, metrics=metrics,
+                metric_accessors=metric_accessors, accumulate=True)
 
-                batch_dict = self._prepare_batch(batch_dict)
-                preds = self.predict(batch_dict, already_prepared=True,
-                                     **kwargs)
+            self._at_iter_end(data_dict=preds_batch,
+                              metrics={"val_" + k: v
+                                       for k, v in _metric_vals.items()},
+                              iter_num=i)
 
-                # convert batchdict back to numpy (self.predict may convert it
-                # to backend-specific tensor type) - no-op if already numpy
-                batch_dict = self._convert_to_npy_fn(**batch_dict)[1]
+            yield preds, _metric_vals
 
-                preds_batch = LookupConfig()
-                # explicitly free memory of old lookup config
+            if gc_interval is not None and (i + 1) % gc_interval == 0:
                 gc.collect()
-                preds_batch.update(batch_dict)
-                preds_batch.update(preds)
-
-                # calculate metrics for predicted batch
-                _metric_vals = self.calc_metrics(preds_batch,
-                                                 metrics=metrics,
-                                                 metric_keys=metric_keys)
-
-                self._at_iter_end(data_dict={**batch_dict, **preds_batch},
-                                  metrics={"val_" + k: v
-                                           for k, v in _metric_vals.items()},
-                                  iter_num=i)
-
-                yield preds, _metric_vals
-
-                batch_list = []
-
-        datamgr.batch_size = orig_batch_size
-        datamgr.n_process_augmentation = orig_num_aug_processes
 
         return
 
@@ -343,9 +339,8 @@ class Predictor(object):
         datamgr : :class:`DataManager`
             Manager producing a generator holding the batches
         batchsize : int
-            Artificial batchsize (sampling will be done with batchsize
-            1 and sampled data will be stacked to match the artificial
-            batchsize)(default: None)
+            the batchsize to sample the batches with; if None: the
+            batchsize of ``datamgr`` will be used (default: None)
         metrics : dict
             the metrics to calculate
         metric_keys : dict
@@ -358,7 +353,10 @@ class Predictor(object):
         Yields
         ------
         dict
-            a dictionary containing all validation metrics (maybe empty)
+            a dictionary containing all validation metrics (maybe empty);
+            holds the values of all batches per metric or a single value for
+            the whole dataset in case of a streaming
+            :class:`StreamingMetric`
 
         Notes
         -----
@@ -383,7 +381,8 @@ class Predictor(object):
         return
 
     def predict_data_mgr_cache_all(self, datamgr, batchsize=None, metrics=None,
-                                   metric_keys=None, verbose=False, **kwargs):
+                                   metric_keys=None, verbose=False,
+                                   cache_dir=None, chunk_size=256, **kwargs):
         """
         Defines a routine to predict data obtained from a batchgenerator and
         caches all predictions and metrics (yields them in dicts)
@@ -393,31 +392,42 @@ class Predictor(object):
         datamgr : :class:`DataManager`
             Manager producing a generator holding the batches
         batchsize : int
-            Artificial batchsize (sampling will be done with batchsize
-            1 and sampled data will be stacked to match the artificial
-            batchsize)(default: None)
+            the batchsize to sample the batches with; if None: the
+            batchsize of ``datamgr`` will be used (default: None)
         metrics : dict
             the metrics to calculate
         metric_keys : dict
             the ``batch_dict`` items to use for metric calculation
         verbose : bool
             whether to show a progress-bar or not, default: False
+        cache_dir : str
+            if given, the predictions are cached on disk in this directory
+            (see :class:`MemoryMappedPredictionCache`) instead of in memory
+            (default: None)
+        chunk_size : int
+            the number of samples per prediction key to buffer in memory
+            before writing them to ``cache_dir`` (default: 256)
         kwargs :
             keyword arguments passed to :func:`prepare_batch_fn`
 
         Yields
         ------
         dict
-            a dictionary containing all predictions;
+            a dictionary containing all predictions; memory-mapped arrays if
+            ``cache_dir`` is given
         dict
-            a dictionary containing all validation metrics (maybe empty)
+            a dictionary containing all validation metrics (maybe empty);
+            holds the values of all batches per metric or a single value for
+            the whole dataset in case of a streaming
+            :class:`StreamingMetric`
 
         Warnings
         --------
         Since this function caches all predictions and metrics, this may result
         in huge memory consumption. If you are running out of memory, please
-        have a look at :meth:`Predictor.predict_data_mgr_cache_metrics_only`
-        or :meth:`Predictor.predict_data_mgr`
+        specify a ``cache_dir`` or have a look at
+        :meth:`Predictor.predict_data_mgr_cache_metrics_only` or
+        :meth:`Predictor.predict_data_mgr`
 
         """
         if metrics is None:
@@ -427,13 +437,17 @@ class Predictor(object):
                                                metrics=metrics,
                                                metric_keys=metric_keys,
                                                verbose=verbose,
-                                               cache_preds=True, **kwargs)
+                                               cache_preds=True,
+                                               cache_dir=cache_dir,
+                                               chunk_size=chunk_size,
+                                               **kwargs)
 
         return
 
     def predict_data_mgr_cache(self, datamgr, batchsize=None, metrics=None,
                                metric_keys=None, verbose=False,
-                               cache_preds=False, **kwargs):
+                               cache_preds=False, cache_dir=None,
+                               chunk_size=256, **kwargs):
         """
         Defines a routine to predict data obtained from a batchgenerator and
         caches all predictions and metrics (yields them in dicts)
@@ -443,9 +457,8 @@ class Predictor(object):
         datamgr : :class:`DataManager`
             Manager producing a generator holding the batches
         batchsize : int
-            Artificial batchsize (sampling will be done with batchsize
-            1 and sampled data will be stacked to match the artificial
-            batchsize)(default: None)
+            the batchsize to sample the batches with; if None: the
+            batchsize of ``datamgr`` will be used (default: None)
         metrics : dict
             the metrics to calculate
         metric_keys : dict
@@ -454,13 +467,23 @@ class Predictor(object):
             whether to show a progress-bar or not, default: False
         cache_preds : bool
             whether to also cache predictions
+        cache_dir : str
+            if given, the predictions are cached on disk in this directory
+            (see :class:`MemoryMappedPredictionCache`) instead of in memory;
+            only used if ``cache_preds=True`` (default: None)
+        chunk_size : int
+            the number of samples per prediction key to buffer in memory
+            before writing them to ``cache_dir`` (default: 256)
         kwargs :
             keyword arguments passed to :func:`prepare_batch_fn`
 
         Yields
         ------
         dict
-            a dictionary containing all validation metrics (maybe empty)
+            a dictionary containing all validation metrics (maybe empty);
+            holds the values of all batches per metric or a single value for
+            the whole dataset in case of a streaming
+            :class:`StreamingMetric`
         dict
             a dictionary containing all predictions; If ``cache_preds=True``
 
@@ -471,29 +494,54 @@ class Predictor(object):
         in huge memory consumption. If you are running out of memory, please
         have a look at :meth:`Predictor.predict_data_mgr_cache_metrics_only`
         or :meth:`Predictor.predict_data_mgr` or consider setting
-        ``cache_preds`` to ``False`` (if not done already)
+        ``cache_preds`` to ``False`` (if not done already) or specifying a
+        ``cache_dir``
 
         """
 
         if metrics is None:
             metrics = {}
 
-        predictions_all, metric_vals = [], {k: [] for k in metrics.keys()}
-
-        for preds, _metric_vals in self.predict_data_mgr(
-                datamgr=datamgr,
-                batchsize=batchsize,
-                metrics=metrics,
-                metric_keys=metric_keys,
-                verbose=verbose,
-                **kwargs):
+        # streaming metrics accumulate their state while predicting and
+        # don't need to cache the per-batch values
+        streaming_keys = [k for k, v in metrics.items()
+                          if is_streaming_metric(v)]
 
-            if cache_preds:
-                predictions_all.append(preds)
-            for k, v in _metric_vals.items():
-                metric_vals[k].append(v)
+        predictions_all, metric_vals = [], {k: [] for k in metrics.keys()
+                                            if k not in streaming_keys}
+        n_batches = 0
 
-        if cache_preds:
+        if cache_preds and cache_dir is not None:
+            disk_cache = MemoryMappedPredictionCache(cache_dir, chunk_size)
+        else:
+            disk_cache = None
+
+        try:
+            for preds, _metric_vals in self.predict_data_mgr(
+                    datamgr=datamgr,
+                    batchsize=batchsize,
+                    metrics=metrics,
+                    metric_keys=metric_keys,
+                    verbose=verbose,
+                    **kwargs):
+
+                if disk_cache is not None:
+                    disk_cache.append(preds)
+                elif cache_preds:
+                    predictions_all.append(preds)
+                for k in metric_vals.keys():
+                    metric_vals[k].append(_metric_vals[k])
+                n_batches += 1
+
+            if disk_cache is not None:
+                preds_all = disk_cache.finalize()
+
+        finally:
+            # leaves an incomplete cache without index on errors
+            if disk_cache is not None:
+                disk_cache.close()
+
+        if cache_preds and disk_cache is None:
             # convert predictions from list of dicts to dict of lists
             new_predictions_all = {}
 
@@ -504,12 +552,16 @@ class Predictor(object):
 
             # concatenate lists to single arrays
             preds_all = self.__concatenate_dict_items(new_predictions_all)
-        else:
+        elif not cache_preds:
             preds_all = {}
 
         for k, v in metric_vals.items():
             metric_vals[k] = np.array(v)
 
+        if n_batches:
+            for k in streaming_keys:
+                metric_vals[k] = metrics[k].compute()
+
         if cache_preds:
             yield preds_all, metric_vals
         else:
@@ -574,6 +626,8 @@ class Predictor(object):
 
         Returns
         -------
+        dict
+            the (nested) dict with concatenated items
 
         """
         for k, v in dict_like.items():
@@ -584,7 +638,7 @@ class Predictor(object):
 
             dict_like[k] = v
 
-            return dict_like
+        return dict_like
 
     def __setattr__(self, key, value):
         """
@@ -613,13 +667,14 @@ class Predictor(object):
             super().__setattr__(key, value)
 
     @staticmethod
-    def calc_metrics(batch: LookupConfig, metrics=None, metric_keys=None):
+    def calc_metrics(batch: dict, metrics=None, metric_keys=None,
+                     metric_accessors=None, accumulate=False):
         """
         Compute metrics
 
         Parameters
         ----------
-        batch: LookupConfig
+        batch: dict
             dictionary containing the whole batch
             (including predictions)
         metrics: dict
@@ -629,20 +684,80 @@ class Predictor(object):
             to use for calculating the respective metric.
             If not specified for a metric, the keys "pred" and "label"
             are used per default
+        metric_accessors : dict
+            the accessors for each metric's arguments as returned by
+            :meth:`Predictor.resolve_metric_accessors`; if given,
+            ``metric_keys`` will be ignored. Resolving them once for
+            multiple batches avoids searching the keys for each batch
+        accumulate : bool
+            whether to add the batch to the accumulated state of all
+            instances of :class:`StreamingMetric` with enabled streaming
+            (default: False)
+
+        Returns
+        -------
+        dict
+            dict with metric results (of the current batch)
+        """
+        if metrics is None:
+            metrics = {}
+        if metric_accessors is None:
+            metric_accessors = Predictor.resolve_metric_accessors(
+                batch, metrics, metric_keys)
+
+        results = {}
+        for key, metric_fn in metrics.items():
+            args = [accessor(batch) for accessor in metric_accessors[key]]
+
+            if accumulate and is_streaming_metric(metric_fn):
+                results[key] = metric_fn.update(*args)
+            else:
+                results[key] = metric_fn(*args)
+
+        return results
+
+    @staticmethod
+    def resolve_metric_accessors(batch: dict, metrics=None,
+                                 metric_keys=None):
+        """
+        Resolves the keys of each metric's arguments to functions directly
+        accessing the corresponding items of batches structured like
+        ``batch``. Keys may either contain the full path to a nested item
+        (separated by dots) or the name of a unique item in any (nested)
+        dict
+
+        Parameters
+        ----------
+        batch : dict
+            an example batch (including predictions)
+        metrics: dict
+            dict with metrics
+        metric_keys : dict
+            dict of tuples which contains hashables for specifying the items
+            to use for calculating the respective metric.
+            If not specified for a metric, the keys "pred" and "label"
+            are used per default
 
         Returns
         -------
         dict
-            dict with metric results
+            a tuple of accessors (each accepting a batch and returning the
+            argument's value) per metric
+
+        Raises
+        ------
+        KeyError
+            if no item or multiple items were found for a key
+
         """
         if metrics is None:
             metrics = {}
         if metric_keys is None:
             metric_keys = {k: ("label", "pred") for k in metrics.keys()}
 
-        return {key: metric_fn(*[batch.nested_get(k)
-                                 for k in metric_keys[key]])
-                for key, metric_fn in metrics.items()}
+        return {key: tuple([_resolve_accessor(batch, k)
+                            for k in metric_keys[key]])
+                for key in metrics.keys()}
 
     def register_callback(self, callback: AbstractCallback):
         """
@@ -671,3 +786,76 @@ class Predictor(object):
         assert instance_check or attr_check_both, assertion_str
 
         self._callbacks.append(callback)
+
+
+def _find_key_paths(key, dict_like: dict):
+    """
+    Finds the paths to all occurrences of a key in a (nested) dict
+
+    Parameters
+    ----------
+    key : str
+        the key to search for
+    dict_like : dict
+        the (nested) dict to search
+
+    Returns
+    -------
+    list
+        a tuple of keys per occurrence, leading to the item
+
+    """
+    paths = []
+    for k, v in dict_like.items():
+        if k == key:
+            paths.append((k,))
+        if isinstance(v, dict):
+            paths += [(k,) + path for path in _find_key_paths(key, v)]
+
+    return paths
+
+
+def _resolve_accessor(batch: dict, key):
+    """
+    Resolves a key to a function directly accessing the corresponding item
+
+    Parameters
+    ----------
+    batch : dict
+        an example batch
+    key : str
+        either the path to a nested item (separated by dots) or the name of
+        a unique item in any (nested) dict
+
+    Returns
+    -------
+    function
+        the accessor, which accepts a batch and returns the item
+
+    Raises
+    ------
+    KeyError
+        if no item or multiple items were found for the key
+
+    """
+    if isinstance(key, str) and "." in key:
+        path = tuple(key.split("."))
+    else:
+        paths = _find_key_paths(key, batch)
+
+        if len(paths) > 1:
+            raise KeyError("Multiple Values found for key %s" % key)
+        if not paths:
+            raise KeyError("No Value found for key %s" % key)
+
+        path = paths[0]
+
+    if len(path) == 1:
+        return operator.itemgetter(path[0])
+
+    def _accessor(batch_dict):
+        for k in path:
+            batch_dict = batch_dict[k]
+        return batch_dict
+
+    return _accessor
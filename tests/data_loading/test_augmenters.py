@@ -1,11 +1,42 @@
 from delira.data_loading import Augmenter, DataLoader, SequentialSampler, \
-    AbstractDataset
+    AbstractDataset, RandomSamplerNoReplacement, BaseLazyDataset
+import asyncio
 import numpy as np
 from .utils import DummyDataset
 from ..utils import check_for_no_backend
 
 import unittest
 
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+def _add_noise(**data):
+    data["data"] = data["data"] + np.random.rand(*data["data"].shape)
+    return data
+
+
+class _SlowAsyncLoader(object):
+    """
+    Asynchronous load function simulating the latency of remote storage
+    """
+
+    def __init__(self):
+        self.num_running = 0
+        self.max_running = 0
+
+    async def acall(self, path):
+        self.num_running += 1
+        self.max_running = max(self.max_running, self.num_running)
+        await asyncio.sleep(0.01)
+        self.num_running -= 1
+        return {"data": np.array([path])}
+
+    def __call__(self, path):
+        return {"data": np.array([path])}
+
 
 class TestAugmenters(unittest.TestCase):
     def setUp(self) -> None:
@@ -22,8 +53,14 @@ class TestAugmenters(unittest.TestCase):
         sampler = SequentialSampler.from_dataset(dataset)
 
         if "parallel" in self._testMethodName:
+            self.aug = Augmenter(
+                data_loader, self._batchsize, sampler, 2,
+                drop_last=self._drop_last,
+                shared_memory="shared_memory" in self._testMethodName,
+                ordered="unordered" not in self._testMethodName)
+        elif "threaded" in self._testMethodName:
             self.aug = Augmenter(data_loader, self._batchsize, sampler, 2,
-                                 drop_last=self._drop_last)
+                                 drop_last=self._drop_last, backend="thread")
         else:
             self.aug = Augmenter(data_loader, self._batchsize, sampler, 0,
                                  drop_last=self._drop_last)
@@ -34,22 +71,27 @@ class TestAugmenters(unittest.TestCase):
         if not self._drop_last:
             num_batches += int(bool(self._dset_len % self._batchsize))
 
-        last_idx = 0
+        batch_lengths = []
 
         for batch in self.aug:
             self.assertIsInstance(batch, dict)
+            batch_lengths.append([len(v) for v in batch.values()])
 
-            for v in batch.values():
+        # the (possibly smaller) last batch may arrive at any position if
+        # batches are not delivered in order
+        if "unordered" in self._testMethodName:
+            batch_lengths = sorted(batch_lengths, reverse=True)
+
+        for last_idx, lengths in enumerate(batch_lengths):
+            for length in lengths:
                 # check for batchsize for alll batches except last
                 # (which can be smaller)
                 if self._drop_last or last_idx < num_batches - 1:
-                    self.assertEqual(len(v), self._batchsize)
+                    self.assertEqual(length, self._batchsize)
                 else:
-                    self.assertLess(len(v), self._batchsize)
-
-            last_idx += 1
+                    self.assertLess(length, self._batchsize)
 
-        self.assertEqual(last_idx, num_batches)
+        self.assertEqual(len(batch_lengths), num_batches)
 
     # multiple test functions running the same test with different
     # configurations. Must be done in different functions, because
@@ -66,19 +108,59 @@ class TestAugmenters(unittest.TestCase):
     def test_parallel_drop_last(self):
         self._aug_test()
 
+    @unittest.skipIf(shared_memory is None,
+                     "Shared memory requires python >= 3.8")
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_parallel_shared_memory(self):
+        self._aug_test()
+
+    @unittest.skipIf(shared_memory is None,
+                     "Shared memory requires python >= 3.8")
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_parallel_shared_memory_drop_last(self):
+        self._aug_test()
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_parallel_unordered(self):
+        self._aug_test()
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_parallel_unordered_drop_last(self):
+        self._aug_test()
+
     @unittest.skipUnless(check_for_no_backend(),
                          "Test should be only executed if no "
                          "backend was installed")
     def test_sequential(self):
         self._aug_test()
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_threaded(self):
+        self._aug_test()
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_threaded_drop_last(self):
+        self._aug_test()
+
     @unittest.skipUnless(check_for_no_backend(),
                          "Test should be only executed if no "
                          "backend was installed")
     def test_sequential_drop_last(self):
         self._aug_test()
 
-    def _test_sampler_indices(self, parallel: bool):
+    def _test_sampler_indices(self, parallel: bool, **kwargs):
         class Dataset(AbstractDataset):
             def __init__(self):
                 super().__init__(None, None)
@@ -101,7 +183,7 @@ class TestAugmenters(unittest.TestCase):
 
         if parallel:
             aug = Augmenter(data_loader, 1, sampler, 2,
-                            drop_last=False)
+                            drop_last=False, **kwargs)
         else:
             aug = Augmenter(data_loader, 1, sampler, 0,
                             drop_last=False)
@@ -115,12 +197,145 @@ class TestAugmenters(unittest.TestCase):
     def test_sampling_order_parallel(self):
         self._test_sampler_indices(True)
 
+    @unittest.skipIf(shared_memory is None,
+                     "Shared memory requires python >= 3.8")
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_sampling_order_shared_memory(self):
+        self._test_sampler_indices(True, shared_memory=True)
+
     @unittest.skipUnless(check_for_no_backend(),
                          "Test should be only executed if no "
                          "backend was installed")
     def test_sampling_order_sequential(self):
         self._test_sampler_indices(False)
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_sampling_order_reorder_window(self):
+        self._test_sampler_indices(True, ordered=False, reorder_window=3)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_sampling_order_threaded(self):
+        self._test_sampler_indices(True, backend="thread",
+                                   persistent_workers=True)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_threaded_invalid_settings(self):
+        data_loader = DataLoader({"data": np.arange(10)},
+                                 reuse_buffers=True)
+        sampler = SequentialSampler.from_dataset(data_loader.dataset)
+
+        with self.assertRaises(ValueError):
+            Augmenter(data_loader, 1, sampler, 2, backend="thread")
+
+        with self.assertRaises(ValueError):
+            Augmenter(data_loader, 1, sampler, 2, backend="invalid")
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_async_backend(self):
+        load_fn = _SlowAsyncLoader()
+        dataset = BaseLazyDataset(list(range(60)), load_fn)
+        data_loader = DataLoader(dataset)
+
+        for persistent_workers in [False, True]:
+            with self.subTest(persistent_workers=persistent_workers):
+                sampler = SequentialSampler.from_dataset(dataset)
+                aug = Augmenter(data_loader, 4, sampler, 2,
+                                transforms=_add_noise, backend="async",
+                                max_concurrency=10,
+                                persistent_workers=persistent_workers)
+
+                for _ in range(2):
+                    samples = np.concatenate([batch["data"] for batch in aug])
+                    self.assertTrue(np.allclose(
+                        np.floor(samples[:, 0]), np.arange(60)))
+
+                aug.shutdown()
+
+                # samples of multiple batches are loaded concurrently
+                self.assertLessEqual(load_fn.max_running, 10)
+                self.assertGreater(load_fn.max_running, 4)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_unordered_completeness(self):
+        data_loader = DataLoader({"data": np.arange(50)})
+        sampler = SequentialSampler.from_dataset(data_loader.dataset)
+
+        aug = Augmenter(data_loader, 1, sampler, 3, ordered=False)
+
+        samples = sorted(batch["data"].item() for batch in aug)
+        self.assertListEqual(samples, list(range(50)))
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_prefetch_queue_statistics(self):
+        data_loader = DataLoader({"data": np.zeros((50, 10), np.float32)})
+
+        for prefetch_factor, max_queued_bytes, max_depth in [
+                (1, None, 2), (3, None, 6), (3, 80, 2)]:
+            with self.subTest(prefetch_factor=prefetch_factor,
+                              max_queued_bytes=max_queued_bytes):
+                sampler = SequentialSampler.from_dataset(
+                    data_loader.dataset)
+                aug = Augmenter(data_loader, 1, sampler, 2,
+                                prefetch_factor=prefetch_factor,
+                                max_queued_bytes=max_queued_bytes)
+
+                for _ in aug:
+                    pass
+
+                stats = aug.queue_statistics
+                self.assertEqual(stats["num_batches"], 50)
+                self.assertEqual(stats["mean_batch_bytes"], 40)
+                self.assertLessEqual(stats["max_queue_depth"], max_depth)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_resume_state(self):
+        data_loader = DataLoader({"data": np.arange(40, dtype=np.float64)})
+
+        def create_augmenter(num_processes):
+            sampler = RandomSamplerNoReplacement.from_dataset(
+                data_loader.dataset)
+            return Augmenter(data_loader, 3, sampler, num_processes,
+                             transforms=_add_noise, seed=5)
+
+        for num_processes in [0, 2]:
+            with self.subTest(num_processes=num_processes):
+                expected = [batch["data"].copy() for batch in
+                            create_augmenter(num_processes)]
+
+                # stop iteration after some batches
+                aug = create_augmenter(num_processes)
+                for batch_idx, batch in enumerate(aug):
+                    if batch_idx == 4:
+                        break
+                state = aug.state_dict()
+                self.assertEqual(state["num_batches"], 5)
+                aug.shutdown()
+
+                # resume with the next batch
+                aug = create_augmenter(num_processes)
+                aug.load_state_dict(state)
+                resumed = [batch["data"].copy() for batch in aug]
+
+                self.assertEqual(len(resumed), len(expected) - 5)
+                for batch, expected_batch in zip(resumed, expected[5:]):
+                    self.assertTrue(np.array_equal(batch, expected_batch))
+
 
 if __name__ == '__main__':
     unittest.main()
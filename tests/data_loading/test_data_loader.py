@@ -51,6 +51,54 @@ class DataLoaderTest(unittest.TestCase):
                 for i in range(600)]
         self._test_data_loader(data)
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_data_loader_collation(self):
+        data = [{"data": np.random.rand(1, i + 1), "label": i}
+                for i in range(4)]
+
+        loader = DataLoader(data, ragged_mode="pad", pad_value=-1)
+        batch = loader([0, 3])
+        self.assertTupleEqual(batch["data"].shape, (2, 1, 4))
+        self.assertTrue((batch["data"][0, :, 1:] == -1).all())
+        self.assertTrue((batch["data"][1] == data[3]["data"]).all())
+        self.assertListEqual(batch["label"].tolist(), [0, 3])
+
+        loader = DataLoader(data, ragged_mode="list")
+        batch = loader([1, 2])
+        self.assertIsInstance(batch["data"], list)
+        self.assertTupleEqual(batch["data"][1].shape, (1, 3))
+
+        # equal shapes must not be affected by the ragged mode
+        batch = loader([2, 2])
+        self.assertTupleEqual(batch["data"].shape, (2, 1, 3))
+
+        loader = DataLoader(data)
+        batch = loader([1, 2])
+        self.assertEqual(batch["data"].dtype, object)
+        self.assertTupleEqual(batch["data"].shape, (2,))
+        self.assertTupleEqual(batch["data"][1].shape, (1, 3))
+
+        with self.assertRaises(ValueError):
+            DataLoader(data, ragged_mode="invalid")
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_data_loader_reuse_buffers(self):
+        data = {"data": np.random.rand(10, 3)}
+        loader = DataLoader(data, reuse_buffers=True)
+
+        batch = loader([0, 1, 2])
+        self.assertTrue((batch["data"] == data["data"][:3]).all())
+        buffer = batch["data"]
+
+        # smaller batches should reuse the same memory
+        batch = loader([5, 6])
+        self.assertTrue((batch["data"] == data["data"][5:7]).all())
+        self.assertTrue(np.shares_memory(batch["data"], buffer))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,10 @@
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 
-from delira.data_loading import DataManager
+from delira.data_loading import DataManager, ShardedSampler, \
+    RandomSamplerNoReplacement, BucketBatchSampler, DictDataset
 
 from delira.data_loading.data_manager import Augmenter
 from ..utils import check_for_no_backend
@@ -42,6 +44,146 @@ class DataManagerTest(unittest.TestCase):
         for key, val in next(augmenter_iter).items():
             self.assertEqual(len(val), batch_size)
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_sharded_sampling(self):
+        dset = DummyDataset(50, [0.5, 0.3, 0.2])
+        shard_data = []
+
+        for rank in range(2):
+            manager = DataManager(dset, 4, n_process_augmentation=0,
+                                  transforms=None,
+                                  sampler_cls=ShardedSampler,
+                                  base_sampler_cls=RandomSamplerNoReplacement,
+                                  rank=rank, world_size=2)
+
+            batches = list(manager.get_batchgen(seed=1))
+            self.assertEqual(len(batches), manager.n_batches)
+            self.assertEqual(manager.n_batches, 7)
+            shard_data.append(np.concatenate([batch["data"].reshape(-1)
+                                              for batch in batches]))
+
+        # disjoint shards
+        self.assertEqual(
+            len(np.intersect1d(shard_data[0], shard_data[1])), 0)
+
+        # a seeded sharded sampler draws different samples per epoch
+        manager = DataManager(DictDataset({"label": np.arange(12)}), 2,
+                              n_process_augmentation=0, transforms=None,
+                              sampler_cls=ShardedSampler,
+                              base_sampler_cls=RandomSamplerNoReplacement,
+                              world_size=2, seed=42)
+
+        epochs = [np.concatenate([batch["label"].reshape(-1) for batch in
+                                  manager.get_batchgen(seed=epoch)])
+                  for epoch in [0, 1, 0]]
+        self.assertFalse(np.array_equal(epochs[0], epochs[1]))
+        self.assertTrue(np.array_equal(epochs[0], epochs[2]))
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_bucket_batches(self):
+        data = {"data": [np.zeros((idx % 3 + 1, 2)) for idx in range(30)],
+                "label": list(range(30))}
+
+        manager = DataManager(data, 4, n_process_augmentation=0,
+                              transforms=None,
+                              sampler_cls=RandomSamplerNoReplacement,
+                              batch_sampler_cls=BucketBatchSampler)
+
+        labels = []
+        n_batches = 0
+        for batch in manager.get_batchgen(seed=1):
+            # no padding necessary
+            self.assertEqual(batch["data"].ndim, 3)
+            labels.extend(batch["label"].tolist())
+            n_batches += 1
+
+        self.assertListEqual(sorted(labels), list(range(30)))
+
+        # includes the smaller last batch of each bucket
+        self.assertEqual(n_batches, 9)
+
+        # the length of the batch sampler is cached
+        with patch.object(BucketBatchSampler, "from_dataset",
+                          wraps=BucketBatchSampler.from_dataset) as mock:
+            self.assertEqual(manager.n_batches, n_batches)
+            self.assertEqual(manager.n_batches, n_batches)
+            self.assertEqual(mock.call_count, 0)
+
+            self.assertEqual(manager.get_n_batches(batch_size=5), 6)
+            self.assertEqual(manager.get_n_batches(batch_size=5), 6)
+            self.assertEqual(mock.call_count, 1)
+
+        # precomputed bucket keys are used instead of the values
+        manager = DataManager(data, 4, n_process_augmentation=0,
+                              transforms=None,
+                              sampler_cls=RandomSamplerNoReplacement,
+                              data_loader_kwargs={"ragged_mode": "list"},
+                              batch_sampler_cls=BucketBatchSampler,
+                              batch_sampler_kwargs={
+                                  "bucket_keys": np.arange(30) % 2})
+
+        batches = list(manager.get_batchgen(seed=1))
+        self.assertEqual(len(batches), manager.n_batches)
+        for batch in batches:
+            self.assertEqual(len(np.unique(batch["label"] % 2)), 1)
+            self.assertEqual(len(batch["data"]), len(batch["label"]))
+
+        with self.assertRaises(TypeError):
+            DataManager(data, 4, 0, None, batch_sampler_cls=object)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_persistent_workers(self):
+        batch_size = 4
+
+        dset = DummyDataset(50, [0.5, 0.3, 0.2])
+
+        manager = DataManager(dset, batch_size, n_process_augmentation=2,
+                              transforms=None, persistent_workers=True)
+
+        augmenter = manager.get_batchgen(seed=1)
+        batches = [batch["label"].copy() for batch in augmenter]
+        self.assertEqual(len(batches), manager.n_batches)
+
+        # stop early to check whether pending batches are discarded
+        for _ in zip(range(2), manager.get_batchgen(seed=2)):
+            pass
+
+        # workers must be reused as long as the settings did not change
+        self.assertIs(manager.get_batchgen(seed=1), augmenter)
+        for batch, prev_batch in zip(augmenter, batches):
+            self.assertTrue((batch["label"] == prev_batch).all())
+
+        # changing relevant settings must restart the workers
+        manager.n_process_augmentation = 1
+        self.assertIsNot(manager.get_batchgen(seed=1), augmenter)
+
+        manager.shutdown_workers()
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_threaded_backend(self):
+        data = DictDataset({"data": np.arange(50)})
+
+        manager = DataManager(data, 4, n_process_augmentation=2,
+                              transforms=None, backend="thread")
+
+        batches = [batch["data"] for batch in manager.get_batchgen(seed=1)]
+        self.assertEqual(len(batches), manager.n_batches)
+        self.assertTrue((np.concatenate(batches) == np.arange(50)).all())
+
+        subset = manager.get_subset(list(range(20)))
+        self.assertEqual(subset.backend, "thread")
+
+        with self.assertRaises(ValueError):
+            DataManager(data, 4, 2, None, backend="invalid")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,14 +1,36 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import pickle
+import tempfile
 import unittest
+import weakref
 
 import numpy as np
 
 from delira.data_loading import ConcatDataset, BaseCacheDataset, \
-    BaseExtendCacheDataset, BaseLazyDataset, LoadSample, LoadSampleLabel
+    BaseExtendCacheDataset, BaseLazyDataset, DictDataset, LoadSample, \
+    LoadSampleLabel
 from delira.data_loading.load_utils import norm_zero_mean_unit_std
 
 from ..utils import check_for_no_backend
 
 
+def _load_index_sample(path):
+    if not isinstance(path, int):
+        raise TypeError("Invalid path")
+    return {"data": np.zeros((1, 4)), "label": path}
+
+
+def _load_index_samples(path):
+    return [_load_index_sample(path)] * 2
+
+
+def _load_file_by_name(path):
+    return np.arange(16, dtype=np.int64).reshape(4, 4) * len(path)
+
+
 class DataSubsetConcatTest(unittest.TestCase):
 
     @staticmethod
@@ -143,6 +165,123 @@ class DataSubsetConcatTest(unittest.TestCase):
         except BaseException:
             raise AssertionError('Dataset iteration failed.')
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_cache_dataset_memmap(self):
+        loaded = []
+
+        def load_sample(path, offset=0):
+            loaded.append(path)
+            return {"data": np.full((2, 3), path + offset, dtype=np.float32),
+                    "ragged": np.arange(path + 1),
+                    "label": path,
+                    "name": "sample_%d" % path}
+
+        paths = list(range(5))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, "cache")
+            dataset = BaseCacheDataset(paths, load_sample,
+                                       cache_dir=cache_dir)
+            self.assertListEqual(loaded, paths)
+
+            # reopen existing cache without loading
+            cached_dataset = BaseCacheDataset(paths, load_sample,
+                                              cache_dir=cache_dir)
+            self.assertListEqual(loaded, paths)
+
+            for dset in (dataset, cached_dataset,
+                         pickle.loads(pickle.dumps(cached_dataset.data))):
+                self.assertEqual(len(dset), len(paths))
+
+                for path in paths:
+                    expected = load_sample(path)
+                    sample = dset[path]
+                    self.assertEqual(sample["data"].dtype, np.float32)
+                    self.assertTrue(np.array_equal(sample["data"],
+                                                   expected["data"]))
+                    self.assertTrue(np.array_equal(sample["ragged"],
+                                                   expected["ragged"]))
+                    self.assertEqual(sample["label"], path)
+                    self.assertEqual(sample["name"], expected["name"])
+
+                batch = dset.get_batch([3, 1])
+                self.assertTupleEqual(batch["data"].shape, (2, 2, 3))
+                self.assertTrue((batch["label"] == [3, 1]).all())
+                self.assertEqual(len(batch["ragged"][0]), 4)
+                self.assertListEqual(batch["name"],
+                                     ["sample_3", "sample_1"])
+
+            with self.assertRaises(IndexError):
+                cached_dataset[5]
+
+            self.assertListEqual(cached_dataset.get_labels().tolist(), paths)
+            self.assertListEqual(cached_dataset.get_labels("name"),
+                                 ["sample_%d" % path for path in paths])
+
+            # caches of other data or loading settings are rebuilt
+            num_loaded = len(loaded)
+            rebuilt = BaseCacheDataset(paths[:3], load_sample,
+                                       cache_dir=cache_dir)
+            self.assertEqual(len(rebuilt), 3)
+
+            rebuilt = BaseCacheDataset(paths[:3], load_sample,
+                                       cache_dir=cache_dir, offset=1)
+            self.assertEqual(rebuilt[0]["data"][0, 0], 1)
+            self.assertEqual(len(loaded), num_loaded + 6)
+
+        # samples are written while loading instead of being collected first
+        streamed = []
+
+        def load_streamed_sample(path):
+            if path > 1:
+                self.assertIsNone(streamed[path - 2]())
+            sample = {"data": np.full(2, path, dtype=np.float32)}
+            streamed.append(weakref.ref(sample["data"]))
+            return sample
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dataset = BaseCacheDataset(
+                paths, load_streamed_sample,
+                cache_dir=os.path.join(tmpdir, "streamed"))
+            self.assertListEqual(dataset.get_labels("data")[:, 0].tolist(),
+                                 paths)
+
+            dataset = BaseExtendCacheDataset(
+                paths, _load_index_samples,
+                cache_dir=os.path.join(tmpdir, "extended"))
+            self.assertListEqual(dataset.get_labels().tolist(),
+                                 [p for p in paths for _ in range(2)])
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_cache_dataset_parallel(self):
+        paths = list(range(20))
+
+        for executor in ("thread", "process"):
+            with self.subTest(executor=executor):
+                dataset = BaseCacheDataset(paths, _load_index_sample,
+                                           num_workers=3, executor=executor)
+                self.assertListEqual([sample["label"] for sample in dataset],
+                                     paths)
+
+                dataset = BaseExtendCacheDataset(paths, _load_index_samples,
+                                                 num_workers=3,
+                                                 executor=executor)
+                self.assertListEqual([sample["label"] for sample in dataset],
+                                     [p for p in paths for _ in range(2)])
+
+        # errors are reported with the failing path
+        with self.assertRaisesRegex(RuntimeError, "sample invalid"):
+            BaseCacheDataset(paths + [13, "invalid"], _load_index_sample,
+                             num_workers=2)
+
+        with self.assertRaises(ValueError):
+            BaseCacheDataset(paths, _load_index_sample, num_workers=2,
+                             executor="invalid")
+
     @unittest.skipUnless(check_for_no_backend(),
                          "Test should be only executed if no "
                          "backend was installed")
@@ -169,6 +308,216 @@ class DataSubsetConcatTest(unittest.TestCase):
         except BaseException:
             raise AssertionError('Dataset iteration failed.')
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_get_batch(self):
+        data = {"data": np.arange(20).reshape(10, 2),
+                "label": list(range(10))}
+        indices = [7, 2, 2, 5]
+
+        # dict dataset: batched by key
+        batch = DictDataset(data).get_batch(indices)
+        self.assertTrue((batch["data"] == data["data"][indices]).all())
+        self.assertListEqual(batch["label"], indices)
+
+        # cache dataset: list of samples
+        paths = list(range(10))
+        dataset = BaseCacheDataset(paths, self.load_dummy_sample,
+                                   label_load_fct=None)
+        batch = dataset.get_batch(indices)
+        self.assertEqual(len(batch), len(indices))
+        for idx, sample in zip(indices, batch):
+            self.assertIs(sample, dataset[idx])
+
+        # concat dataset: samples in order of the global indices
+        concat_dataset = ConcatDataset(dataset, DictDataset(data))
+        indices = [12, 3, 19, 0, 15]
+        batch = concat_dataset.get_batch(indices)
+        self.assertEqual(len(batch), len(indices))
+        for idx, sample in zip(indices, batch):
+            self.assertTrue(
+                (sample["data"] == concat_dataset[idx]["data"]).all())
+            self.assertEqual(sample["label"], concat_dataset[idx]["label"])
+
+        with self.assertRaises(IndexError):
+            concat_dataset.get_batch([20])
+
+        # concat dataset of batched datasets: batched dict
+        other_data = {"data": np.arange(30).reshape(10, 3),
+                      "label": list(range(10, 20))}
+        batched_dataset = ConcatDataset(DictDataset(data),
+                                        DictDataset(data),
+                                        DictDataset(other_data))
+        indices = [12, 3, 19, 0, 15, 3]
+        batch = batched_dataset.get_batch(indices)
+        self.assertIsInstance(batch["data"], np.ndarray)
+        self.assertTrue((batch["data"] == np.concatenate(
+            [data["data"], data["data"]])[[idx % 10 for idx in indices]]
+        ).all())
+        self.assertListEqual(batch["label"], [idx % 10 for idx in indices])
+
+        # values of different sample shapes are returned as list
+        batch = batched_dataset.get_batch([25, 3])
+        self.assertIsInstance(batch["data"], list)
+        self.assertTrue((batch["data"][0] == other_data["data"][5]).all())
+        self.assertTrue((batch["data"][1] == data["data"][3]).all())
+        self.assertListEqual(batch["label"], [15, 3])
+
+        # labels without loading
+        self.assertListEqual(
+            list(concat_dataset.get_labels("label")),
+            [dataset[idx]["label"] for idx in range(10)] + list(range(10)))
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_concat_split_indices(self):
+        datasets = [DictDataset({"label": np.arange(length) + offset})
+                    for length, offset in [(3, 0), (0, 3), (5, 3), (2, 8)]]
+        concat_dataset = ConcatDataset(*datasets)
+
+        self.assertEqual(len(concat_dataset), 10)
+        for idx in range(10):
+            self.assertEqual(concat_dataset[idx]["label"], idx)
+
+        with self.assertRaises(IndexError):
+            concat_dataset[10]
+
+        indices = [9, 0, 4, 3, 2, 8]
+        splits = concat_dataset.split_indices(indices)
+        self.assertEqual(len(splits), len(datasets))
+
+        expected = [([0, 2], [1, 4]), ([], []), ([1, 0], [2, 3]),
+                    ([1, 0], [0, 5])]
+        for (local_indices, positions), (exp_indices, exp_positions) in zip(
+                splits, expected):
+            self.assertListEqual(local_indices.tolist(), exp_indices)
+            self.assertListEqual(positions.tolist(), exp_positions)
+
+        with self.assertRaises(IndexError):
+            concat_dataset.split_indices([-1])
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_lazy_dataset_cache(self):
+        # samples of equal size
+        paths = list(range(1, 5))
+        dataset = BaseLazyDataset(paths, _load_index_sample,
+                                  max_cache_bytes=1000)
+        dataset[0]
+        sample_bytes = dataset.cache_statistics["num_bytes"]
+
+        # cache two samples
+        dataset = BaseLazyDataset(paths, _load_index_sample,
+                                  max_cache_bytes=2 * sample_bytes)
+
+        dataset[0]
+        dataset[1]
+        dataset[0]
+        # evicts sample 1
+        dataset[2]
+        dataset[1]
+
+        stats = dataset.cache_statistics
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 4)
+        self.assertEqual(stats["num_samples"], 2)
+        self.assertEqual(stats["num_bytes"], 2 * sample_bytes)
+
+        # cached samples must not be modified by the caller
+        dataset[1]["data"] = None
+        self.assertIsNotNone(dataset[1]["data"])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dataset = BaseLazyDataset(paths, _load_index_sample,
+                                      max_cache_bytes=sample_bytes,
+                                      spill_dir=tmpdir)
+
+            for idx in range(len(paths)):
+                dataset[idx]
+
+            for idx, path in enumerate(paths):
+                self.assertEqual(dataset[idx]["label"], path)
+
+            stats = dataset.cache_statistics
+            self.assertEqual(stats["misses"], 4)
+            self.assertEqual(stats["disk_hits"], 4)
+
+        # concurrent access by multiple threads
+        dataset = BaseLazyDataset(list(range(20)), _load_index_sample,
+                                  max_cache_bytes=3 * sample_bytes)
+        indices = np.random.RandomState(0).randint(0, 20, 2000)
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            labels = list(executor.map(
+                lambda idx: dataset[idx]["label"], indices))
+
+        self.assertListEqual(labels, indices.tolist())
+        stats = dataset.cache_statistics
+        self.assertEqual(stats["hits"] + stats["misses"], len(indices))
+        self.assertLessEqual(stats["num_samples"], 3)
+        self.assertEqual(stats["num_bytes"],
+                         stats["num_samples"] * sample_bytes)
+
+        # the lock must not prevent pickling
+        self.assertEqual(pickle.loads(pickle.dumps(dataset))[0]["label"], 0)
+
+        self.assertDictEqual(
+            BaseLazyDataset(paths, _load_index_sample).cache_statistics, {})
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_async_loading(self):
+        async def load_async(path):
+            await asyncio.sleep(0.01)
+            return _load_index_sample(path)
+
+        async def load_all(dset):
+            return await asyncio.gather(*[dset.aget(idx)
+                                          for idx in range(len(dset))])
+
+        paths = list(range(1, 5))
+        for load_fn in [load_async, _load_index_sample]:
+            with self.subTest(load_fn=load_fn.__name__):
+                dataset = BaseLazyDataset(paths, load_fn, max_cache_bytes=1000)
+                concat_dataset = ConcatDataset(dataset, dataset)
+
+                loop = asyncio.new_event_loop()
+                try:
+                    samples = loop.run_until_complete(load_all(dataset))
+                    concat_samples = loop.run_until_complete(
+                        load_all(concat_dataset))
+                finally:
+                    loop.close()
+
+                self.assertListEqual([sample["label"] for sample in samples],
+                                     paths)
+                self.assertListEqual(
+                    [sample["label"] for sample in concat_samples],
+                    paths * 2)
+                self.assertEqual(dataset.cache_statistics["misses"], 4)
+                self.assertEqual(dataset.cache_statistics["hits"], 8)
+
+                # synchronous access is supported for both load functions
+                self.assertEqual(dataset[1]["label"], 2)
+
+        # files of a sample are loaded concurrently
+        sample_fn = LoadSampleLabel({'data': ['a', 'b'], 'seg': ['c']},
+                                    lambda path: np.full((2, 2), len(path)),
+                                    'label', lambda path: {'label': path})
+        loop = asyncio.new_event_loop()
+        try:
+            sample = loop.run_until_complete(sample_fn.acall('load'))
+        finally:
+            loop.close()
+
+        expected = sample_fn('load')
+        self.assertSetEqual(set(sample.keys()), set(expected.keys()))
+        for key in expected.keys():
+            self.assertTrue(np.array_equal(sample[key], expected[key]))
+
     @unittest.skipUnless(check_for_no_backend(),
                          "Test should be only executed if no "
                          "backend was installed")
@@ -217,6 +566,56 @@ class DataSubsetConcatTest(unittest.TestCase):
         assert np.isclose(sample['data2'].min(), -1)
         assert sample['label'] == 42
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_load_sample_parallel(self):
+        sample_ext = {'data': ['t1', 't2', 'flair'], 'seg': ['seg']}
+        kwargs = {'dtype': {'data': 'float32', 'seg': 'uint8'},
+                  'normalize': ('t2',)}
+
+        sample_fn = LoadSampleLabel(sample_ext, _load_file_by_name, 'label',
+                                    lambda path: {'label': path}, **kwargs)
+        expected = sample_fn('load')
+
+        parallel_fn = LoadSampleLabel(sample_ext, _load_file_by_name,
+                                      'label', lambda path: {'label': path},
+                                      num_workers=3, **kwargs)
+        sample = parallel_fn('load')
+
+        self.assertSetEqual(set(sample.keys()), set(expected.keys()))
+        self.assertEqual(sample['label'], os.path.join('load', 'label'))
+        for key in ('data', 'seg'):
+            self.assertEqual(sample[key].dtype, np.dtype(kwargs['dtype'][key]))
+            self.assertTrue(np.array_equal(sample[key], expected[key]))
+
+        self.assertTupleEqual(sample['data'].shape, (3, 4, 4))
+        self.assertTrue(np.isclose(sample['data'][1].max(), 1))
+
+        # thread pool is not pickled but created again
+        sample_fn = LoadSample(sample_ext, _load_file_by_name,
+                               norm_fn=norm_zero_mean_unit_std, num_workers=2)
+        sample_fn('load')
+        sample_fn = pickle.loads(pickle.dumps(sample_fn))
+        self.assertEqual(sample_fn('load')['data'].dtype, np.int64)
+
+        # forked processes create their own thread pool
+        if "fork" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("fork")
+            queue = ctx.Queue()
+            process = ctx.Process(target=lambda: queue.put(
+                sample_fn('load')['data'].shape), daemon=True)
+            process.start()
+            try:
+                self.assertTupleEqual(queue.get(timeout=30), (3, 4, 4))
+            finally:
+                process.terminate()
+                process.join()
+
+        with self.assertRaises(ValueError):
+            LoadSample({'data': ['a', 'bb']},
+                       lambda path: np.zeros(len(path)))('load')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -59,6 +59,27 @@ class NumbaTest(unittest.TestCase):
         self.compare_transform_outputs(self._basic_compose_trafo,
                                        self._numba_compose_trafo)
 
+    @unittest.skipIf(numba is None, "Numba must be imported successfully")
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_compose_warmup(self):
+        input_data = self._input["data"].copy()
+        timings = self._numba_compose_trafo.warmup(self._input, num_runs=2)
+
+        self.assertListEqual(list(timings.keys()),
+                             ["0_PadTransform", "1_ZoomTransform"])
+        for trafo_timings in timings.values():
+            self.assertGreaterEqual(trafo_timings["compile_time"], 0)
+            self.assertGreater(trafo_timings["run_time"], 0)
+
+        self.assertDictEqual(self._numba_compose_trafo.timings, timings)
+        # example batch must not be modified
+        self.assertTrue(np.array_equal(self._input["data"], input_data))
+
+        self.compare_transform_outputs(self._basic_compose_trafo,
+                                       self._numba_compose_trafo)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,11 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 from delira.data_loading.sampler import RandomSamplerWithReplacement, \
     PrevalenceRandomSampler, SequentialSampler, \
-    RandomSamplerNoReplacement, BatchSampler, AbstractSampler
+    RandomSamplerNoReplacement, BatchSampler, AbstractSampler, \
+    WeightedRandomSampler, ShardedSampler, BucketBatchSampler
 
 from ..utils import check_for_no_backend
 from .utils import DummyDataset
@@ -35,6 +38,70 @@ class SamplerTest(unittest.TestCase):
                             if truncate:
                                 self.assertLessEqual(len(batch), batchsize)
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should only be executed "
+                         "if no backend is installed/specified")
+    def test_batch_sampler_arrays(self):
+        np.random.seed(1)
+        sampler = RandomSamplerNoReplacement.from_dataset(self.dset)
+        np.random.seed(1)
+        expected = sampler.epoch_indices()
+
+        np.random.seed(1)
+        batches = list(BatchSampler(sampler, 7))
+
+        for batch in batches:
+            self.assertIsInstance(batch, np.ndarray)
+
+        self.assertListEqual([len(batch) for batch in batches],
+                             [7] * 85 + [5])
+        self.assertTrue(np.array_equal(np.concatenate(batches), expected))
+
+        # samplers without vectorized implementation
+        class IterSampler(AbstractSampler):
+            def __iter__(self):
+                return iter(range(len(self._indices)))
+
+        batches = list(BatchSampler(IterSampler(list(range(10))), 4,
+                                    drop_last=True))
+        self.assertListEqual([batch.tolist() for batch in batches],
+                             [[0, 1, 2, 3], [4, 5, 6, 7]])
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should only be executed "
+                         "if no backend is installed/specified")
+    def test_bucket_batch_sampler(self):
+        bucket_keys = [idx % 3 for idx in range(20)]
+
+        for drop_last in [True, False]:
+            with self.subTest(drop_last=drop_last):
+                np.random.seed(1)
+                sampler = BucketBatchSampler(
+                    RandomSamplerNoReplacement(list(range(20))), 3,
+                    bucket_keys, drop_last=drop_last)
+                batches = list(sampler)
+                self.assertEqual(len(batches), len(sampler))
+
+                for batch in batches:
+                    self.assertEqual(len(set([bucket_keys[idx]
+                                              for idx in batch])), 1)
+
+                if drop_last:
+                    self.assertListEqual(
+                        sorted([len(batch) for batch in batches]), [3] * 6)
+                else:
+                    self.assertListEqual(
+                        sorted([len(batch) for batch in batches]),
+                        [1, 1, 3, 3, 3, 3, 3, 3])
+                    self.assertListEqual(
+                        sorted(np.concatenate(batches).tolist()),
+                        list(range(20)))
+
+        # sampling order is kept within buckets
+        sampler = BucketBatchSampler(SequentialSampler(list(range(20))), 4,
+                                     bucket_keys, shuffle=False)
+        self.assertListEqual(next(iter(sampler)).tolist(), [0, 3, 6, 9])
+
     @unittest.skipUnless(check_for_no_backend(),
                          "Test should only be executed "
                          "if no backend is installed/specified")
@@ -100,6 +167,99 @@ class SamplerTest(unittest.TestCase):
         self.assertTrue(
             (num_samples_per_class.min() - num_samples_per_class.max()) <= 1)
 
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should only be executed "
+                         "if no backend is installed/specified")
+    def test_weighted_sampler(self):
+        np.random.seed(1)
+        weights = [0., 1., 3., 0., 4.]
+        sampler = WeightedRandomSampler(weights, num_samples=8000)
+        self.assertEqual(len(sampler), 8000)
+
+        samples = np.array(list(sampler))
+        self.assertTrue(np.allclose(np.bincount(samples, minlength=5) / 8000,
+                                    np.array(weights) / 8, atol=0.02))
+
+        # re-weight samples
+        sampler.update_weights([0, 4], [4., 0.])
+        samples = np.array(list(sampler))
+        self.assertTrue(np.allclose(np.bincount(samples, minlength=5) / 8000,
+                                    [0.5, 0.125, 0.375, 0., 0.], atol=0.02))
+
+        with self.assertRaises(ValueError):
+            WeightedRandomSampler([0., 0.])
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should only be executed "
+                         "if no backend is installed/specified")
+    def test_sharded_sampler(self):
+        world_size = 7
+
+        for pad in [True, False]:
+            with self.subTest(pad=pad):
+                shards = []
+                for rank in range(world_size):
+                    np.random.seed(1)
+                    sampler = ShardedSampler.from_dataset(
+                        self.dset, RandomSamplerNoReplacement, rank=rank,
+                        world_size=world_size, pad=pad)
+                    shards.append(list(sampler))
+                    self.assertEqual(len(shards[-1]), len(sampler))
+
+                # equal lengths
+                self.assertEqual(len(set([len(shard) for shard in shards])),
+                                 1)
+
+                samples = np.concatenate(shards)
+                if pad:
+                    self.assertEqual(len(samples), 602)
+                    self.assertEqual(len(np.unique(samples)), 600)
+                else:
+                    self.assertEqual(len(samples), 595)
+                    self.assertEqual(len(np.unique(samples)), 595)
+
+        # seeded shards are reproducible and independent of the global state
+        sampler = ShardedSampler(
+            RandomSamplerNoReplacement.from_dataset(self.dset), rank=1,
+            world_size=2, seed=3)
+        np.random.seed(1)
+        shard = list(sampler)
+        np.random.seed(2)
+        self.assertListEqual(list(sampler), shard)
+        sampler.set_epoch(1)
+        self.assertNotEqual(list(sampler), shard)
+
+        with self.assertRaises(ValueError):
+            ShardedSampler(SequentialSampler.from_dataset(self.dset), rank=2,
+                           world_size=2)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should only be executed "
+                         "if no backend is installed/specified")
+    def test_prevalence_sampler_labels(self):
+        labels = self.dset.get_labels("label")
+        self.assertListEqual(list(labels), [self.dset[idx]["label"]
+                                            for idx in range(len(self.dset))])
+
+        sampler = PrevalenceRandomSampler(labels)
+
+        # all classes have the same probability
+        class_probs = np.bincount(labels, weights=sampler._weights)
+        self.assertTrue(np.allclose(class_probs, 1 / 3))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            label_file = os.path.join(tmpdir, "labels")
+            sampler = PrevalenceRandomSampler.from_dataset(
+                self.dset, label_file=label_file)
+            self.assertTrue(os.path.isfile(label_file))
+
+            # labels are read from file instead of the dataset
+            self.dset._labels = [0] * len(self.dset)
+            cached_sampler = PrevalenceRandomSampler.from_dataset(
+                self.dset, label_file=label_file)
+            self.assertTrue(np.allclose(sampler._weights,
+                                        cached_sampler._weights))
+
     @unittest.skipUnless(check_for_no_backend(),
                          "Test should only be executed "
                          "if no backend is installed/specified"
@@ -1,9 +1,25 @@
+import threading
 import unittest
 import numpy as np
 from tests.utils import check_for_sklearn_backend
 from delira.utils import DeliraConfig
 from sklearn.metrics import mean_absolute_error
-from .utils import create_experiment_test_template_for_backend, DummyDataset
+from delira.training.callbacks import AbstractCallback
+from .utils import create_experiment_test_template_for_backend, \
+    DummyDataset, run_experiment
+
+
+class _ThreadRecordingCallback(AbstractCallback):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+        self.global_iters = []
+
+    def at_iter_end(self, trainer, global_iter_num, train=False, **kwargs):
+        if train:
+            self.threads.add(threading.current_thread())
+            self.global_iters.append(global_iter_num)
+        return {}
 
 
 class TestSklearnBackend(
@@ -54,8 +70,9 @@ class TestSklearnBackend(
                 "len_test": len_test,
                 "key_mapping": {"X": "X"},
                 "metric_keys": {"L1": ("pred", "y"),
-                                "mae": ("pred", "y")}
-            } for _cls in model_cls
+                                "mae": ("pred", "y")},
+                "async_metrics": async_metrics
+            } for _cls in model_cls for async_metrics in [False, True]
         ]
         self._experiment_cls = experiment_cls
 
@@ -92,6 +109,27 @@ class TestSklearnBackend(
                          config.nested_get("metrics", {}),
                          metric_keys)
 
+    @unittest.skipUnless(check_for_sklearn_backend(),
+                         "Test should only be executed if SKLEARN backend is "
+                         "installed and specified")
+    def test_async_metrics_callbacks(self):
+        for case in self._test_cases:
+            if not case["async_metrics"]:
+                continue
+
+            with self.subTest(case=case):
+                callback = _ThreadRecordingCallback()
+                case["callbacks"] = [callback]
+                run_experiment(self._experiment_cls, metrics_queue_size=2,
+                               **case)
+
+                # callbacks must be executed in order in the main thread
+                self.assertSetEqual(callback.threads,
+                                    {threading.main_thread()})
+                self.assertListEqual(
+                    callback.global_iters,
+                    list(range(1, len(callback.global_iters) + 1)))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,11 @@
 import numpy as np
-from sklearn.metrics import accuracy_score
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
 import unittest
 
+from delira.training import Predictor
 from delira.training.metrics import SklearnClassificationMetric, \
-    SklearnAccuracyScore, AurocMetric
+    SklearnAccuracyScore, SklearnF1Score, AurocMetric, AccuracyMetric, \
+    ConfusionMatrixMetric, MeanSquaredErrorMetric, BinnedAurocMetric
 
 from ..utils import check_for_no_backend
 
@@ -46,6 +48,114 @@ class TestMetrics(unittest.TestCase):
         score_auc = metric_auc(target, pred)
         self.assertEqual(score_auc, 0.5)
 
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed "
+        "if no backend is specified")
+    def test_streaming_metrics(self):
+        """
+        Test accumulating metrics over multiple batches
+        """
+        np.random.seed(1)
+        target = np.random.randint(0, 3, 100)
+        logits = np.random.rand(100, 3)
+        pred = logits.argmax(-1)
+        batches = [slice(0, 7), slice(7, 50), slice(50, 100)]
+
+        metrics = {
+            "f1": (SklearnF1Score(average="macro", streaming=True), logits,
+                   f1_score(target, pred, average="macro")),
+            "acc": (AccuracyMetric(), logits, accuracy_score(target, pred)),
+            "mse": (MeanSquaredErrorMetric(), pred,
+                    ((pred - target) ** 2).mean()),
+        }
+
+        for name, (metric, y_pred, expected) in metrics.items():
+            with self.subTest(metric=name):
+                for _slice in batches:
+                    # update returns the value of the batch alone
+                    self.assertAlmostEqual(
+                        metric.update(target[_slice], y_pred[_slice]),
+                        metric(target[_slice], y_pred[_slice]))
+
+                self.assertAlmostEqual(metric.compute(), expected)
+
+                metric.reset()
+                metric.update(target[:7], y_pred[:7])
+                self.assertAlmostEqual(metric.compute(),
+                                       metric(target[:7], y_pred[:7]))
+
+        confusion = ConfusionMatrixMetric(3)
+        other = ConfusionMatrixMetric(3)
+        confusion.update(target[:50], logits[:50])
+        other.update(target[50:], logits[50:])
+        confusion.merge(other)
+        expected = np.zeros((3, 3), dtype=np.int64)
+        np.add.at(expected, (target, pred), 1)
+        self.assertTrue(np.array_equal(confusion.compute(), expected))
+
+        with self.assertRaises(TypeError):
+            confusion.merge(AccuracyMetric())
+
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed "
+        "if no backend is specified")
+    def test_sklearn_metric_streaming_opt_in(self):
+        """
+        Test that sklearn metrics are only accumulated if enabled
+        """
+        def score_fn(y_true, y_pred):
+            return (y_true == y_pred).mean()
+
+        target = np.array([[1, 0, 1], [0, 1, 1]])
+        pred = np.array([[1, 0, 0], [0, 1, 1]])
+        batch = {"label": target, "pred": pred}
+
+        metrics = {
+            "custom": SklearnClassificationMetric(score_fn, pred_logits=False),
+            "f1_micro": SklearnF1Score(pred_logits=False, average="micro"),
+            "f1_samples": SklearnF1Score(pred_logits=False,
+                                         average="samples")}
+
+        # computed per batch for score functions without sample_weight and
+        # multilabel data
+        results = Predictor.calc_metrics(batch, metrics, accumulate=True)
+        self.assertAlmostEqual(results["custom"], 5 / 6)
+        self.assertAlmostEqual(results["f1_micro"],
+                               f1_score(target, pred, average="micro"))
+        self.assertAlmostEqual(results["f1_samples"],
+                               f1_score(target, pred, average="samples"))
+
+        # multilabel data can not be accumulated
+        with self.assertRaises(ValueError):
+            SklearnF1Score(pred_logits=False, average="micro",
+                           streaming=True).update(target, pred)
+
+    @unittest.skipUnless(
+        check_for_no_backend(),
+        "Test should only be executed "
+        "if no backend is specified")
+    def test_binned_auroc_metric(self):
+        """
+        Test histogram-binned auroc metric
+        """
+        np.random.seed(1)
+        target = np.random.randint(0, 2, 200)
+        # values lie on the bin centers to avoid ties between the classes
+        pred = (np.random.permutation(200) + 0.5) / 200
+
+        metric = BinnedAurocMetric(num_bins=200)
+        for idx in range(0, 200, 64):
+            metric.update(target[idx:idx + 64],
+                          np.stack([1 - pred, pred], -1)[idx:idx + 64])
+
+        self.assertAlmostEqual(metric.compute(), roc_auc_score(target, pred))
+
+        metric.reset()
+        metric.update(np.ones(3), pred[:3])
+        self.assertTrue(np.isnan(metric.compute()))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,161 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from delira.data_loading import DataManager, DictDataset
+from delira.training import Predictor
+from delira.training.metrics import MeanSquaredErrorMetric
+
+from ..utils import check_for_no_backend
+
+
+class _DummyModel(object):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, x):
+        self.batch_sizes.append(len(x))
+        return {"pred": x * 2}
+
+
+class _NestedDummyModel(object):
+    def __call__(self, x):
+        return {"pred": x * 2, "aux": {"idx": x.astype(np.int64),
+                                       "img": np.repeat(x[:, None], 3, 1)}}
+
+
+class TestPredictor(unittest.TestCase):
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_predict_data_mgr(self):
+        data = np.arange(10, dtype=np.float32)
+        manager = DataManager(DictDataset({"data": data, "label": data}),
+                              batch_size=3, n_process_augmentation=0,
+                              transforms=None, drop_last=True)
+
+        model = _DummyModel()
+        predictor = Predictor(model, key_mapping={"x": "data"})
+
+        for batchsize, batch_sizes in [(None, [3, 3, 3, 1]), (4, [4, 4, 2])]:
+            with self.subTest(batchsize=batchsize):
+                model.batch_sizes = []
+                preds, metrics = next(predictor.predict_data_mgr_cache_all(
+                    manager, batchsize,
+                    metrics={"mae": lambda gt, pred: np.abs(
+                        gt * 2 - pred).mean()}))
+
+                # predicts real batches and keeps the last smaller one
+                self.assertListEqual(model.batch_sizes, batch_sizes)
+                self.assertTrue(np.array_equal(preds["pred"], data * 2))
+                self.assertEqual(len(metrics["mae"]), len(batch_sizes))
+                self.assertTrue((metrics["mae"] == 0).all())
+
+        # settings of the manager must not be changed
+        self.assertEqual(manager.batch_size, 3)
+        self.assertTrue(manager.drop_last)
+        self.assertEqual(manager.n_batches, 3)
+
+        # explicit memory release
+        preds = list(predictor.predict_data_mgr(manager, gc_interval=2))
+        self.assertEqual(len(preds), 4)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_resolve_metric_accessors(self):
+        batch = {"label": 1, "pred": {"out": 2, "aux": {"out": 3}},
+                 "extra": 4}
+        metrics = {"diff": lambda a, b: a - b, "first": lambda a: a}
+
+        accessors = Predictor.resolve_metric_accessors(
+            batch, metrics, {"diff": ("extra", "pred.aux.out"),
+                             "first": ("label",)})
+        self.assertDictEqual(
+            Predictor.calc_metrics(batch, metrics,
+                                   metric_accessors=accessors),
+            {"diff": 1, "first": 1})
+
+        # accessors can be reused for batches of the same structure
+        batch = {"label": 5, "pred": {"out": 2, "aux": {"out": 1}},
+                 "extra": 7}
+        self.assertDictEqual(
+            Predictor.calc_metrics(batch, metrics,
+                                   metric_accessors=accessors),
+            {"diff": 6, "first": 5})
+
+        # keys are searched in nested dicts if not unique
+        with self.assertRaises(KeyError):
+            Predictor.resolve_metric_accessors(batch, {"first": metrics[
+                "first"]}, {"first": ("out",)})
+
+        with self.assertRaises(KeyError):
+            Predictor.resolve_metric_accessors(batch, {"first": metrics[
+                "first"]}, {"first": ("missing",)})
+
+        self.assertEqual(Predictor.calc_metrics(
+            {"label": 3, "pred": {"x": 1}}, {"first": metrics["first"]},
+            {"first": ("x",)})["first"], 1)
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_streaming_metrics(self):
+        data = np.arange(10, dtype=np.float32)
+        manager = DataManager(DictDataset({"data": data, "label": data}),
+                              batch_size=4, n_process_augmentation=0,
+                              transforms=None)
+
+        predictor = Predictor(_DummyModel(), key_mapping={"x": "data"})
+        mse = MeanSquaredErrorMetric()
+
+        # computed over the whole dataset instead of averaging batch values
+        for _ in range(2):
+            metrics = next(predictor.predict_data_mgr_cache_metrics_only(
+                manager, metrics={"mse": mse, "mse_batches": mse.__call__}))
+
+            self.assertAlmostEqual(metrics["mse"], np.mean(data ** 2))
+            self.assertEqual(len(metrics["mse_batches"]), 3)
+            self.assertNotAlmostEqual(metrics["mse"],
+                                      metrics["mse_batches"].mean())
+
+    @unittest.skipUnless(check_for_no_backend(),
+                         "Test should be only executed if no "
+                         "backend was installed")
+    def test_predict_data_mgr_disk_cache(self):
+        data = np.arange(10, dtype=np.float32)
+        manager = DataManager(DictDataset({"data": data, "label": data}),
+                              batch_size=3, n_process_augmentation=0,
+                              transforms=None)
+
+        predictor = Predictor(_NestedDummyModel(), key_mapping={"x": "data"})
+
+        # all (nested) keys are concatenated
+        preds_memory, _ = next(predictor.predict_data_mgr_cache_all(manager))
+        self.assertTrue(np.array_equal(preds_memory["pred"], data * 2))
+        self.assertEqual(preds_memory["aux"]["img"].shape, (10, 3))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for chunk_size in [1, 4, 100]:
+                with self.subTest(chunk_size=chunk_size):
+                    preds, _ = next(predictor.predict_data_mgr_cache_all(
+                        manager, cache_dir=tmp_dir, chunk_size=chunk_size))
+
+                    self.assertIsInstance(preds["pred"], np.memmap)
+                    self.assertTrue(os.path.isfile(
+                        os.path.join(tmp_dir, "index.json")))
+
+                    for key in ["idx", "img"]:
+                        self.assertEqual(preds["aux"][key].dtype,
+                                         preds_memory["aux"][key].dtype)
+                        self.assertTrue(np.array_equal(
+                            preds["aux"][key], preds_memory["aux"][key]))
+                    self.assertTrue(np.array_equal(preds["pred"],
+                                                   preds_memory["pred"]))
+                    del preds
+
+
+if __name__ == '__main__':
+    unittest.main()